@@ -0,0 +1,129 @@
+"""Response compression negotiated from Accept-Encoding."""
+import gzip
+import os
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/vnd.apache.arrow.stream", "text/")
+
+# Server preference among equally acceptable codings
+ENCODINGS = ("br", "gzip")
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # fast enough for per-request compression
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli (when installed) or gzip above a size threshold.
+
+    Bodies of compressible media types are buffered before deciding, which
+    suits this API's single-chunk JSON and Arrow responses; bodies smaller
+    than ``minimum_size`` go out as they are. Already encoded responses and
+    other media types are passed through unbuffered.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else \
+            int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                # Streams of other media types (e.g. NDJSON) go out unbuffered
+                passthrough = "content-encoding" in headers or \
+                    not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._send_body(start_message, b"".join(chunks), encoding, send)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _send_body(self, start_message, body: bytes, encoding: str, send):
+        """Send the buffered response, compressed if it qualifies."""
+        headers = MutableHeaders(raw=start_message["headers"])
+        if len(body) >= self.minimum_size:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+
+        await send(start_message)
+        await send({"type": "http.response.body", "body": body})
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Supported encoding with the highest q the client gives ('br' or 'gzip'), or None.
+
+    Codings the header doesn't list take the q of '*' (0 without one). Equal
+    q-values go to the server's preference, brotli first; a client ranking
+    'identity' above every supported coding gets an uncompressed response.
+    """
+    accepted = _qvalues(accept_encoding or "")
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        if encoding == "br" and brotli is None:
+            continue
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    if accepted.get("identity", 0.0) > best_q:
+        return None
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with 'br' or 'gzip'."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _qvalues(header: str) -> Dict[str, float]:
+    """Parse 'gzip, br;q=0.5' into {coding: q}."""
+    values = {}
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        values[coding.lower()] = q
+    return values
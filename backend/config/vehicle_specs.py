@@ -166,6 +166,12 @@ TRACK_DATA = {
     }
 }
 
+# Corners located by lap distance (metres from the start line) on a reference lap.
+# A corner with start_m past end_m crosses the line.
+# BEGIN CORNER_CATALOG (generated by scripts/build_corner_catalog.py)
+CORNER_CATALOG = {}
+# END CORNER_CATALOG
+
 # Performance thresholds for analysis
 PERFORMANCE_THRESHOLDS = {
     "excellent_consistency": 0.5,  # Within 0.5s of best lap
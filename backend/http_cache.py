@@ -0,0 +1,127 @@
+"""Conditional HTTP caching: strong ETags and 304 Not Modified for session analyses."""
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from backend.compression import choose_encoding
+from backend.services.execution import run_io
+from backend.services.result_store import code_version
+from backend.services.session_repository import get_session_repository
+
+# Read-only analyses keyed by track and session; results depend only on the
+# session's data files and the analysis code.
+SESSION_ROUTE = re.compile(r"^/api/(?:analytics|strategy|telemetry)/track/([^/]+)/session/([^/]+)/")
+
+# Query parameters naming another session of the track that a result also reads
+SESSION_PARAMS = ("ref_session",)
+
+_stats_lock = threading.Lock()
+_stats = {"tagged": 0, "not_modified": 0}
+
+
+class ConditionalCacheMiddleware:
+    """Attach ETag and Cache-Control to session analyses and answer If-None-Match.
+
+    The ETag is derived from the data version of the session and of any
+    ``ref_session`` in the query (file stats or S3 ETags, no loading) and the
+    code version, plus everything that selects the representation: path,
+    query, Accept and the negotiated content coding. A matching If-None-Match
+    gets a 304 before the endpoint runs.
+    """
+
+    def __init__(self, app, max_age: Optional[int] = None):
+        self.app = app
+        self.max_age = max_age if max_age is not None else int(os.getenv('HTTP_CACHE_MAX_AGE', '300'))
+
+    async def __call__(self, scope, receive, send):
+        match = SESSION_ROUTE.match(scope.get("path", "")) if scope["type"] == "http" else None
+        if match is None or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        track_name, session = match.groups()
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        sessions = [session] + [name for param in SESSION_PARAMS for name in query.get(param, []) if name != session]
+        data_version = await run_io(_versions, track_name, sessions)
+        if data_version is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = self._etag(scope, headers, data_version)
+        cache_headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept, Accept-Encoding",
+        }
+
+        if _matches(headers.get("if-none-match"), etag):
+            _count("not_modified")
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(name.lower().encode(), value.encode()) for name, value in cache_headers.items()],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_tagged(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = MutableHeaders(scope=message)
+                if "etag" not in response_headers:
+                    response_headers["ETag"] = etag
+                    response_headers["Cache-Control"] = cache_headers["Cache-Control"]
+                    vary = response_headers.get("vary", "").lower()
+                    for name in ("Accept", "Accept-Encoding"):
+                        if name.lower() not in vary:
+                            response_headers.add_vary_header(name)
+                    _count("tagged")
+            await send(message)
+
+        await self.app(scope, receive, send_tagged)
+
+    @staticmethod
+    def _etag(scope, headers: Headers, data_version) -> str:
+        """Strong ETag of one representation of a session analysis."""
+        key = repr((
+            data_version,
+            scope["path"],
+            scope.get("query_string", b""),
+            headers.get("accept", ""),
+            choose_encoding(headers.get("accept-encoding")),
+        ))
+        return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def http_cache_stats() -> Dict[str, int]:
+    """ETagged responses and 304s served by this worker."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _versions(track_name: str, sessions: List[str]):
+    """Code and data versions of analyses reading these sessions, or None if one has no data."""
+    repository = get_session_repository()
+    data_version = tuple(repository.session_version(track_name, session) for session in sessions)
+    return None if None in data_version else (code_version(), data_version)
+
+
+def _count(name: str):
+    """Increment one of the cache counters."""
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
@@ -1,14 +1,26 @@
 """FastAPI backend for GR Cup Analytics."""
+import os
+import threading
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routers import analytics, telemetry, strategy
+from backend.compression import CompressionMiddleware
+from backend.http_cache import ConditionalCacheMiddleware, http_cache_stats
+from backend.routers import analytics, batch, telemetry, strategy
+from backend.routers.negotiation import FastJSONResponse
+from backend.services.execution import execution_stats, shutdown_pools
+from backend.services.result_store import get_result_store
+from backend.services.session_repository import get_session_repository
 
 app = FastAPI(
     title="GR Cup Racing Intelligence API",
     description="Real-time analytics and strategy engine for Toyota GR Cup",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
+# ETag / 304 for session analyses, answered before any loading
+app.add_middleware(ConditionalCacheMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -18,10 +30,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for responses above COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
 # Include routers
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(telemetry.router, prefix="/api/telemetry", tags=["telemetry"])
 app.include_router(strategy.router, prefix="/api/strategy", tags=["strategy"])
+app.include_router(batch.router, prefix="/api/batch", tags=["batch"])
+
+@app.on_event("startup")
+async def warm_s3_cache():
+    """Fill the local S3 object cache in the background on a cold instance."""
+    repository = get_session_repository()
+    if repository.use_s3 and os.getenv('S3_CACHE_WARM_ON_START', 'false').lower() == 'true':
+        threading.Thread(target=repository.s3_loader.warm_cache, daemon=True).start()
+
+@app.on_event("shutdown")
+async def stop_execution_pools():
+    """Stop the worker threads and processes."""
+    shutdown_pools()
 
 @app.get("/")
 async def root():
@@ -34,3 +62,18 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+@app.get("/metrics")
+async def metrics():
+    """Cache and data-loading statistics for this worker."""
+    repository = get_session_repository()
+    metrics = {
+        "session_cache": repository.stats(),
+        "executor": execution_stats(),
+        "http_cache": http_cache_stats(),
+        "result_store": get_result_store().stats()
+    }
+    if repository.use_s3:
+        metrics["s3_manifest"] = repository.s3_loader.manifest.stats()
+        metrics["s3_cache"] = repository.s3_loader.cache_stats()
+    return metrics
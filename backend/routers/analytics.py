@@ -1,25 +1,29 @@
 """Analytics endpoints for lap time and sector analysis."""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import List, Dict, Any
 from backend.services.lap_analyzer import LapAnalyzer
 from backend.services.advanced_analytics import AdvancedAnalytics
-from backend.services.amicos_engine import AMICOSEngine
+from backend.services.field_analyzer import FieldAnalyzer
+from backend.services.amicos_engine import analyze_cornering_performance
+from backend.routers.negotiation import json_response, negotiate
+from backend.services.arrow_ipc import records_table
+from backend.services.execution import run_cpu, run_io
 
 router = APIRouter()
 analyzer = LapAnalyzer()
 advanced = AdvancedAnalytics()
-amicos = AMICOSEngine()
+field = FieldAnalyzer()
 
 @router.get("/tracks")
 async def get_tracks() -> List[str]:
     """Get list of available tracks."""
-    return analyzer.get_available_tracks()
+    return json_response(await run_io(analyzer.get_available_tracks))
 
 @router.get("/track/{track_name}/sessions")
 async def get_sessions(track_name: str) -> List[str]:
     """Get available sessions for a track."""
     try:
-        return analyzer.get_sessions(track_name)
+        return json_response(await run_io(analyzer.get_sessions, track_name))
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -27,15 +31,17 @@ async def get_sessions(track_name: str) -> List[str]:
 async def get_best_lap(track_name: str, session: str) -> Dict[str, Any]:
     """Get theoretical best lap from combined best sectors."""
     try:
-        return analyzer.calculate_best_lap(track_name, session)
+        return json_response(await run_io(analyzer.calculate_best_lap, track_name, session))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/track/{track_name}/session/{session}/driver/{driver_id}/performance")
-async def get_driver_performance(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
-    """Get comprehensive driver performance analysis."""
+async def get_driver_performance(track_name: str, session: str, driver_id: str,
+                                 request: Request) -> Dict[str, Any]:
+    """Get comprehensive driver performance analysis (lap_times as Arrow on request)."""
     try:
-        return analyzer.analyze_driver_performance(track_name, session, driver_id)
+        result = await run_io(analyzer.analyze_driver_performance, track_name, session, driver_id)
+        return negotiate(request, result, lambda r: records_table(r, "lap_times"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -43,7 +49,7 @@ async def get_driver_performance(track_name: str, session: str, driver_id: str)
 async def get_drivers(track_name: str, session: str) -> List[str]:
     """Get list of drivers for a session."""
     try:
-        return analyzer.get_drivers(track_name, session)
+        return json_response(await run_io(analyzer.get_drivers, track_name, session))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -51,7 +57,7 @@ async def get_drivers(track_name: str, session: str) -> List[str]:
 async def get_detailed_performance(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
     """Get detailed performance analysis with vehicle specs."""
     try:
-        return advanced.get_detailed_performance(track_name, session, driver_id)
+        return json_response(await run_io(advanced.get_detailed_performance, track_name, session, driver_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -59,7 +65,7 @@ async def get_detailed_performance(track_name: str, session: str, driver_id: str
 async def get_advanced_speed_analysis(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
     """Get advanced speed analysis with GR86 specs."""
     try:
-        return advanced.get_speed_analysis(track_name, session, driver_id)
+        return json_response(await run_io(advanced.get_speed_analysis, track_name, session, driver_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -67,22 +73,36 @@ async def get_advanced_speed_analysis(track_name: str, session: str, driver_id:
 async def get_advanced_braking_analysis(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
     """Get advanced braking analysis with Brembo specs."""
     try:
-        return advanced.get_braking_analysis(track_name, session, driver_id)
+        return json_response(await run_io(advanced.get_braking_analysis, track_name, session, driver_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/track/{track_name}/session/{session}/driver/{driver_id}/amicos-analysis")
-async def get_amicos_analysis(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
-    """Get AMICOS cornering optimization analysis."""
+async def get_amicos_analysis(track_name: str, session: str, driver_id: str,
+                              request: Request) -> Dict[str, Any]:
+    """Get AMICOS cornering optimization analysis (corner_analysis as Arrow on request)."""
     try:
-        return amicos.analyze_cornering_performance(track_name, session, driver_id)
+        result = await run_cpu(analyze_cornering_performance, track_name, session, driver_id)
+        return negotiate(request, result, lambda r: records_table(r, "corner_analysis"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/track/{track_name}/session/{session}/sector-analysis")
-async def get_sector_analysis(track_name: str, session: str) -> Dict[str, Any]:
-    """Get sector-by-sector analysis for all drivers."""
+async def get_sector_analysis(track_name: str, session: str,
+                              request: Request) -> Dict[str, Any]:
+    """Get sector-by-sector analysis for all drivers (one Arrow row per driver on request)."""
     try:
-        return analyzer.analyze_sectors(track_name, session)
+        result = await run_io(analyzer.analyze_sectors, track_name, session)
+        return negotiate(request, result, lambda r: records_table(r, "sector_analysis", "driver_id"))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/track/{track_name}/session/{session}/field")
+async def get_field_analysis(track_name: str, session: str,
+                             request: Request) -> Dict[str, Any]:
+    """Get performance, consistency and tire degradation for every driver (one Arrow row per driver on request)."""
+    try:
+        result = await run_io(field.analyze_field, track_name, session)
+        return negotiate(request, result, lambda r: records_table(r, "drivers", "driver_id"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,211 @@
+"""Batch endpoint running mixed analyses in one round trip."""
+import asyncio
+import os
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, get_type_hints
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+from backend.routers.negotiation import dumps
+from backend.services.advanced_analytics import (
+    BRAKING_CHANNELS, SPEED_CHANNELS, TRAIL_BRAKING_CHANNELS, AdvancedAnalytics
+)
+from backend.services.amicos_engine import (
+    CORNERING_CHANNELS, DRIVER_INPUT_CHANNELS, analyze_cornering_performance
+)
+from backend.services.execution import run_io
+from backend.services.field_analyzer import FieldAnalyzer
+from backend.services.lap_analyzer import LapAnalyzer
+from backend.services.lap_distance import LapDistanceService
+from backend.services.session_repository import get_session_repository
+from backend.services.strategy_engine import StrategyEngine
+from backend.services.telemetry_analyzer import TelemetryAnalyzer
+
+router = APIRouter()
+analyzer = LapAnalyzer()
+advanced = AdvancedAnalytics()
+field = FieldAnalyzer()
+lap_distance = LapDistanceService()
+strategy = StrategyEngine()
+telemetry = TelemetryAnalyzer()
+
+MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '200'))
+
+
+class Analysis(NamedTuple):
+    """A service call available to batches.
+
+    ``channels`` are the telemetry channels the call reads for its driver
+    across the whole session (None for all of them), preloaded once per
+    driver before a group's items start.
+    """
+    fn: Callable
+    per_driver: bool = True
+    required: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+    channels: Optional[Tuple[str, ...]] = ()
+
+
+# Names follow the path suffix of the matching GET/POST endpoint
+ANALYSES: Dict[str, Analysis] = {
+    "best-lap": Analysis(analyzer.calculate_best_lap, per_driver=False),
+    "drivers": Analysis(analyzer.get_drivers, per_driver=False),
+    "sector-analysis": Analysis(analyzer.analyze_sectors, per_driver=False),
+    "field": Analysis(field.analyze_field, per_driver=False),
+    "performance": Analysis(analyzer.analyze_driver_performance),
+    "detailed-performance": Analysis(advanced.get_detailed_performance),
+    "speed-analysis": Analysis(advanced.get_speed_analysis, channels=tuple(SPEED_CHANNELS)),
+    "braking-analysis": Analysis(advanced.get_braking_analysis,
+                                 channels=tuple(BRAKING_CHANNELS + TRAIL_BRAKING_CHANNELS)),
+    # Runs in-process rather than on the CPU pool so it reads the preloaded channels
+    "amicos-analysis": Analysis(analyze_cornering_performance,
+                                channels=tuple(CORNERING_CHANNELS + DRIVER_INPUT_CHANNELS)),
+    "tire-degradation": Analysis(strategy.predict_tire_degradation),
+    "consistency": Analysis(strategy.analyze_consistency),
+    "pit-strategy": Analysis(strategy.calculate_pit_window,
+                             required=("current_lap", "total_laps", "tire_age", "fuel_level")),
+    "telemetry-braking-analysis": Analysis(telemetry.analyze_braking, channels=None),
+    "telemetry-speed-analysis": Analysis(telemetry.analyze_speed, channels=None),
+    # Single-lap reads seek to the lap through the lap index instead
+    "lap": Analysis(telemetry.get_lap_data, required=("lap_number",)),
+    "trace": Analysis(telemetry.get_lap_trace, required=("lap_number",),
+                      optional=("channels", "width", "start", "end")),
+    "delta": Analysis(lap_distance.time_delta, required=("lap_number",),
+                      optional=("ref_driver", "ref_lap", "ref_session", "resolution_m"),
+                      channels=("speed",)),
+}
+
+
+def _param_types(analysis: Analysis) -> Dict[str, TypeAdapter]:
+    """Validators for an analysis' params, taken from the service signature."""
+    hints = get_type_hints(analysis.fn)
+    return {name: TypeAdapter(hints.get(name, Any)) for name in analysis.required + analysis.optional}
+
+
+PARAM_TYPES = {name: _param_types(analysis) for name, analysis in ANALYSES.items()}
+
+
+class BatchItem(BaseModel):
+    analysis: str
+    track_name: str
+    session: str
+    driver_id: Optional[str] = None
+    params: Dict[str, Any] = Field(default_factory=dict)
+    id: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
+
+@router.post("")
+async def run_batch(request: BatchRequest) -> StreamingResponse:
+    """Run a list of analyses and stream one NDJSON line per item as each finishes.
+
+    Items are grouped by (track, session). Each group first loads its lap
+    table and, per driver, the union of the channels its items read into the
+    session cache; its items then run concurrently and read from that cache.
+    Groups start independently, so a slow session doesn't hold back the
+    others. Every line carries the item's ``index`` (and ``id`` if given), a
+    ``status`` and either ``result`` or ``detail``.
+    """
+    if len(request.items) > MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ITEMS} items per batch")
+
+    groups = defaultdict(list)
+    for index, item in enumerate(request.items):
+        groups[(item.track_name, item.session)].append(index)
+
+    finished: asyncio.Queue = asyncio.Queue()
+    tasks: List[asyncio.Task] = []
+
+    async def run_group(key: Tuple[str, str], indices: List[int]):
+        """Preload what the group's items read, then start them."""
+        await _preload(*key, [request.items[index] for index in indices])
+        for index in indices:
+            task = asyncio.ensure_future(_run_item(index, request.items[index]))
+            task.add_done_callback(finished.put_nowait)
+            tasks.append(task)
+
+    async def stream():
+        tasks.extend(asyncio.ensure_future(run_group(key, indices)) for key, indices in groups.items())
+        try:
+            for _ in request.items:
+                yield dumps((await finished.get()).result()) + b"\n"
+        finally:
+            # A client that disconnects early leaves these running otherwise
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+async def _preload(track_name: str, session: str, items: List[BatchItem]):
+    """Load a group's lap table and each driver's channel union into the session cache."""
+    channels: Dict[str, Optional[set]] = {}
+    for item in items:
+        analysis = ANALYSES.get(item.analysis)
+        if analysis is None or not analysis.per_driver or not item.driver_id or analysis.channels == ():
+            continue
+        if analysis.channels is None or channels.get(item.driver_id, ()) is None:
+            channels[item.driver_id] = None
+        else:
+            channels[item.driver_id] = channels.get(item.driver_id, set()) | set(analysis.channels)
+
+    repository = get_session_repository()
+    loads = {"lap times": run_io(repository.load_lap_times, track_name, session)}
+    for driver_id, names in channels.items():
+        loads[f"{driver_id} channels"] = run_io(repository.load_channels, track_name, session, driver_id,
+                                                tuple(sorted(names)) if names is not None else None)
+    outcomes = await asyncio.gather(*loads.values(), return_exceptions=True)
+    for name, outcome in zip(loads, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"Warning: batch preload of {name} for {track_name}/{session} failed: {outcome}")
+
+
+async def _run_item(index: int, item: BatchItem) -> Dict[str, Any]:
+    """Run one batch item and describe its outcome."""
+    line = {"index": index, "id": item.id, "analysis": item.analysis}
+    analysis = ANALYSES.get(item.analysis)
+    error = _validate(item, analysis)
+    if error is not None:
+        return {**line, "status": 400, "detail": error}
+    params, errors = _coerce_params(item)
+    if errors:
+        return {**line, "status": 400, "detail": f"Invalid params: {errors}"}
+
+    args = (item.track_name, item.session) + ((item.driver_id,) if analysis.per_driver else ())
+    try:
+        result = await run_io(analysis.fn, *args, **params)
+    except Exception as e:
+        return {**line, "status": 500, "detail": str(e)}
+    return {**line, "status": 200, "result": result}
+
+
+def _validate(item: BatchItem, analysis: Optional[Analysis]) -> Optional[str]:
+    """Reason an item can't run, or None."""
+    if analysis is None:
+        return f"Unknown analysis '{item.analysis}'; expected one of {sorted(ANALYSES)}"
+    if analysis.per_driver and not item.driver_id:
+        return f"'{item.analysis}' requires driver_id"
+    missing = [name for name in analysis.required if name not in item.params]
+    if missing:
+        return f"Missing params: {missing}"
+    unknown = sorted(set(item.params) - set(analysis.required) - set(analysis.optional))
+    if unknown:
+        return f"Unknown params: {unknown}"
+    return None
+
+
+def _coerce_params(item: BatchItem) -> Tuple[Dict[str, Any], List[str]]:
+    """Params cast to the service's annotated types (e.g. "5" -> 5 for an int), and any type errors."""
+    types = PARAM_TYPES[item.analysis]
+    params, errors = {}, []
+    for name, value in item.params.items():
+        try:
+            params[name] = types[name].validate_python(value)
+        except ValidationError as e:
+            errors.append(f"{name}: {e.errors()[0]['msg']}")
+    return params, errors
@@ -0,0 +1,56 @@
+"""Response rendering: fast JSON, and content negotiation with Arrow IPC."""
+from typing import Any, Callable, Optional
+
+import orjson
+import pyarrow as pa
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from backend.services.arrow_ipc import ARROW_STREAM, accepts_arrow, ipc_stream
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON rendered by orjson.
+
+    numpy scalars and arrays are serialized natively, non-string dict keys are
+    stringified and NaN becomes null, so results need no float()/tolist() pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize a service result as JSON the way FastJSONResponse does."""
+    return orjson.dumps(content, default=_default,
+                        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(result: Any, headers: Optional[dict] = None) -> Response:
+    """Render a service result directly, skipping FastAPI's response encoding."""
+    return FastJSONResponse(result, headers=headers)
+
+
+def negotiate(request: Request, result: Any,
+              to_table: Callable[[Any], Optional[pa.Table]]) -> Response:
+    """Return result as JSON, or as an Arrow IPC stream when the client asks for it.
+
+    Results without the tabular part (errors, "not available" messages) stay JSON.
+    """
+    headers = {"Vary": "Accept"}
+    if not isinstance(result, dict) or "error" in result or not accepts_arrow(request.headers.get("accept")):
+        return json_response(result, headers)
+
+    table = to_table(result)
+    if table is None:
+        return json_response(result, headers)
+    return Response(ipc_stream(table), media_type=ARROW_STREAM, headers=headers)
+
+
+def _default(value: Any) -> Any:
+    """Serialize the remaining pandas/numpy types (timestamps, extension scalars)."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
@@ -1,7 +1,10 @@
 """Strategy endpoints for race simulation and predictions."""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import Dict, Any
 from pydantic import BaseModel
+from backend.routers.negotiation import json_response, negotiate
+from backend.services.arrow_ipc import records_table
+from backend.services.execution import run_io
 from backend.services.strategy_engine import StrategyEngine
 
 router = APIRouter()
@@ -22,19 +25,22 @@ async def calculate_pit_strategy(
 ) -> Dict[str, Any]:
     """Calculate optimal pit stop strategy."""
     try:
-        return strategy.calculate_pit_window(
+        return json_response(await run_io(
+            strategy.calculate_pit_window,
             track_name, session, driver_id,
             request.current_lap, request.total_laps,
             request.tire_age, request.fuel_level
-        )
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/track/{track_name}/session/{session}/driver/{driver_id}/tire-degradation")
-async def get_tire_degradation(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
-    """Predict tire degradation over race distance."""
+async def get_tire_degradation(track_name: str, session: str, driver_id: str,
+                               request: Request) -> Dict[str, Any]:
+    """Predict tire degradation over race distance (lap_deltas as Arrow on request)."""
     try:
-        return strategy.predict_tire_degradation(track_name, session, driver_id)
+        result = await run_io(strategy.predict_tire_degradation, track_name, session, driver_id)
+        return negotiate(request, result, lambda r: records_table(r, "lap_deltas"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -42,6 +48,6 @@ async def get_tire_degradation(track_name: str, session: str, driver_id: str) ->
 async def get_consistency_metrics(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
     """Calculate driver consistency metrics."""
     try:
-        return strategy.analyze_consistency(track_name, session, driver_id)
+        return json_response(await run_io(strategy.analyze_consistency, track_name, session, driver_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
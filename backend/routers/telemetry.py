@@ -1,10 +1,17 @@
 """Telemetry endpoints for real-time data analysis."""
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Dict, Any, Optional
+from backend.routers.negotiation import json_response, negotiate
+from backend.services.arrow_ipc import columns_table, overlay_table, traces_table
+from backend.services.execution import run_io
+from backend.services.lap_distance import LapDistanceService
+from backend.services.lap_overlay import LapOverlayService
 from backend.services.telemetry_analyzer import TelemetryAnalyzer
 
 router = APIRouter()
 telemetry = TelemetryAnalyzer()
+lap_distance = LapDistanceService()
+overlay = LapOverlayService()
 
 @router.get("/track/{track_name}/session/{session}/driver/{driver_id}/lap/{lap_number}")
 async def get_lap_telemetry(
@@ -15,7 +22,72 @@ async def get_lap_telemetry(
 ) -> Dict[str, Any]:
     """Get detailed telemetry for a specific lap."""
     try:
-        return telemetry.get_lap_data(track_name, session, driver_id, lap_number)
+        return json_response(await run_io(telemetry.get_lap_data, track_name, session, driver_id, lap_number))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/track/{track_name}/session/{session}/driver/{driver_id}/lap/{lap_number}/trace")
+async def get_lap_trace(
+    track_name: str,
+    session: str,
+    driver_id: str,
+    lap_number: int,
+    request: Request,
+    channels: Optional[str] = Query(None, description="Comma-separated channel names"),
+    width: int = Query(1000, ge=16, le=8192, description="Chart width in pixels"),
+    start: Optional[float] = Query(None, ge=0, description="Window start, seconds from lap start"),
+    end: Optional[float] = Query(None, gt=0, description="Window end, seconds from lap start")
+) -> Dict[str, Any]:
+    """Get downsampled channel traces for charting a lap (long-format Arrow on request)."""
+    try:
+        names = [name.strip() for name in channels.split(',') if name.strip()] if channels else None
+        result = await run_io(telemetry.get_lap_trace, track_name, session, driver_id, lap_number,
+                              names, width, start, end)
+        return negotiate(request, result, traces_table)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/track/{track_name}/session/{session}/driver/{driver_id}/lap/{lap_number}/delta")
+async def get_lap_delta(
+    track_name: str,
+    session: str,
+    driver_id: str,
+    lap_number: int,
+    request: Request,
+    ref_driver: Optional[str] = Query(None, description="Reference vehicle (session best if omitted)"),
+    ref_lap: Optional[int] = Query(None, description="Reference lap number"),
+    ref_session: Optional[str] = Query(None, description="Reference session (defaults to this session)"),
+    resolution_m: float = Query(5.0, ge=1, le=100, description="Distance grid spacing in metres")
+) -> Dict[str, Any]:
+    """Get the running time delta of a lap against a reference lap along the lap distance."""
+    try:
+        result = await run_io(lap_distance.time_delta, track_name, session, driver_id, lap_number,
+                              ref_driver, ref_lap, ref_session, resolution_m)
+        return negotiate(request, result, lambda r: columns_table(r, "trace"))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/track/{track_name}/session/{session}/overlay")
+async def get_lap_overlay(
+    track_name: str,
+    session: str,
+    request: Request,
+    driver_id: Optional[str] = Query(None, description="Overlay this driver's laps (top drivers' best laps if omitted)"),
+    laps: Optional[str] = Query(None, description="Comma-separated lap numbers of driver_id"),
+    top: int = Query(10, ge=1, le=50, description="Number of drivers when no driver_id is given"),
+    channels: Optional[str] = Query(None, description="Comma-separated channel names"),
+    resolution_m: float = Query(10.0, ge=1, le=100, description="Distance bin width in metres")
+) -> Dict[str, Any]:
+    """Get many laps on one lap-distance grid, with per-bin envelopes (long-format Arrow on request)."""
+    try:
+        lap_numbers = tuple(int(lap) for lap in laps.split(',') if lap.strip()) if laps else None
+        names = tuple(name.strip() for name in channels.split(',') if name.strip()) if channels else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="laps must be comma-separated integers")
+    try:
+        result = await run_io(overlay.build_overlay, track_name, session, driver_id, lap_numbers, top,
+                              names, resolution_m)
+        return negotiate(request, result, overlay_table)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -23,7 +95,7 @@ async def get_lap_telemetry(
 async def get_braking_analysis(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
     """Analyze braking points and efficiency."""
     try:
-        return telemetry.analyze_braking(track_name, session, driver_id)
+        return json_response(await run_io(telemetry.analyze_braking, track_name, session, driver_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -31,6 +103,6 @@ async def get_braking_analysis(track_name: str, session: str, driver_id: str) ->
 async def get_speed_analysis(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
     """Analyze speed profile (vMin, vMax, acceleration)."""
     try:
-        return telemetry.analyze_speed(track_name, session, driver_id)
+        return json_response(await run_io(telemetry.analyze_speed, track_name, session, driver_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
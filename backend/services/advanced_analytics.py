@@ -1,23 +1,35 @@
 """Advanced racing analytics with vehicle-specific insights."""
 import pandas as pd
 import numpy as np
-from pathlib import Path
 from typing import Dict, Any, List
 from backend.config.vehicle_specs import GR86_CUP_SPECS, TRACK_DATA, PERFORMANCE_THRESHOLDS
+from backend.services.channel_arrays import ChannelData
+from backend.services.frame_schema import sensor_float
+from backend.services.result_store import stored_result
+from backend.services.segmentation import above_threshold, runs
+from backend.services.session_repository import get_session_repository
+from backend.services.telemetry_resampler import TelemetryResampler
+
+# Telemetry channels read by each analysis
+SPEED_CHANNELS = ['vehspd_can']
+BRAKING_CHANNELS = ['pbrake_f', 'pbrake_r', 'accx_can', 'speed']
+TRAIL_BRAKING_CHANNELS = ['pbrake_f', 'accy_can']
 
 
 class AdvancedAnalytics:
     """Provides detailed racing analytics with GR86 Cup car specifications."""
     
     def __init__(self):
-        self.data_dir = Path("data")
+        self.repository = get_session_repository()
+        self.resampler = TelemetryResampler(self.repository)
         self.vehicle_specs = GR86_CUP_SPECS
         self.track_data = TRACK_DATA
     
+    @stored_result("detailed_performance")
     def get_detailed_performance(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Get comprehensive performance analysis with vehicle-specific insights."""
         # Load lap times
-        lap_times = self._load_lap_times(track_name, session)
+        lap_times = self.repository.load_lap_times(track_name, session)
         
         if lap_times.empty:
             return {"error": "No data available"}
@@ -93,31 +105,30 @@ class AdvancedAnalytics:
             }
         }
     
+    @stored_result("speed_analysis")
     def get_speed_analysis(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Analyze speed data with GR86 Cup car limits."""
-        telemetry = self._load_telemetry(track_name, session)
-        
-        if telemetry.empty:
+        if not self.repository.has_telemetry(track_name, session):
             return {"error": "No telemetry data available"}
         
-        driver_data = telemetry[telemetry['vehicle_id'] == driver_id]
-        speed_data = driver_data[driver_data['telemetry_name'] == 'vehspd_can']
+        channels = self.repository.load_channels(track_name, session, driver_id, SPEED_CHANNELS)
+        speed_data = self._channel_values(channels, 'vehspd_can')
         
         if speed_data.empty:
             return {"message": "No speed data available"}
         
-        vmax = float(speed_data['telemetry_value'].max())
-        vmin = float(speed_data['telemetry_value'].min())
-        vavg = float(speed_data['telemetry_value'].mean())
+        vmax = sensor_float(speed_data.max())
+        vmin = sensor_float(speed_data.min())
+        vavg = float(speed_data.mean())
         
         # Calculate percentage of theoretical max
         theoretical_max = self.vehicle_specs['performance']['top_speed_kmh']
         speed_utilization = (vmax / theoretical_max) * 100
         
         # Speed zones
-        high_speed_time = len(speed_data[speed_data['telemetry_value'] > 150]) / len(speed_data) * 100
-        mid_speed_time = len(speed_data[(speed_data['telemetry_value'] > 100) & (speed_data['telemetry_value'] <= 150)]) / len(speed_data) * 100
-        low_speed_time = len(speed_data[speed_data['telemetry_value'] <= 100]) / len(speed_data) * 100
+        high_speed_time = len(speed_data[speed_data > 150]) / len(speed_data) * 100
+        mid_speed_time = len(speed_data[(speed_data > 100) & (speed_data <= 150)]) / len(speed_data) * 100
+        low_speed_time = len(speed_data[speed_data <= 100]) / len(speed_data) * 100
         
         return {
             "driver_id": driver_id,
@@ -139,24 +150,23 @@ class AdvancedAnalytics:
             }
         }
     
+    @stored_result("braking_analysis")
     def get_braking_analysis(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Analyze braking with real physics and Brembo brake specs."""
-        telemetry = self._load_telemetry(track_name, session)
-        
-        if telemetry.empty:
+        if not self.repository.has_telemetry(track_name, session):
             return {"error": "No telemetry data available"}
         
-        driver_data = telemetry[telemetry['vehicle_id'] == driver_id]
+        channels = self.repository.load_channels(track_name, session, driver_id, BRAKING_CHANNELS)
         
         # Get brake pressure data (in bar)
-        brake_front = driver_data[driver_data['telemetry_name'] == 'pbrake_f']['telemetry_value']
-        brake_rear = driver_data[driver_data['telemetry_name'] == 'pbrake_r']['telemetry_value']
+        brake_front = self._channel_values(channels, 'pbrake_f')
+        brake_rear = self._channel_values(channels, 'pbrake_r')
         
         # Get longitudinal acceleration (G-forces)
-        accx = driver_data[driver_data['telemetry_name'] == 'accx_can']['telemetry_value']
+        accx = self._channel_values(channels, 'accx_can')
         
         # Get speed data
-        speed = driver_data[driver_data['telemetry_name'] == 'speed']['telemetry_value']
+        speed = self._channel_values(channels, 'speed')
         
         if brake_front.empty and brake_rear.empty:
             return {"message": "No braking data available"}
@@ -166,15 +176,7 @@ class AdvancedAnalytics:
         
         # Braking zones detection (pressure > 2 bar = braking)
         braking_threshold = 2.0  # bar
-        brake_applications = 0
-        in_braking_zone = False
-        
-        for pressure in all_brake_data:
-            if pressure > braking_threshold and not in_braking_zone:
-                brake_applications += 1
-                in_braking_zone = True
-            elif pressure <= braking_threshold:
-                in_braking_zone = False
+        brake_applications = len(runs(above_threshold(all_brake_data.to_numpy(dtype=np.float64), braking_threshold)).start)
         
         # Brake pressure statistics (in bar) - filter outliers
         # Use 99th percentile as max to avoid sensor spikes
@@ -216,14 +218,13 @@ class AdvancedAnalytics:
         braking_consistency = float(brake_front[brake_front > braking_threshold].std()) if not brake_front.empty else 0
         
         # Trail braking detection (braking while turning)
-        # Get lateral G data
-        accy_data = driver_data[driver_data['telemetry_name'] == 'accy_can']['telemetry_value']
-        if not accy_data.empty and not brake_front.empty:
-            # Align data by index
+        # Brake pressure and lateral G are logged independently, so put them on a common time base
+        aligned = self.resampler.resample(track_name, session, driver_id, TRAIL_BRAKING_CHANNELS)
+        if set(TRAIL_BRAKING_CHANNELS) <= set(aligned.columns):
             combined = pd.DataFrame({
-                'brake': brake_front.values[:min(len(brake_front), len(accy_data))],
-                'lateral_g': accy_data.values[:min(len(brake_front), len(accy_data))]
-            })
+                'brake': aligned['pbrake_f'],
+                'lateral_g': aligned['accy_can']
+            }).dropna()
             # Trail braking = braking (>2 bar) + lateral load (>0.3G)
             trail_braking_points = combined[(combined['brake'] > 2.0) & (abs(combined['lateral_g']) > 0.3)]
             trail_braking_pct = (len(trail_braking_points) / len(combined[combined['brake'] > 2.0]) * 100) if len(combined[combined['brake'] > 2.0]) > 0 else 0
@@ -301,51 +302,7 @@ class AdvancedAnalytics:
             }
         }
     
-    def _load_lap_times(self, track_name: str, session: str) -> pd.DataFrame:
-        """Load lap time data."""
-        track_base = track_name.split("_")[0]
-        possible_dirs = [
-            self.data_dir / track_name / track_name.replace("_", "-"),
-            self.data_dir / track_name / track_name,
-            self.data_dir / track_name / track_base,
-        ]
-        
-        for track_dir in possible_dirs:
-            if track_dir.exists():
-                lap_start_files = list(track_dir.glob(f"{session}_*_lap_start.csv"))
-                lap_end_files = list(track_dir.glob(f"{session}_*_lap_end.csv"))
-                
-                if lap_start_files and lap_end_files:
-                    start_df = pd.read_csv(lap_start_files[0])
-                    end_df = pd.read_csv(lap_end_files[0])
-                    
-                    start_df['start_time'] = pd.to_datetime(start_df['timestamp'])
-                    end_df['end_time'] = pd.to_datetime(end_df['timestamp'])
-                    
-                    merged = pd.merge(
-                        start_df[['vehicle_id', 'lap', 'start_time']],
-                        end_df[['vehicle_id', 'lap', 'end_time']],
-                        on=['vehicle_id', 'lap'],
-                        how='inner'
-                    )
-                    
-                    merged['lap_time'] = (merged['end_time'] - merged['start_time']).dt.total_seconds()
-                    return merged[(merged['lap_time'] > 60) & (merged['lap_time'] < 300)]
-        
-        return pd.DataFrame()
-    
-    def _load_telemetry(self, track_name: str, session: str) -> pd.DataFrame:
-        """Load telemetry data."""
-        track_base = track_name.split("_")[0]
-        possible_dirs = [
-            self.data_dir / track_name / track_name.replace("_", "-"),
-            self.data_dir / track_name / track_name,
-            self.data_dir / track_name / track_base,
-        ]
-        
-        for track_dir in possible_dirs:
-            if track_dir.exists():
-                for telemetry_file in track_dir.glob(f"{session}_*_telemetry_data.csv"):
-                    return pd.read_csv(telemetry_file, nrows=100000)
-        
-        return pd.DataFrame()
+    def _channel_values(self, channels: Dict[str, ChannelData], channel_name: str) -> pd.Series:
+        """Get a channel's values as a Series."""
+        channel = channels.get(channel_name)
+        return channel.to_series() if channel is not None else pd.Series(dtype=float)
@@ -4,17 +4,27 @@ Physics-based cornering analysis using vehicle dynamics and sensor fusion
 """
 import pandas as pd
 import numpy as np
-from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from scipy.signal import find_peaks
 from backend.config.vehicle_specs import GR86_CUP_SPECS, TRACK_DATA
+from backend.services.channel_arrays import ChannelData
+from backend.services.corner_catalog import corner_passes, get_corner_catalog
+from backend.services.result_store import stored_result
+from backend.services.segmentation import Segments, runs
+from backend.services.session_repository import get_session_repository
+from backend.services.telemetry_resampler import TelemetryResampler
+
+# Telemetry channels used by the cornering analysis
+CORNERING_CHANNELS = ['speed', 'accx_can', 'accy_can', 'Steering_Angle']
+DRIVER_INPUT_CHANNELS = ['pbrake_f', 'aps']
 
 
 class AMICOSEngine:
     """Advanced physics-based cornering optimization system."""
     
     def __init__(self):
-        self.data_dir = Path("data")
+        self.repository = get_session_repository()
+        self.resampler = TelemetryResampler(self.repository)
         self.vehicle_specs = GR86_CUP_SPECS
         self.track_data = TRACK_DATA
         
@@ -29,37 +39,44 @@ class AMICOSEngine:
         self.mu_dry = 1.1  # coefficient of friction (Michelin Cup 2)
         self.g = 9.81  # m/s²
         
+    @stored_result("amicos")
     def analyze_cornering_performance(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Complete cornering analysis with momentum optimization."""
-        telemetry = self._load_telemetry(track_name, session)
-        
-        if telemetry.empty:
+        if not self.repository.has_telemetry(track_name, session):
             return {"error": "No telemetry data available"}
         
-        driver_data = telemetry[telemetry['vehicle_id'] == driver_id]
+        # Cornering channels are logged independently; align them on one time base
+        # so the same row index refers to the same instant in every channel
+        aligned = self.resampler.resample(track_name, session, driver_id, CORNERING_CHANNELS)
+        channels = self.repository.load_channels(track_name, session, driver_id, DRIVER_INPUT_CHANNELS)
         
-        if driver_data.empty:
+        if aligned.empty and not channels:
             return {"error": f"No data for driver {driver_id}"}
         
         # Extract sensor data
-        speed_data = self._extract_channel(driver_data, 'speed')  # km/h
-        accx_data = self._extract_channel(driver_data, 'accx_can')  # longitudinal G
-        accy_data = self._extract_channel(driver_data, 'accy_can')  # lateral G
-        steering_data = self._extract_channel(driver_data, 'Steering_Angle')
-        
-        # Detect corners
-        corners = self._detect_corners(speed_data, accy_data, steering_data)
-        
-        # Analyze each corner
-        corner_analysis = []
-        for corner in corners:
-            analysis = self._analyze_single_corner(
-                corner, speed_data, accx_data, accy_data, steering_data
-            )
-            corner_analysis.append(analysis)
+        speed_data = self._aligned_channel(aligned, 'speed')  # km/h
+        accx_data = self._aligned_channel(aligned, 'accx_can')  # longitudinal G
+        accy_data = self._aligned_channel(aligned, 'accy_can')  # lateral G
+        steering_data = self._aligned_channel(aligned, 'Steering_Angle')
+        
+        # Locate corners: catalog corners of the track when available, else detect them
+        catalog = get_corner_catalog(track_name)
+        passes = self._catalog_corners(catalog, aligned) if catalog else None
+        if passes is not None:
+            corners, corner_index, corner_laps = passes
+        else:
+            corners = self._detect_corners(speed_data, accy_data, steering_data)
+        
+        # Analyze every corner at once
+        corner_analysis = self._analyze_corners(corners, speed_data, accx_data, accy_data)
+        if passes is not None:
+            corner_analysis = [
+                {"corner_id": catalog["corners"][index]["id"], "lap": lap, **metrics}
+                for index, lap, metrics in zip(corner_index.tolist(), corner_laps.tolist(), corner_analysis)
+            ]
         
         # Calculate driver DNA
-        driver_dna = self._calculate_driver_dna(corner_analysis, driver_data)
+        driver_dna = self._calculate_driver_dna(corner_analysis, channels)
         
         # Grip utilization analysis
         grip_analysis = self._analyze_grip_utilization(accx_data, accy_data)
@@ -67,131 +84,147 @@ class AMICOSEngine:
         # Momentum efficiency
         momentum_efficiency = self._calculate_momentum_efficiency(corner_analysis)
         
-        return {
+        result = {
             "driver_id": driver_id,
-            "corners_detected": len(corners),
+            "corners_detected": len(corners.start),
+            "corner_source": "catalog" if passes is not None else "detected",
             "corner_analysis": corner_analysis[:5],  # Top 5 corners
             "driver_dna": driver_dna,
             "grip_utilization": grip_analysis,
             "momentum_efficiency": momentum_efficiency,
             "recommendations": self._generate_recommendations(corner_analysis, driver_dna)
         }
+        if passes is not None:
+            result["corner_summary"] = self._summarize_catalog_corners(catalog, corner_analysis)
+        return result
     
     def _detect_corners(self, speed_data: pd.Series, accy_data: pd.Series, 
-                       steering_data: pd.Series) -> List[Dict]:
+                       steering_data: pd.Series) -> Segments:
         """Detect corners using lateral G-force and steering angle."""
         if accy_data.empty:
-            return []
+            return runs(np.zeros(0, dtype=bool))
         
         # Corner = high lateral G (>0.4G) + significant steering input
         lateral_g_threshold = 0.4
-        corner_mask = abs(accy_data) > lateral_g_threshold
-        
-        # Find corner regions
-        corners = []
-        in_corner = False
-        corner_start = 0
-        
-        for idx, is_cornering in enumerate(corner_mask):
-            if is_cornering and not in_corner:
-                corner_start = idx
-                in_corner = True
-            elif not is_cornering and in_corner:
-                corner_end = idx
-                if corner_end - corner_start > 10:  # Minimum 10 data points
-                    corners.append({
-                        'start_idx': corner_start,
-                        'end_idx': corner_end,
-                        'apex_idx': corner_start + (corner_end - corner_start) // 2
-                    })
-                in_corner = False
-        
-        return corners
-    
-    def _analyze_single_corner(self, corner: Dict, speed_data: pd.Series,
-                               accx_data: pd.Series, accy_data: pd.Series,
-                               steering_data: pd.Series) -> Dict[str, Any]:
-        """Analyze a single corner with physics-based metrics."""
-        start_idx = corner['start_idx']
-        end_idx = corner['end_idx']
-        apex_idx = corner['apex_idx']
-        
-        # Extract corner data
-        corner_speed = speed_data.iloc[start_idx:end_idx]
-        corner_accx = accx_data.iloc[start_idx:end_idx]
-        corner_accy = accy_data.iloc[start_idx:end_idx]
-        corner_steering = steering_data.iloc[start_idx:end_idx]
+        lateral_g = np.nan_to_num(np.abs(accy_data.to_numpy(dtype=np.float64)), nan=0.0)  # NaN ends a corner
         
-        # Entry, apex, exit speeds (km/h)
-        entry_speed = corner_speed.iloc[0] if len(corner_speed) > 0 else 0
-        apex_speed = corner_speed.iloc[len(corner_speed)//2] if len(corner_speed) > 0 else 0
-        exit_speed = corner_speed.iloc[-1] if len(corner_speed) > 0 else 0
-        
-        # Convert to m/s for physics calculations
-        entry_speed_ms = entry_speed / 3.6
-        apex_speed_ms = apex_speed / 3.6
-        exit_speed_ms = exit_speed / 3.6
-        
-        # Maximum lateral G in corner
-        max_lateral_g = abs(corner_accy).max() if not corner_accy.empty else 0
-        
-        # Calculate corner radius from speed and lateral acceleration
-        # a_lateral = v² / r  →  r = v² / a_lateral
-        if max_lateral_g > 0.1:
-            corner_radius = (apex_speed_ms ** 2) / (max_lateral_g * self.g)
-        else:
-            corner_radius = 100  # default
-        
-        # Theoretical maximum speed for this corner
-        # V_max = sqrt(μ × g × R)
-        theoretical_max_speed_ms = np.sqrt(self.mu_dry * self.g * corner_radius)
-        theoretical_max_speed_kmh = theoretical_max_speed_ms * 3.6
-        
-        # Momentum analysis
-        # Linear momentum: p = m × v
-        entry_momentum = self.mass_kg * entry_speed_ms
-        apex_momentum = self.mass_kg * apex_speed_ms
-        exit_momentum = self.mass_kg * exit_speed_ms
-        
-        # Angular momentum (simplified): L = I × ω
-        # ω (yaw rate) ≈ v / r
-        if corner_radius > 0:
-            apex_yaw_rate = apex_speed_ms / corner_radius
-            angular_momentum = self.moment_of_inertia * apex_yaw_rate
-        else:
-            apex_yaw_rate = 0
-            angular_momentum = 0
-        
-        # Weight transfer calculation
-        # Lateral load transfer: ΔF = (m × a_y × h) / t
-        # where h = CG height, t = track width
-        if max_lateral_g > 0:
-            lateral_load_transfer = (self.mass_kg * max_lateral_g * self.g * self.cg_height_m) / self.track_width_m
-        else:
-            lateral_load_transfer = 0
-        
-        # Grip utilization (% of traction circle)
-        # Combined acceleration: a_total = sqrt(a_x² + a_y²)
-        if not corner_accx.empty and not corner_accy.empty:
-            combined_g = np.sqrt(corner_accx**2 + corner_accy**2)
-            max_combined_g = combined_g.max()
-            grip_utilization = (max_combined_g / self.mu_dry) * 100
-        else:
-            max_combined_g = 0
-            grip_utilization = 0
+        # Find corner regions: more than 10 data points, and ended before the data does
+        return runs(lateral_g > lateral_g_threshold, min_length=11, include_open=False)
+    
+    def _catalog_corners(self, catalog: Dict[str, Any],
+                         aligned: pd.DataFrame) -> Optional[Tuple[Segments, np.ndarray, np.ndarray]]:
+        """Passes through the track's catalog corners, or None if no complete lap maps onto it."""
+        if aligned.empty or 'speed' not in aligned.columns:
+            return None
+        
+        passes = corner_passes(catalog, aligned['timestamp'].to_numpy(),
+                               aligned['speed'].to_numpy(dtype=np.float64), aligned['lap'].to_numpy())
+        return passes if len(passes[0].start) > 0 else None
+    
+    def _summarize_catalog_corners(self, catalog: Dict[str, Any],
+                                   corner_analysis: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Per catalog corner: how often it was driven and its best and average figures."""
+        passes = pd.DataFrame(corner_analysis)
+        summary = passes.groupby('corner_id').agg(
+            best_apex_speed_kmh=('apex_speed_kmh', 'max'),
+            avg_apex_speed_kmh=('apex_speed_kmh', 'mean'),
+            avg_exit_speed_kmh=('exit_speed_kmh', 'mean'),
+            avg_speed_efficiency_pct=('speed_efficiency_pct', 'mean'),
+            avg_grip_utilization_pct=('grip_utilization_pct', 'mean')
+        ).round(1)
+        counts = passes['corner_id'].value_counts()
+        
+        return [
+            {"corner_id": corner["id"], "passes": int(counts[corner["id"]]), **summary.loc[corner["id"]].to_dict()}
+            for corner in catalog["corners"]
+            if corner["id"] in counts.index
+        ]
+    
+    def _analyze_corners(self, corners: Segments, speed_data: pd.Series,
+                         accx_data: pd.Series, accy_data: pd.Series) -> List[Dict[str, Any]]:
+        """Physics-based metrics of every corner, computed with segment reductions.
+        
+        Each corner spans samples [start, end) of the aligned channels with its
+        apex at ``peak``. Maxima skip NaN like pandas does, and NaN or infinite
+        results are reported as 0.
+        """
+        start, end = corners.start, corners.end
+        if len(start) == 0:
+            return []
         
-        # Speed efficiency (% of theoretical max)
-        speed_efficiency = (apex_speed / theoretical_max_speed_kmh * 100) if theoretical_max_speed_kmh > 0 else 0
+        # Reduction bounds: even entries open a corner, odd entries close it
+        bounds = np.empty(2 * len(start), dtype=np.intp)
+        bounds[0::2], bounds[1::2] = start, end
         
-        # Momentum efficiency (exit vs entry)
-        momentum_gain = ((exit_momentum - entry_momentum) / entry_momentum * 100) if entry_momentum > 0 else 0
+        def corner_max(values: np.ndarray) -> np.ndarray:
+            # A trailing NaN lets the last corner end at the last sample
+            return np.fmax.reduceat(np.append(values, np.nan), bounds)[0::2]
         
-        # Helper to safely round and handle NaN
-        def safe_round(value, decimals=1):
-            return round(float(value), decimals) if not np.isnan(value) and not np.isinf(value) else 0.0
+        accy = accy_data.to_numpy(dtype=np.float64)
         
-        return {
-            "corner_number": len(corner_speed),
+        # Entry, apex, exit speeds (km/h)
+        if speed_data.empty:
+            corner_length = np.zeros(len(start), dtype=np.int64)
+            entry_speed = apex_speed = exit_speed = np.zeros(len(start))
+        else:
+            speed = speed_data.to_numpy(dtype=np.float64)
+            corner_length = end - start
+            entry_speed = speed[start]
+            apex_speed = speed[corners.peak]
+            exit_speed = speed[end - 1]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Convert to m/s for physics calculations
+            entry_speed_ms = entry_speed / 3.6
+            apex_speed_ms = apex_speed / 3.6
+            exit_speed_ms = exit_speed / 3.6
+            
+            # Maximum lateral G in corner
+            max_lateral_g = corner_max(np.abs(accy))
+            
+            # Corner radius from speed and lateral acceleration: r = v² / a_lateral
+            corner_radius = np.where(max_lateral_g > 0.1,
+                                     (apex_speed_ms ** 2) / (max_lateral_g * self.g), 100.0)
+            
+            # Theoretical maximum speed for this corner: V_max = sqrt(μ × g × R)
+            theoretical_max_speed_kmh = np.sqrt(self.mu_dry * self.g * corner_radius) * 3.6
+            
+            # Linear momentum: p = m × v
+            entry_momentum = self.mass_kg * entry_speed_ms
+            exit_momentum = self.mass_kg * exit_speed_ms
+            
+            # Angular momentum (simplified): L = I × ω, with yaw rate ω ≈ v / r
+            apex_yaw_rate = np.where(corner_radius > 0, apex_speed_ms / corner_radius, 0.0)
+            angular_momentum = np.where(corner_radius > 0, self.moment_of_inertia * apex_yaw_rate, 0.0)
+            
+            # Lateral load transfer: ΔF = (m × a_y × h) / t
+            lateral_load_transfer = np.where(
+                max_lateral_g > 0,
+                (self.mass_kg * max_lateral_g * self.g * self.cg_height_m) / self.track_width_m, 0.0
+            )
+            
+            # Grip utilization (% of traction circle) from combined acceleration
+            if accx_data.empty:
+                max_combined_g = grip_utilization = np.zeros(len(start))
+            else:
+                accx = accx_data.to_numpy(dtype=np.float64)
+                max_combined_g = corner_max(np.sqrt(accx**2 + accy**2))
+                grip_utilization = (max_combined_g / self.mu_dry) * 100
+            
+            # Speed efficiency (% of theoretical max)
+            speed_efficiency = np.where(theoretical_max_speed_kmh > 0,
+                                        apex_speed / theoretical_max_speed_kmh * 100, 0.0)
+            
+            # Momentum efficiency (exit vs entry)
+            momentum_gain = np.where(entry_momentum > 0,
+                                     (exit_momentum - entry_momentum) / entry_momentum * 100, 0.0)
+        
+        def safe_round(values: np.ndarray, decimals: int = 1) -> List[float]:
+            # Python's round() per value, so results match the scalar computation
+            return [round(value, decimals) for value in np.where(np.isfinite(values), values, 0.0).tolist()]
+        
+        columns = {
+            "corner_number": corner_length.tolist(),
             "entry_speed_kmh": safe_round(entry_speed, 1),
             "apex_speed_kmh": safe_round(apex_speed, 1),
             "exit_speed_kmh": safe_round(exit_speed, 1),
@@ -206,14 +239,15 @@ class AMICOSEngine:
             "lateral_load_transfer_n": safe_round(lateral_load_transfer, 1),
             "momentum_gain_pct": safe_round(momentum_gain, 1)
         }
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
     
-    def _calculate_driver_dna(self, corner_analysis: List[Dict], driver_data: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_driver_dna(self, corner_analysis: List[Dict], channels: Dict[str, ChannelData]) -> Dict[str, Any]:
         """Calculate unique driver fingerprint/DNA."""
         if not corner_analysis:
             return {"message": "Insufficient corner data"}
         
         # Braking signature
-        brake_data = self._extract_channel(driver_data, 'pbrake_f')
+        brake_data = self._extract_channel(channels, 'pbrake_f')
         if not brake_data.empty and len(brake_data) > 0:
             avg_brake_pressure = brake_data[brake_data > 2].mean()
             max_brake_pressure = brake_data.quantile(0.99)
@@ -222,7 +256,7 @@ class AMICOSEngine:
             brake_aggression = 50
         
         # Throttle signature
-        throttle_data = self._extract_channel(driver_data, 'aps')
+        throttle_data = self._extract_channel(channels, 'aps')
         if not throttle_data.empty and len(throttle_data) > 0:
             avg_throttle = throttle_data[throttle_data > 10].mean()
             throttle_std = throttle_data.std()
@@ -340,25 +374,22 @@ class AMICOSEngine:
         
         return recommendations[:5]  # Top 5 recommendations
     
-    def _extract_channel(self, driver_data: pd.DataFrame, channel_name: str) -> pd.Series:
-        """Extract a specific telemetry channel."""
-        channel_data = driver_data[driver_data['telemetry_name'] == channel_name]
-        return channel_data['telemetry_value'] if not channel_data.empty else pd.Series()
+    def _aligned_channel(self, aligned: pd.DataFrame, channel_name: str) -> pd.Series:
+        """Get one column of the time-aligned cornering matrix."""
+        return aligned[channel_name] if channel_name in aligned.columns else pd.Series(dtype=float)
     
-    def _load_telemetry(self, track_name: str, session: str) -> pd.DataFrame:
-        """Load telemetry data."""
-        track_base = track_name.split("_")[0]
-        possible_dirs = [
-            self.data_dir / track_name / track_name.replace("_", "-"),
-            self.data_dir / track_name / track_name,
-            self.data_dir / track_name / track_base,
-        ]
-        
-        for track_dir in possible_dirs:
-            if track_dir.exists():
-                # Try both naming patterns
-                for pattern in [f"{session}_*_telemetry_data.csv", f"{session}_*_telemetry.csv"]:
-                    for telemetry_file in track_dir.glob(pattern):
-                        return pd.read_csv(telemetry_file, nrows=200000)  # Increased for corner detection
-        
-        return pd.DataFrame()
+    def _extract_channel(self, channels: Dict[str, ChannelData], channel_name: str) -> pd.Series:
+        """Extract a specific telemetry channel as a Series."""
+        channel = channels.get(channel_name)
+        return channel.to_series() if channel is not None else pd.Series(dtype=float)
+
+
+_engine = None
+
+
+def analyze_cornering_performance(track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
+    """Module-level entry point for the CPU process pool, with one engine per process."""
+    global _engine
+    if _engine is None:
+        _engine = AMICOSEngine()
+    return _engine.analyze_cornering_performance(track_name, session, driver_id)
@@ -0,0 +1,138 @@
+"""Arrow IPC encoding of array-heavy analysis results."""
+from typing import Any, Dict, Optional
+
+import numpy as np
+import orjson
+import pyarrow as pa
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Schema metadata key holding a result's non-tabular fields as JSON
+FIELDS_METADATA_KEY = b"fields"
+
+
+def accepts_arrow(accept: Optional[str]) -> bool:
+    """Check whether an Accept header ranks Arrow IPC at least as high as JSON.
+
+    Wildcards and a missing header keep the JSON default.
+    """
+    if not accept:
+        return False
+
+    quality = {}
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality[media_type.lower()] = q
+
+    arrow_q = quality.get(ARROW_STREAM, 0.0)
+    return arrow_q > 0 and arrow_q >= quality.get("application/json", 0.0)
+
+
+def records_table(result: Dict[str, Any], key: str, index_name: str = "key") -> Optional[pa.Table]:
+    """Table from one array field of a result; the remaining fields go to schema metadata.
+
+    The field may be a list of scalars (one column named after the field), a
+    list of records, or a mapping of id -> record (the id becomes ``index_name``).
+
+    Returns:
+        None if the result has no such field
+    """
+    rows = result.get(key)
+    if rows is None:
+        return None
+
+    if isinstance(rows, dict):
+        table = pa.Table.from_pylist([{index_name: name, **record} for name, record in rows.items()])
+    elif rows and isinstance(rows[0], dict):
+        table = pa.Table.from_pylist(rows)
+    else:
+        table = pa.table({key: pa.array(rows)})
+    return _with_fields(table, {name: value for name, value in result.items() if name != key})
+
+
+def columns_table(result: Dict[str, Any], key: str) -> Optional[pa.Table]:
+    """Table from a field holding equal-length arrays (column name -> values).
+
+    Returns:
+        None if the result has no such field
+    """
+    columns = result.get(key)
+    if columns is None:
+        return None
+
+    table = pa.table({name: pa.array(np.asarray(values)) for name, values in columns.items()})
+    return _with_fields(table, {name: value for name, value in result.items() if name != key})
+
+
+def overlay_table(result: Dict[str, Any]) -> Optional[pa.Table]:
+    """Long-format (lap_index, distance_m, one column per channel) table from a lap overlay.
+
+    Lap details, envelopes and the other fields go to schema metadata.
+    """
+    matrix = result.get("matrix")
+    if matrix is None:
+        return None
+
+    laps, bins, _ = matrix.shape
+    columns = {
+        "lap_index": np.repeat(np.arange(laps, dtype=np.int16), bins),
+        "distance_m": np.tile(np.asarray(result["distance_m"], dtype=np.float32), laps),
+    }
+    for c, name in enumerate(result["channels"]):
+        columns[name] = np.ascontiguousarray(matrix[:, :, c]).ravel()
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    return _with_fields(table, {name: value for name, value in result.items() if name != "matrix"})
+
+
+def traces_table(result: Dict[str, Any]) -> Optional[pa.Table]:
+    """Long-format (channel, t, v) table from a lap trace result.
+
+    Per-channel level details and the other fields go to schema metadata.
+    """
+    channels = result.get("channels")
+    if channels is None:
+        return None
+
+    names = list(channels)
+    counts = [len(trace["t"]) for trace in channels.values()]
+    codes = np.repeat(np.arange(len(names), dtype=np.int16), counts)
+    table = pa.table({
+        "channel": pa.DictionaryArray.from_arrays(codes, pa.array(names, type=pa.string())),
+        "t": _float32_column(trace["t"] for trace in channels.values()),
+        "v": _float32_column(trace["v"] for trace in channels.values()),
+    })
+
+    fields = {name: value for name, value in result.items() if name != "channels"}
+    fields["channels"] = {
+        name: {detail: value for detail, value in trace.items() if detail not in ("t", "v")}
+        for name, trace in channels.items()
+    }
+    return _with_fields(table, fields)
+
+
+def ipc_stream(table: pa.Table) -> bytes:
+    """Serialize a table as an Arrow IPC stream."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _float32_column(parts) -> pa.Array:
+    """Concatenate per-channel lists into one float32 column (seconds and sensor values fit)."""
+    arrays = [np.asarray(part, dtype=np.float32) for part in parts]
+    return pa.array(np.concatenate(arrays) if arrays else np.empty(0, dtype=np.float32))
+
+
+def _with_fields(table: pa.Table, fields: Dict[str, Any]) -> pa.Table:
+    """Attach the scalar fields of a result to the table schema (numpy arrays as lists, NaN as null)."""
+    metadata = orjson.dumps(fields, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return table.replace_schema_metadata({FIELDS_METADATA_KEY: metadata})
@@ -0,0 +1,207 @@
+"""Memory-mapped per-channel telemetry arrays shared across worker processes."""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.services.telemetry_store import TelemetryStore
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+# name -> (filename, little-endian dtype)
+ARRAY_FILES = {
+    "timestamps": ("timestamps.i8", "<i8"),  # epoch nanoseconds (UTC)
+    "values": ("values.f4", "<f4"),
+    "laps": ("laps.i4", "<i4"),
+}
+
+
+class ChannelData(NamedTuple):
+    """Samples of one telemetry channel for one vehicle.
+
+    Arrays are read-only views into the memory-mapped session files when the
+    session has been built, so slicing them never copies. ``offset`` is the
+    position of the first sample in the session arrays and keeps row labels
+    distinct between channels when wrapped in a Series.
+    """
+    timestamps: np.ndarray
+    values: np.ndarray
+    laps: np.ndarray
+    offset: int = 0
+
+    def to_series(self) -> pd.Series:
+        """Values as a float64 Series for analysis (stored values are float32)."""
+        return pd.Series(
+            self.values.astype(np.float64, copy=False),
+            index=pd.RangeIndex(self.offset, self.offset + len(self.values)),
+            copy=False
+        )
+
+
+class _MappedSession:
+    """Open memory maps and the offset index for one session."""
+
+    def __init__(self, session_dir: Path):
+        index_path = session_dir / INDEX_FILE
+        self.index_mtime_ns = index_path.stat().st_mtime_ns
+        with open(index_path) as f:
+            self.index = json.load(f)
+
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, spec in self.index["arrays"].items():
+            if self.index["rows"] == 0:
+                self.arrays[name] = np.empty(0, dtype=spec["dtype"])
+            else:
+                self.arrays[name] = np.memmap(
+                    session_dir / spec["file"], dtype=spec["dtype"], mode="r",
+                    shape=(self.index["rows"],)
+                )
+
+    def channel(self, vehicle_id: str, channel: str) -> Optional[ChannelData]:
+        """Views into the session arrays for one vehicle/channel."""
+        span = self.index["vehicles"].get(vehicle_id, {}).get(channel)
+        if span is None:
+            return None
+        offset, count = span
+        window = slice(offset, offset + count)
+        return ChannelData(
+            self.arrays["timestamps"][window],
+            self.arrays["values"][window],
+            self.arrays["laps"][window],
+            offset
+        )
+
+
+class ChannelArrayStore:
+    """Raw little-endian arrays per session, sliced per (vehicle, channel).
+
+    Layout on disk::
+
+        {root}/{track}/{session}/timestamps.i8   epoch-ns timestamps
+        {root}/{track}/{session}/values.f4       telemetry values (float32)
+        {root}/{track}/{session}/laps.i4         lap numbers
+        {root}/{track}/{session}/index.json      vehicle -> channel -> [offset, count]
+
+    Samples are stored contiguously per (vehicle, channel) in their original
+    order. Files are opened with ``numpy.memmap`` so every worker process
+    shares the same OS page cache instead of holding its own DataFrame copy.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or os.getenv("CHANNEL_ARRAYS_DIR", "data/_arrays"))
+        self._sessions: Dict[tuple, _MappedSession] = {}
+        self._lock = threading.Lock()
+
+    def session_dir(self, track_name: str, session: str) -> Path:
+        """Directory holding the arrays for one session."""
+        return self.root / track_name / session
+
+    def index_path(self, track_name: str, session: str) -> Path:
+        """Path of a session's offset index."""
+        return self.session_dir(track_name, session) / INDEX_FILE
+
+    def has_session(self, track_name: str, session: str) -> bool:
+        """Check whether arrays have been built for a session."""
+        return self.index_path(track_name, session).exists()
+
+    def list_vehicles(self, track_name: str, session: str) -> List[str]:
+        """Vehicle IDs with arrays in a session."""
+        mapped = self._open(track_name, session)
+        if mapped is None:
+            return []
+        return sorted(mapped.index["vehicles"])
+
+    def list_channels(self, track_name: str, session: str, vehicle_id: str) -> List[str]:
+        """Channel names available for one vehicle."""
+        mapped = self._open(track_name, session)
+        if mapped is None:
+            return []
+        return sorted(mapped.index["vehicles"].get(vehicle_id, {}))
+
+    def get_channel(self, track_name: str, session: str, vehicle_id: str,
+                    channel: str) -> Optional[ChannelData]:
+        """Zero-copy views of one vehicle's channel, or None if absent."""
+        mapped = self._open(track_name, session)
+        if mapped is None:
+            return None
+        return mapped.channel(vehicle_id, channel)
+
+    def build_from_store(self, store: TelemetryStore, track_name: str, session: str) -> int:
+        """Write the array layout for an ingested session, one vehicle at a time.
+
+        The new files are written to a temporary directory and swapped in, so
+        processes that already mapped the old files keep valid views.
+
+        Returns:
+            Number of samples written
+        """
+        session_dir = self.session_dir(track_name, session)
+        tmp_dir = session_dir.with_name(f"{session}.tmp-{os.getpid()}")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        handles = {name: open(tmp_dir / filename, "wb") for name, (filename, _) in ARRAY_FILES.items()}
+        vehicles: Dict[str, Dict[str, List[int]]] = {}
+        rows = 0
+
+        try:
+            for vehicle_id in store.list_vehicles(track_name, session):
+                telemetry = store.read(track_name, session, vehicle_ids=[vehicle_id])
+                if telemetry.empty:
+                    continue
+
+                vehicles[vehicle_id] = {}
+                for channel, group in telemetry.groupby("telemetry_name", observed=True, sort=True):
+                    count = len(group)
+                    columns = {
+                        "timestamps": group["timestamp"].to_numpy(),
+                        "values": group["telemetry_value"].to_numpy(),
+                        "laps": group["lap"].to_numpy(),
+                    }
+                    for name, (_, dtype) in ARRAY_FILES.items():
+                        handles[name].write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+
+                    vehicles[vehicle_id][str(channel)] = [rows, count]
+                    rows += count
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        index = {
+            "version": INDEX_VERSION,
+            "track": track_name,
+            "session": session,
+            "rows": rows,
+            "arrays": {name: {"file": filename, "dtype": dtype} for name, (filename, dtype) in ARRAY_FILES.items()},
+            "vehicles": vehicles,
+        }
+        with open(tmp_dir / INDEX_FILE, "w") as f:
+            json.dump(index, f)
+
+        if session_dir.exists():
+            shutil.rmtree(session_dir)
+        tmp_dir.rename(session_dir)
+        return rows
+
+    def _open(self, track_name: str, session: str) -> Optional[_MappedSession]:
+        """Map a session's arrays, reopening them if the session was rebuilt."""
+        index_path = self.index_path(track_name, session)
+        try:
+            mtime_ns = index_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        key = (track_name, session)
+        with self._lock:
+            mapped = self._sessions.get(key)
+            if mapped is None or mapped.index_mtime_ns != mtime_ns:
+                mapped = _MappedSession(index_path.parent)
+                self._sessions[key] = mapped
+            return mapped
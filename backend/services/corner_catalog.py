@@ -0,0 +1,224 @@
+"""Per-track corner catalog: corners located by lap distance on a reference lap.
+
+The catalog is built once per track from a clean reference lap and stored in
+``CORNER_CATALOG`` (see ``scripts/build_corner_catalog.py``). Any driver's
+samples are then mapped onto it by lap distance, so "C4" is the same piece of
+track for every driver and lap.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.config.vehicle_specs import CORNER_CATALOG, TRACK_DATA
+from backend.services.lap_distance import LAP_LENGTH_TOLERANCE, MAX_REFERENCE_CANDIDATES, integrate_lap_distance
+from backend.services.segmentation import Segments, peak_indices, threshold_runs
+from backend.services.session_repository import SessionRepository, get_session_repository
+from backend.services.telemetry_resampler import TelemetryResampler
+
+CATALOG_CHANNELS = ['speed', 'accy_can']
+
+# Corner detection on the reference lap (lateral G with hysteresis)
+CORNER_ENTER_G = 0.4
+CORNER_EXIT_G = 0.25
+MIN_CORNER_LENGTH_M = 20.0
+
+# A pass must come this close to the catalog apex to count
+APEX_TOLERANCE_M = 15.0
+
+
+def get_corner_catalog(track_name: str) -> Optional[Dict[str, Any]]:
+    """Stored catalog for a track, or None."""
+    return CORNER_CATALOG.get(track_name)
+
+
+class CornerCatalogBuilder:
+    """Detects a track's corners on a reference lap."""
+
+    def __init__(self, repository: Optional[SessionRepository] = None):
+        self.repository = repository or get_session_repository()
+        self.resampler = TelemetryResampler(self.repository)
+
+    def build(self, track_name: str, sessions: Iterable[str], driver_id: Optional[str] = None,
+              lap: Optional[int] = None) -> Dict[str, Any]:
+        """Build the catalog from the fastest usable lap of the given sessions.
+
+        A lap is usable when its speed trace covers the lap time and its
+        integrated length is plausible for the track.
+
+        Args:
+            track_name: Name of the track
+            sessions: Sessions to pick the reference lap from
+            driver_id: Restrict the reference to one vehicle
+            lap: Use this lap of ``driver_id`` as the reference
+
+        Returns:
+            Catalog with 'lap_length_m', 'reference' and 'corners'
+        """
+        for session, vehicle, lap_number, lap_time in self._candidates(track_name, sessions, driver_id, lap):
+            aligned = self.resampler.resample(track_name, session, vehicle, CATALOG_CHANNELS, lap=lap_number)
+            if aligned.empty or not set(CATALOG_CHANNELS) <= set(aligned.columns):
+                continue
+
+            timestamps = aligned['timestamp'].to_numpy()
+            speed = aligned['speed'].to_numpy(dtype=np.float64)
+            distance = integrate_lap_distance(timestamps, speed, aligned['lap'].to_numpy())
+            if not self._usable(track_name, timestamps, speed, distance, lap_time):
+                continue
+
+            lap_length = float(distance[-1])
+            return {
+                "lap_length_m": round(lap_length, 1),
+                "reference": {
+                    "session": session,
+                    "driver_id": vehicle,
+                    "lap": lap_number,
+                    "lap_time_s": round(lap_time, 3)
+                },
+                "corners": detect_lap_corners(distance, speed, aligned['accy_can'].to_numpy(dtype=np.float64))
+            }
+
+        return {"error": f"No usable reference lap for {track_name}"}
+
+    def _candidates(self, track_name: str, sessions: Iterable[str], driver_id: Optional[str],
+                    lap: Optional[int]) -> List[Tuple[str, str, int, float]]:
+        """(session, vehicle, lap, lap time) of the fastest laps, fastest first."""
+        tables = []
+        for session in sessions:
+            lap_times = self.repository.load_lap_times(track_name, session)
+            if lap_times.empty:
+                continue
+            table = lap_times[['vehicle_id', 'lap', 'lap_time']].astype({'vehicle_id': str})
+            tables.append(table.assign(session=session))
+        if not tables:
+            return []
+
+        laps = pd.concat(tables, ignore_index=True)
+        laps = laps[laps['lap_time'] > 0]
+        if driver_id is not None:
+            laps = laps[laps['vehicle_id'] == driver_id]
+        if lap is not None:
+            laps = laps[laps['lap'] == lap]
+
+        laps = laps.drop_duplicates(['session', 'vehicle_id', 'lap']).nsmallest(MAX_REFERENCE_CANDIDATES, 'lap_time')
+        return list(zip(laps['session'], laps['vehicle_id'], laps['lap'].astype(int), laps['lap_time'].astype(float)))
+
+    @staticmethod
+    def _usable(track_name: str, timestamps: np.ndarray, speed: np.ndarray, distance: np.ndarray,
+                lap_time: float) -> bool:
+        """Whether a lap's trace is complete enough to locate corners on."""
+        if len(timestamps) < 2 or np.isnan(speed).mean() > 0.05:
+            return False
+        if (timestamps[-1] - timestamps[0]) / 1e9 < 0.95 * lap_time:
+            return False
+
+        length_km = TRACK_DATA.get(track_name, {}).get('length_km')
+        if length_km:
+            return abs(distance[-1] / (length_km * 1000) - 1) <= LAP_LENGTH_TOLERANCE
+        return True
+
+
+def detect_lap_corners(distance: np.ndarray, speed: np.ndarray, accy: np.ndarray) -> List[Dict[str, Any]]:
+    """Corners of one lap, located by distance from the start line.
+
+    A corner still in progress at the end of the lap is joined with the one
+    open at its start, giving ``start_m`` past ``end_m``.
+    """
+    lateral_g = np.nan_to_num(np.abs(accy), nan=0.0)
+    segments = threshold_runs(lateral_g, CORNER_ENTER_G, CORNER_EXIT_G)
+    bounds = [[int(s), int(e) - 1, int(p)] for s, e, p in zip(*segments)]
+
+    if len(bounds) > 1 and bounds[0][0] == 0 and bounds[-1][1] == len(distance) - 1:
+        first, last = bounds.pop(0), bounds[-1]
+        last[1] = first[1]
+        if lateral_g[first[2]] > lateral_g[last[2]]:
+            last[2] = first[2]
+
+    lap_length = distance[-1]
+    corners = []
+    for start, end, apex in bounds:
+        if (distance[end] - distance[start]) % lap_length < MIN_CORNER_LENGTH_M:
+            continue
+        corners.append({
+            "id": f"C{len(corners) + 1}",
+            "start_m": round(float(distance[start]), 1),
+            "apex_m": round(float(distance[apex]), 1),
+            "end_m": round(float(distance[end]), 1),
+            "apex_speed_kmh": round(float(np.nan_to_num(speed[apex])), 1),
+            "max_lateral_g": round(float(lateral_g[apex]), 2)
+        })
+    return corners
+
+
+def lap_positions(lap_length: float, distance: np.ndarray, laps: np.ndarray) -> np.ndarray:
+    """Position of every sample on a lap of ``lap_length`` metres.
+
+    Each lap's integrated distance is scaled to the catalog length, which
+    absorbs speed sensor drift and line choice. Samples of laps that are not
+    close to a full lap (out laps, partial laps) are NaN.
+    """
+    if len(distance) == 0:
+        return np.zeros(0)
+
+    lap_start = np.flatnonzero(np.r_[True, laps[1:] != laps[:-1]])
+    lap_end = np.r_[lap_start[1:], len(laps)]
+    totals = np.repeat(distance[lap_end - 1], lap_end - lap_start)
+
+    complete = np.abs(totals / lap_length - 1) <= LAP_LENGTH_TOLERANCE
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(complete, distance / totals * lap_length, np.nan)
+
+
+def corner_passes(catalog: Dict[str, Any], timestamps: np.ndarray, speed: np.ndarray,
+                  laps: np.ndarray) -> Tuple[Segments, np.ndarray, np.ndarray]:
+    """Map a driver's time-aligned samples onto catalog corners.
+
+    Args:
+        catalog: Corner catalog of the track
+        timestamps: Epoch nanoseconds of the aligned samples
+        speed: Speed (km/h) at each sample
+        laps: Lap number of each sample
+
+    Returns:
+        Segments of every pass through a corner (``peak`` is the sample
+        nearest the catalog apex), the catalog index of each pass's corner and
+        the lap it was driven on
+    """
+    lap_length = catalog["lap_length_m"]
+    laps = np.asarray(laps)
+    if not catalog["corners"] or len(laps) == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return Segments(empty, empty, empty), empty, laps[:0]
+
+    position = lap_positions(lap_length, integrate_lap_distance(timestamps, speed, laps), laps)
+
+    starts = np.array([c["start_m"] for c in catalog["corners"]], dtype=np.float64)
+    ends = np.array([c["end_m"] for c in catalog["corners"]], dtype=np.float64)
+    apexes = np.array([c["apex_m"] for c in catalog["corners"]], dtype=np.float64)
+
+    # Corners crossing the start line become two intervals: to the line and from it
+    wraps = np.flatnonzero(starts > ends)
+    interval_start = np.r_[starts, np.zeros(len(wraps))]
+    interval_end = np.r_[np.where(starts > ends, lap_length, ends), ends[wraps]]
+    interval_corner = np.r_[np.arange(len(starts)), wraps]
+    order = np.argsort(interval_start, kind='stable')
+    interval_start, interval_end, interval_corner = interval_start[order], interval_end[order], interval_corner[order]
+
+    # NaN positions sort past every interval start and fail the end check
+    slot = np.maximum(np.searchsorted(interval_start, position, side='right') - 1, 0)
+    inside = (position >= interval_start[slot]) & (position <= interval_end[slot])
+    corner = np.where(inside, interval_corner[slot], -1)
+
+    # One pass per run of samples in the same corner
+    boundaries = np.flatnonzero(np.r_[True, corner[1:] != corner[:-1], True])
+    start, end = boundaries[:-1], boundaries[1:]
+    start, end = start[corner[start] >= 0], end[corner[start] >= 0]
+
+    # Apex: the sample closest to the catalog apex, measured around the lap
+    offset = np.abs(position - apexes[np.maximum(corner, 0)]) % lap_length
+    apex_distance = np.minimum(offset, lap_length - offset)
+    peak = peak_indices(-apex_distance, start, end)
+
+    keep = apex_distance[peak] <= APEX_TOLERANCE_M
+    start, end, peak = start[keep], end[keep], peak[keep]
+    return Segments(start, end, peak), corner[start], laps[peak]
@@ -0,0 +1,42 @@
+"""Peak-preserving decimation of telemetry series."""
+import numpy as np
+
+
+def extrema_indices(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Indices of the minimum and the maximum sample of every group.
+
+    Args:
+        groups: Integer group label of every sample, in any order
+        values: Sample values; NaN samples are never selected
+
+    Returns:
+        Sorted, unique sample indices (at most two per group)
+    """
+    groups = np.asarray(groups)
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) == 0:
+        return valid
+
+    # Sort by group, then value: each group's first sample is its min, its last the max
+    order = valid[np.lexsort((values[valid], groups[valid]))]
+    sorted_groups = groups[order]
+    first = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    last = np.r_[first[1:], len(order)] - 1
+    return np.unique(np.concatenate([order[first], order[last]]))
+
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """Reduce one series to about max_points samples, keeping its extremes.
+
+    The series is split into max_points / 2 equal-count buckets and the min
+    and max of each are kept, together with the first and last sample, so
+    peaks survive any reduction ratio.
+    """
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(max_points // 2, 1)
+    groups = np.arange(n, dtype=np.int64) * buckets // n
+    return np.union1d(extrema_indices(groups, values), [0, n - 1])
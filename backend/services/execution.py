@@ -0,0 +1,218 @@
+"""Bounded thread and process pools for running blocking work off the event loop."""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple:
+    """Run fn in a worker and report when it started and finished (wall clock)."""
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return result, started, time.time()
+
+
+class ExecutionPool:
+    """An executor with a fixed concurrency limit and queue metrics.
+
+    At most ``max_workers`` calls run at once; further calls wait in the
+    executor queue, which is reported as ``queued`` along with the wait and
+    run times of completed calls.
+    """
+
+    def __init__(self, name: str, kind: str, max_workers: int):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queued = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        """The underlying executor, created on first use."""
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    # spawn: the parent has threads and open memory maps that fork would copy
+                    context = multiprocessing.get_context('spawn')
+                    self._executor = ProcessPoolExecutor(self.max_workers, mp_context=context)
+                else:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"{self.name}-pool")
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the pool without blocking the event loop.
+
+        Process pools need fn, its arguments and its result to be picklable.
+        """
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        with self._lock:
+            self.submitted += 1
+            self.max_queued = max(self.max_queued, self._queued())
+
+        try:
+            result, started, finished = await loop.run_in_executor(
+                self.executor, _timed_call, fn, args, kwargs
+            )
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+            self._wait_seconds += max(started - submitted_at, 0.0)
+            self._run_seconds += finished - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Concurrency, queue depth and timing counters."""
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "active": min(self._in_flight(), self.max_workers),
+                "queued": self._queued(),
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(self._wait_seconds / done * 1000, 2),
+                "avg_run_ms": round(self._run_seconds / done * 1000, 2),
+            }
+
+    def shutdown(self):
+        """Stop the workers (a later call starts new ones)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _in_flight(self) -> int:
+        return self.submitted - self.completed - self.failed
+
+    def _queued(self) -> int:
+        return max(self._in_flight() - self.max_workers, 0)
+
+
+class SingleFlight:
+    """Let concurrent identical calls share one in-flight computation.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task instead of submitting their own. The
+    task is shielded, so a disconnecting client does not cancel the work for
+    the others. Results are shared objects and must be treated as read-only.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def run(self, key: Optional[Hashable], start: Callable[[], Any]) -> Any:
+        """Await the in-flight task for key, or start one with start().
+
+        A None key (unhashable arguments) always runs its own call.
+        """
+        if not self.enabled or key is None:
+            return await start()
+
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(key)
+            if task is not None:
+                self.deduplicated += 1
+            else:
+                task = asyncio.ensure_future(start())
+                self._tasks[key] = task
+                task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls seen, calls that joined an in-flight one, and current in-flight keys."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._tasks),
+                "calls": self.calls,
+                "deduplicated": self.deduplicated,
+                "dedup_rate": round(self.deduplicated / self.calls, 4) if self.calls else 0.0,
+            }
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter went away
+
+
+def _call_key(fn: Callable, args: tuple, kwargs: dict) -> Optional[Hashable]:
+    """Identity of a call, or None if its arguments aren't hashable."""
+    owner = getattr(fn, '__self__', None)
+    key = (
+        id(owner) if owner is not None else None,
+        getattr(fn, '__module__', None),
+        getattr(fn, '__qualname__', repr(fn)),
+        args,
+        tuple(sorted(kwargs.items()))
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _cpu_pool() -> ExecutionPool:
+    """Process pool for CPU-bound analyses; a thread pool when EXECUTOR_CPU_WORKERS=0."""
+    workers = int(os.getenv('EXECUTOR_CPU_WORKERS', '2'))
+    if workers <= 0:
+        return ExecutionPool('cpu', 'thread', int(os.getenv('EXECUTOR_IO_WORKERS', '8')))
+    return ExecutionPool('cpu', 'process', workers)
+
+
+io_pool = ExecutionPool('io', 'thread', int(os.getenv('EXECUTOR_IO_WORKERS', '8')))
+cpu_pool = _cpu_pool()
+single_flight = SingleFlight(os.getenv('EXECUTOR_COALESCE', 'true').lower() == 'true')
+
+
+async def run_io(fn: Callable, *args, **kwargs) -> Any:
+    """Run blocking I/O (file/S3 loads, light pandas work) on the I/O thread pool.
+
+    Identical concurrent calls share one execution (see SingleFlight).
+    """
+    return await single_flight.run(_call_key(fn, args, kwargs), lambda: io_pool.run(fn, *args, **kwargs))
+
+
+async def run_cpu(fn: Callable, *args, **kwargs) -> Any:
+    """Run a CPU-heavy, picklable analysis on the process pool.
+
+    Identical concurrent calls share one execution (see SingleFlight).
+    """
+    return await single_flight.run(_call_key(fn, args, kwargs), lambda: cpu_pool.run(fn, *args, **kwargs))
+
+
+def execution_stats() -> Dict[str, Any]:
+    """Stats of every pool, keyed by name, and of request coalescing."""
+    stats = {pool.name: pool.stats() for pool in (io_pool, cpu_pool)}
+    stats["coalescing"] = single_flight.stats()
+    return stats
+
+
+def shutdown_pools():
+    """Stop every pool's workers."""
+    for pool in (io_pool, cpu_pool):
+        pool.shutdown()
@@ -0,0 +1,104 @@
+"""Session-wide metrics for every driver, computed in one grouped pass."""
+import numpy as np
+import pandas as pd
+from typing import Dict, Any
+from backend.services.result_store import stored_result
+from backend.services.session_repository import get_session_repository
+
+# Fewer laps than this give no degradation estimate (as in StrategyEngine)
+MIN_DEGRADATION_LAPS = 5
+
+
+class FieldAnalyzer:
+    """Performance, consistency and tire degradation of the whole field.
+
+    Produces the same metrics as the per-driver endpoints
+    (LapAnalyzer.analyze_driver_performance, StrategyEngine.analyze_consistency
+    and StrategyEngine.predict_tire_degradation) from a single load of the lap
+    table, with groupby aggregations instead of one filter per driver.
+    """
+
+    def __init__(self):
+        self.repository = get_session_repository()
+
+    @stored_result("field")
+    def analyze_field(self, track_name: str, session: str) -> Dict[str, Any]:
+        """Per-driver performance, consistency and degradation for a session."""
+        lap_times = self.repository.load_lap_times(track_name, session)
+
+        if lap_times.empty:
+            return {"error": "No lap time data available"}
+
+        laps = lap_times.loc[lap_times['lap_time'] > 0, ['vehicle_id', 'lap', 'lap_time']]
+        laps = laps.sort_values('lap', kind='stable')
+        codes, driver_ids = pd.factorize(laps['vehicle_id'], sort=True)
+        groups = len(driver_ids)
+        lap_time = laps['lap_time'].to_numpy(dtype=np.float64)
+
+        # Per-driver sums via bincount: one pass over the lap table per statistic
+        count = np.bincount(codes, minlength=groups)
+        average = np.bincount(codes, weights=lap_time, minlength=groups) / count
+        best = np.full(groups, np.inf)
+        np.minimum.at(best, codes, lap_time)
+        last = np.zeros(groups, dtype=np.int64)
+        np.maximum.at(last, codes, np.arange(len(codes)))
+
+        deviation = lap_time - average[codes]
+        squares = np.bincount(codes, weights=deviation * deviation, minlength=groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std_sample = np.sqrt(squares / (count - 1))
+        std_population = np.sqrt(squares / count)
+        within_05s = np.bincount(codes, weights=lap_time <= best[codes] + 0.5, minlength=groups)
+        slope = self._degradation_slopes(laps['lap'].to_numpy(dtype=np.float64), deviation, codes, count)
+
+        field = {}
+        for i, driver_id in enumerate(driver_ids):
+            n = int(count[i])
+            best_lap = float(best[i])
+            avg_lap = float(average[i])
+            variation = std_sample[i] / avg_lap * 100 if avg_lap > 0 else 0
+            cv = std_population[i] / avg_lap * 100 if avg_lap > 0 else 0
+
+            field[driver_id] = {
+                "performance": {
+                    "best_lap": best_lap,
+                    "average_lap": avg_lap,
+                    "std_deviation": float(std_sample[i]),
+                    "consistency_score": float(100 - variation),
+                    "total_laps": n
+                },
+                "consistency": {
+                    "consistency_score": float(within_05s[i] / n * 100),
+                    "coefficient_of_variation": float(cv),
+                    "std_deviation": float(std_population[i]),
+                    "laps_within_05s": int(within_05s[i])
+                },
+                "tire_degradation": {
+                    "degradation_rate_per_lap": float(slope[i]),
+                    "current_delta": float(lap_time[last[i]] - best_lap),
+                    "laps_analyzed": n
+                } if n >= MIN_DEGRADATION_LAPS else None
+            }
+
+        return {
+            "track": track_name,
+            "session": session,
+            "driver_count": len(field),
+            "drivers": field
+        }
+
+    @staticmethod
+    def _degradation_slopes(laps: np.ndarray, lap_time_deviation: np.ndarray,
+                            codes: np.ndarray, count: np.ndarray) -> np.ndarray:
+        """Least-squares slope of lap time over lap number per driver, in closed form.
+
+        slope = sum(dx * dy) / sum(dx^2) with dx, dy the deviations from the
+        driver's means; the slope of lap time equals that of the delta to the
+        best lap. Drivers with a single distinct lap number get 0.
+        """
+        groups = len(count)
+        lap_deviation = laps - (np.bincount(codes, weights=laps, minlength=groups) / count)[codes]
+        sxy = np.bincount(codes, weights=lap_deviation * lap_time_deviation, minlength=groups)
+        sxx = np.bincount(codes, weights=lap_deviation * lap_deviation, minlength=groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(sxx > 0, sxy / sxx, 0.0)
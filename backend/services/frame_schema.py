@@ -0,0 +1,120 @@
+"""Compact column types applied to session tables at load time."""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Pseudo dtype for timestamps parsed once into int64 epoch nanoseconds (UTC)
+EPOCH_NS = 'epoch_ns'
+
+# All race data exports use ISO-8601 UTC timestamps (e.g. 2025-09-06T18:40:41.273Z)
+TIMESTAMP_FORMAT = 'ISO8601'
+
+
+@dataclass(frozen=True)
+class FrameSchema:
+    """Column types for one kind of session table.
+
+    IDs and channel names become categoricals, sensor values float32 and
+    timestamps int64 epoch nanoseconds. Columns that are not listed (meta_*,
+    expire_at, original_vehicle_id, ...) are dropped unless ``keep_unlisted``
+    is set for tables whose layout varies between exports.
+    """
+    name: str
+    columns: Dict[str, str] = field(default_factory=dict)
+    keep_unlisted: bool = False
+
+    def csv_dtypes(self) -> Dict[str, str]:
+        """Types to hand to the CSV parser (timestamps are parsed afterwards)."""
+        return {c: ('str' if t == EPOCH_NS else t) for c, t in self.columns.items()}
+
+    def read_csv(self, source, **kwargs) -> pd.DataFrame:
+        """Parse a CSV straight into the compact layout."""
+        frame = pd.read_csv(
+            source,
+            usecols=None if self.keep_unlisted else list(self.columns),
+            dtype=self.csv_dtypes(),
+            **kwargs
+        )
+        return self.apply(frame)
+
+    def apply(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Cast an already loaded frame to the schema, dropping unlisted columns."""
+        if not self.keep_unlisted:
+            frame = frame[[c for c in self.columns if c in frame.columns]]
+        frame = frame.copy()
+
+        for column, dtype in self.columns.items():
+            if column not in frame.columns:
+                continue
+            if dtype == EPOCH_NS:
+                if frame[column].dtype != np.int64:
+                    frame[column] = to_epoch_ns(frame[column])
+            elif frame[column].dtype != dtype:
+                frame[column] = frame[column].astype(dtype)
+        return frame
+
+
+def to_epoch_ns(values) -> np.ndarray:
+    """Parse ISO-8601 strings (or datetimes) into int64 epoch nanoseconds."""
+    parsed = pd.to_datetime(values, utc=True, format=TIMESTAMP_FORMAT)
+    return pd.DatetimeIndex(parsed).as_unit('ns').asi8
+
+
+def sensor_float(value) -> float:
+    """A float32 sensor reading as the Python float it was logged as (180.424, not 180.4239959...)."""
+    return float(str(np.float32(value)))
+
+
+def frame_nbytes(frame: pd.DataFrame) -> int:
+    """Resident size of a frame, including Python string objects."""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+LAP_EVENTS = FrameSchema('lap_events', {
+    'vehicle_id': 'category',
+    'lap': 'int32',
+    'timestamp': EPOCH_NS,
+})
+
+TELEMETRY = FrameSchema('telemetry', {
+    'vehicle_id': 'category',
+    'telemetry_name': 'category',
+    'telemetry_value': 'float32',
+    'lap': 'int32',
+    'timestamp': EPOCH_NS,
+})
+
+SECTIONS = FrameSchema('sections', {
+    'vehicle_id': 'category',
+}, keep_unlisted=True)
+
+SCHEMAS = {schema.name: schema for schema in (LAP_EVENTS, TELEMETRY, SECTIONS)}
+
+
+def schema_savings(csv_path: Path, schema: FrameSchema, chunk_rows: int = 500000,
+                   max_rows: Optional[int] = None) -> Dict[str, int]:
+    """Compare the resident size of a CSV loaded as-is and through a schema.
+
+    The file is processed in chunks, so the report can be produced for
+    session files that would not fit in memory with default types.
+
+    Returns:
+        Dict with rows, raw_bytes, compact_bytes and saved_bytes
+    """
+    rows = raw_bytes = compact_bytes = 0
+    with pd.read_csv(csv_path, chunksize=chunk_rows, nrows=max_rows) as reader:
+        for chunk in reader:
+            rows += len(chunk)
+            raw_bytes += frame_nbytes(chunk)
+            compact_bytes += frame_nbytes(schema.apply(chunk))
+
+    return {
+        "rows": rows,
+        "raw_bytes": raw_bytes,
+        "compact_bytes": compact_bytes,
+        "saved_bytes": raw_bytes - compact_bytes,
+    }
+
@@ -3,18 +3,19 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Any
-import os
+from backend.services.result_store import stored_result
+from backend.services.session_repository import get_session_repository
 
 class LapAnalyzer:
     """Analyzes lap times and sector performance."""
     
     def __init__(self):
         self.data_dir = Path("data")
-        self.use_s3 = os.getenv('USE_S3_DATA', 'false').lower() == 'true'
+        self.repository = get_session_repository()
+        self.use_s3 = self.repository.use_s3
         
         if self.use_s3:
-            from backend.services.s3_data_loader import S3DataLoader
-            self.s3_loader = S3DataLoader()
+            self.s3_loader = self.repository.s3_loader
     
     def get_available_tracks(self) -> List[str]:
         """Get list of available tracks."""
@@ -42,19 +43,7 @@ class LapAnalyzer:
                 raise ValueError(f"Track {track_name} not found")
             return sorted(sessions)
         
-        # Try multiple directory patterns
-        track_base = track_name.split("_")[0]  # e.g., "barber" from "barber_motorsports_park"
-        possible_dirs = [
-            self.data_dir / track_name / track_name.replace("_", "-"),
-            self.data_dir / track_name / track_name,
-            self.data_dir / track_name / track_base,  # e.g., data/barber_motorsports_park/barber
-        ]
-        
-        track_dir = None
-        for d in possible_dirs:
-            if d.exists():
-                track_dir = d
-                break
+        track_dir = self.repository.resolve_track_dir(track_name)
         
         if not track_dir:
             raise ValueError(f"Track {track_name} not found")
@@ -75,7 +64,7 @@ class LapAnalyzer:
     
     def get_drivers(self, track_name: str, session: str) -> List[str]:
         """Get list of drivers for a session."""
-        lap_times = self._load_lap_times(track_name, session)
+        lap_times = self.repository.load_lap_times(track_name, session)
         
         if lap_times.empty:
             return []
@@ -83,9 +72,10 @@ class LapAnalyzer:
         drivers = sorted(lap_times['vehicle_id'].unique().tolist())
         return drivers
     
+    @stored_result("best_lap")
     def calculate_best_lap(self, track_name: str, session: str) -> Dict[str, Any]:
         """Calculate theoretical best lap from combined best sectors."""
-        lap_times = self._load_lap_times(track_name, session)
+        lap_times = self.repository.load_lap_times(track_name, session)
         
         if lap_times.empty:
             return {"error": "No lap time data available"}
@@ -113,9 +103,10 @@ class LapAnalyzer:
             "session": session
         }
     
+    @stored_result("driver_performance")
     def analyze_driver_performance(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Comprehensive driver performance analysis."""
-        lap_times = self._load_lap_times(track_name, session)
+        lap_times = self.repository.load_lap_times(track_name, session)
         
         if lap_times.empty:
             return {"error": "No data available"}
@@ -149,9 +140,10 @@ class LapAnalyzer:
             "lap_times": driver_laps['lap_time'].tolist()
         }
     
+    @stored_result("sectors")
     def analyze_sectors(self, track_name: str, session: str) -> Dict[str, Any]:
         """Sector-by-sector analysis."""
-        sections = self._load_sections(track_name, session)
+        sections = self.repository.load_sections(track_name, session)
         
         if sections.empty:
             return {"message": "Sector data not available for this track"}
@@ -166,86 +158,3 @@ class LapAnalyzer:
             }
         
         return {"sector_analysis": sector_analysis}
-    
-    def _load_lap_times(self, track_name: str, session: str) -> pd.DataFrame:
-        """Load lap time data."""
-        if self.use_s3:
-            # Load from S3
-            start_df = self.s3_loader.load_lap_times(track_name, session, "lap_start")
-            if start_df is None:
-                return pd.DataFrame()
-            
-            # Try to load lap end file
-            end_df = self.s3_loader.load_lap_times(track_name, session, "lap_end")
-            
-            if start_df is not None and end_df is not None:
-                # Merge on vehicle_id and lap
-                start_df['start_time'] = pd.to_datetime(start_df['timestamp'])
-                end_df['end_time'] = pd.to_datetime(end_df['timestamp'])
-                
-                merged = pd.merge(
-                    start_df[['vehicle_id', 'lap', 'start_time']],
-                    end_df[['vehicle_id', 'lap', 'end_time']],
-                    on=['vehicle_id', 'lap'],
-                    how='inner'
-                )
-                
-                merged['lap_time'] = (merged['end_time'] - merged['start_time']).dt.total_seconds()
-                # Filter out invalid times (lap time should be at least 60 seconds for a race track)
-                return merged[(merged['lap_time'] > 60) & (merged['lap_time'] < 300)]
-            
-            return pd.DataFrame()
-        
-        # Load from local files
-        # Try multiple directory patterns
-        track_base = track_name.split("_")[0]  # e.g., "barber" from "barber_motorsports_park"
-        possible_dirs = [
-            self.data_dir / track_name / track_name.replace("_", "-"),
-            self.data_dir / track_name / track_name,
-            self.data_dir / track_name / track_base,  # e.g., data/barber_motorsports_park/barber
-        ]
-        
-        for track_dir in possible_dirs:
-            if track_dir.exists():
-                # Try to load lap start and end files to calculate lap times
-                lap_start_files = list(track_dir.glob(f"{session}_*_lap_start.csv"))
-                lap_end_files = list(track_dir.glob(f"{session}_*_lap_end.csv"))
-                
-                if lap_start_files and lap_end_files:
-                    start_df = pd.read_csv(lap_start_files[0])
-                    end_df = pd.read_csv(lap_end_files[0])
-                    
-                    # Merge on vehicle_id and lap
-                    start_df['start_time'] = pd.to_datetime(start_df['timestamp'])
-                    end_df['end_time'] = pd.to_datetime(end_df['timestamp'])
-                    
-                    merged = pd.merge(
-                        start_df[['vehicle_id', 'lap', 'start_time']],
-                        end_df[['vehicle_id', 'lap', 'end_time']],
-                        on=['vehicle_id', 'lap'],
-                        how='inner'
-                    )
-                    
-                    merged['lap_time'] = (merged['end_time'] - merged['start_time']).dt.total_seconds()
-                    # Filter out invalid times (lap time should be at least 60 seconds for a race track)
-                    return merged[(merged['lap_time'] > 60) & (merged['lap_time'] < 300)]
-        
-        return pd.DataFrame()
-    
-    def _load_sections(self, track_name: str, session: str) -> pd.DataFrame:
-        """Load section/sector data."""
-        # Try multiple directory patterns
-        track_base = track_name.split("_")[0]
-        possible_dirs = [
-            self.data_dir / track_name / track_name.replace("_", "-"),
-            self.data_dir / track_name / track_name,
-            self.data_dir / track_name / track_base,
-        ]
-        
-        for track_dir in possible_dirs:
-            if track_dir.exists():
-                section_file = track_dir / f"23_AnalysisEnduranceWithSections_{session.replace('R', 'Race ')}_Anonymized.CSV"
-                if section_file.exists():
-                    return pd.read_csv(section_file)
-        
-        return pd.DataFrame()
@@ -0,0 +1,300 @@
+"""Distance travelled along the lap, integrated from speed, and time deltas between laps."""
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from backend.config.vehicle_specs import CORNER_CATALOG
+from backend.services.lap_analyzer import LapAnalyzer
+from backend.services.result_store import stored_result
+from backend.services.session_repository import SessionRepository, get_session_repository
+
+# Laps whose integrated length is further than this from the reference's are not compared
+LAP_LENGTH_TOLERANCE = 0.1
+
+# A reference lap's speed trace must cover this share of its timed lap
+MIN_LAP_COVERAGE = 0.95
+
+# Reference laps are picked from at most this many of the fastest laps
+MAX_REFERENCE_CANDIDATES = 50
+
+DEFAULT_RESOLUTION_M = 5.0
+
+
+def integrate_lap_distance(timestamps: np.ndarray, speed_kmh: np.ndarray, laps: np.ndarray) -> np.ndarray:
+    """Cumulative distance (m) from the first sample of each lap.
+
+    Trapezoidal integration of speed over time, restarting at every lap
+    change. Intervals touching a NaN speed add no distance.
+
+    Args:
+        timestamps: Epoch nanoseconds, ascending
+        speed_kmh: Speed at each timestamp (km/h)
+        laps: Lap number of each sample
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    speed = np.asarray(speed_kmh, dtype=np.float64)
+    laps = np.asarray(laps)
+    if len(timestamps) == 0:
+        return np.zeros(0)
+
+    dt_s = np.diff(timestamps) / 1e9
+    step = (speed[1:] + speed[:-1]) / 2 / 3.6 * dt_s
+    step[np.isnan(step) | (laps[1:] != laps[:-1])] = 0.0
+    distance = np.concatenate([[0.0], np.cumsum(step)])
+
+    # Subtract the running total at each lap's first sample
+    lap_start = np.flatnonzero(np.r_[True, laps[1:] != laps[:-1]])
+    first_of_lap = np.zeros(len(laps), dtype=np.int64)
+    first_of_lap[lap_start] = lap_start
+    np.maximum.accumulate(first_of_lap, out=first_of_lap)
+    return distance - distance[first_of_lap]
+
+
+class LapTrace(NamedTuple):
+    """Elapsed time against distance for one lap."""
+    elapsed_s: np.ndarray   # seconds since the lap's first speed sample
+    distance_m: np.ndarray  # metres since the lap's first speed sample, non-decreasing
+
+    @property
+    def length_m(self) -> float:
+        return float(self.distance_m[-1])
+
+    @property
+    def duration_s(self) -> float:
+        return float(self.elapsed_s[-1])
+
+
+class DistanceTrace(NamedTuple):
+    """Speed-integrated lap distance of one vehicle's session."""
+    timestamps: np.ndarray   # epoch ns of the speed samples, ascending
+    distance_m: np.ndarray   # metres from the first sample of the sample's lap
+    lap_numbers: np.ndarray  # lap of each run of samples
+    lap_start: np.ndarray    # first sample of each run
+    lap_end: np.ndarray      # one past the last sample of each run
+
+    def lap(self, lap: int) -> Optional[LapTrace]:
+        """Views of one lap's samples, or None if it has fewer than two."""
+        found = np.flatnonzero(self.lap_numbers == lap)
+        if len(found) == 0:
+            return None
+        window = slice(self.lap_start[found[0]], self.lap_end[found[0]])
+        timestamps = self.timestamps[window]
+        if len(timestamps) < 2:
+            return None
+        return LapTrace((timestamps - timestamps[0]) / 1e9, self.distance_m[window])
+
+    def session_distance(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Distance from the first sample of the session, and where each run of samples starts on it.
+
+        Unlike ``distance_m`` it never resets, so it can be searched across laps.
+        """
+        lengths = self.distance_m[self.lap_end - 1]
+        offsets = np.r_[0.0, np.cumsum(lengths)[:-1]]
+        return self.distance_m + np.repeat(offsets, self.lap_end - self.lap_start), offsets
+
+
+class ReferenceLap(NamedTuple):
+    """A lap sampled on a distance grid, ready to compare other laps against."""
+    session: str
+    driver_id: str
+    lap: int
+    length_m: float
+    duration_s: float
+    grid_m: np.ndarray      # 0 .. length_m in resolution steps, length_m included
+    elapsed_s: np.ndarray   # time of the reference at each grid point
+
+
+class LapDistanceService:
+    """Lap distance traces and time deltas between laps.
+
+    A vehicle's distance trace is integrated once per session and cached in
+    the session repository; reference laps are cached on their distance grid,
+    so every comparison against one reference costs a single ``np.interp``.
+    """
+
+    def __init__(self, repository: Optional[SessionRepository] = None):
+        self.repository = repository or get_session_repository()
+        self.lap_analyzer = LapAnalyzer()
+
+    def distance_trace(self, track_name: str, session: str, driver_id: str) -> Optional[DistanceTrace]:
+        """Cumulative distance per lap for every speed sample of a vehicle (cached)."""
+        return self.repository.get_or_compute(
+            ('lap_distance', track_name, session, driver_id),
+            lambda: self.repository.telemetry_version(track_name, session),
+            lambda: self._build_distance_trace(track_name, session, driver_id)
+        )
+
+    def lap_trace(self, track_name: str, session: str, driver_id: str, lap: int) -> Optional[LapTrace]:
+        """Elapsed time and distance of one lap, or None without speed data."""
+        trace = self.distance_trace(track_name, session, driver_id)
+        return trace.lap(lap) if trace is not None else None
+
+    def reference_lap(self, track_name: str, session: str, driver_id: Optional[str] = None,
+                      lap: Optional[int] = None,
+                      resolution_m: float = DEFAULT_RESOLUTION_M) -> Optional[ReferenceLap]:
+        """A lap on its distance grid (cached); the session best when no lap is given."""
+        if driver_id is None or lap is None:
+            best = self.session_best_lap(track_name, session)
+            if best is None:
+                return None
+            driver_id, lap = best
+
+        return self.repository.get_or_compute(
+            ('delta_reference', track_name, session, driver_id, lap, resolution_m),
+            lambda: self.repository.telemetry_version(track_name, session),
+            lambda: self._build_reference(track_name, session, driver_id, lap, resolution_m)
+        )
+
+    def session_best_lap(self, track_name: str, session: str) -> Optional[Tuple[str, int]]:
+        """(driver, lap) of the session's fastest lap with a complete speed trace (cached).
+
+        This is the ``calculate_best_lap`` lap when its telemetry is available,
+        otherwise the next fastest one that has it.
+        """
+        return self.repository.get_or_compute(
+            ('session_best_lap', track_name, session),
+            lambda: self.repository.session_version(track_name, session),
+            lambda: self._find_session_best(track_name, session)
+        )
+
+    def covers_lap(self, track_name: str, session: str, driver_id: str, lap: int, lap_time: float) -> bool:
+        """Whether a lap's speed trace spans (nearly) its whole timed lap."""
+        trace = self.lap_trace(track_name, session, driver_id, lap)
+        return trace is not None and trace.duration_s >= MIN_LAP_COVERAGE * lap_time
+
+    @stored_result("time_delta", session_arg="ref_session")
+    def time_delta(self, track_name: str, session: str, driver_id: str, lap_number: int,
+                   ref_driver: Optional[str] = None, ref_lap: Optional[int] = None,
+                   ref_session: Optional[str] = None,
+                   resolution_m: float = DEFAULT_RESOLUTION_M) -> Dict[str, Any]:
+        """Running time gained or lost against a reference lap, along the lap.
+
+        Both laps are scaled to the reference lap's length, so speed sensor
+        differences between cars don't shift corners. A positive delta means
+        the lap is behind the reference at that point.
+
+        Args:
+            track_name: Name of the track
+            session: Session of the compared lap
+            driver_id: Vehicle ID of the compared lap
+            lap_number: Compared lap
+            ref_driver: Vehicle of the reference lap (session best if None)
+            ref_lap: Reference lap number (session best if None)
+            ref_session: Session of the reference lap (defaults to ``session``)
+            resolution_m: Spacing of the distance grid in metres
+        """
+        if (ref_driver is None) != (ref_lap is None):
+            return {"error": "ref_driver and ref_lap must be given together"}
+        if resolution_m <= 0:
+            return {"error": "resolution_m must be positive"}
+        ref_session = ref_session or session
+
+        reference = self.reference_lap(track_name, ref_session, ref_driver, ref_lap, resolution_m)
+        if reference is None:
+            return {"error": f"No reference lap with telemetry in {ref_session}"}
+
+        compared = self.lap_trace(track_name, session, driver_id, lap_number)
+        if compared is None:
+            return {"error": f"No speed data for lap {lap_number}"}
+        if abs(compared.length_m / reference.length_m - 1) > LAP_LENGTH_TOLERANCE:
+            return {"error": f"Lap {lap_number} is not a complete lap "
+                             f"({compared.length_m:.0f} m vs {reference.length_m:.0f} m)"}
+
+        scale = reference.length_m / compared.length_m
+        delta = np.interp(reference.grid_m, compared.distance_m * scale, compared.elapsed_s) - reference.elapsed_s
+
+        worst = int(np.argmax(delta))
+        best = int(np.argmin(delta))
+        result = {
+            "track": track_name,
+            "lap": self._describe(session, driver_id, lap_number, compared.length_m, compared.duration_s),
+            "reference": self._describe(reference.session, reference.driver_id, reference.lap,
+                                        reference.length_m, reference.duration_s),
+            "resolution_m": resolution_m,
+            "final_delta_s": round(float(delta[-1]), 3),
+            "max_behind": {"distance_m": round(float(reference.grid_m[worst]), 1),
+                           "delta_s": round(float(delta[worst]), 3)},
+            "max_ahead": {"distance_m": round(float(reference.grid_m[best]), 1),
+                          "delta_s": round(float(delta[best]), 3)},
+            "trace": {
+                "distance_m": np.round(reference.grid_m, 1),
+                "delta_s": np.round(delta, 3)
+            }
+        }
+
+        catalog = CORNER_CATALOG.get(track_name)
+        if catalog:
+            result["corners"] = self._corner_deltas(catalog, reference, delta)
+        return result
+
+    @staticmethod
+    def _describe(session: str, driver_id: str, lap: int, length_m: float, duration_s: float) -> Dict[str, Any]:
+        """Identity and size of a compared lap."""
+        return {
+            "session": session,
+            "driver_id": driver_id,
+            "lap": lap,
+            "length_m": round(length_m, 1),
+            "duration_s": round(duration_s, 3)
+        }
+
+    @staticmethod
+    def _corner_deltas(catalog: Dict[str, Any], reference: ReferenceLap, delta: np.ndarray) -> list:
+        """Time gained or lost between the entry and exit of each catalog corner."""
+        scale = reference.length_m / catalog["lap_length_m"]
+        starts = np.array([c["start_m"] for c in catalog["corners"]], dtype=np.float64) * scale
+        ends = np.array([c["end_m"] for c in catalog["corners"]], dtype=np.float64) * scale
+
+        # A corner across the start line adds the end of the lap to its start
+        lost = np.interp(ends, reference.grid_m, delta) - np.interp(starts, reference.grid_m, delta)
+        lost = lost + np.where(starts > ends, delta[-1], 0.0)
+        return [
+            {"corner_id": corner["id"], "time_delta_s": round(value, 3)}
+            for corner, value in zip(catalog["corners"], lost.tolist())
+        ]
+
+    def _build_distance_trace(self, track_name: str, session: str, driver_id: str) -> Optional[DistanceTrace]:
+        """Integrate a vehicle's speed channel (uncached)."""
+        speed = self.repository.load_channels(track_name, session, driver_id, ['speed']).get('speed')
+        if speed is None or len(speed.timestamps) < 2:
+            return None
+
+        timestamps, values, laps = speed.timestamps, speed.values, speed.laps
+        if np.any(np.diff(timestamps) < 0):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, values, laps = timestamps[order], values[order], laps[order]
+
+        lap_start = np.flatnonzero(np.r_[True, laps[1:] != laps[:-1]])
+        return DistanceTrace(
+            np.ascontiguousarray(timestamps, dtype=np.int64),
+            integrate_lap_distance(timestamps, values, laps),
+            np.asarray(laps[lap_start]),
+            lap_start,
+            np.r_[lap_start[1:], len(laps)]
+        )
+
+    def _build_reference(self, track_name: str, session: str, driver_id: str, lap: int,
+                         resolution_m: float) -> Optional[ReferenceLap]:
+        """Sample a lap's elapsed time on its distance grid (uncached)."""
+        trace = self.lap_trace(track_name, session, driver_id, lap)
+        if trace is None or trace.length_m <= 0:
+            return None
+
+        grid = np.r_[np.arange(0.0, trace.length_m, resolution_m), trace.length_m]
+        return ReferenceLap(session, driver_id, lap, trace.length_m, trace.duration_s,
+                            grid, np.interp(grid, trace.distance_m, trace.elapsed_s))
+
+    def _find_session_best(self, track_name: str, session: str) -> Optional[Tuple[str, int]]:
+        """Fastest timed lap whose speed trace covers it (uncached)."""
+        best = self.lap_analyzer.calculate_best_lap(track_name, session)
+        if "error" in best:
+            return None
+        if self.covers_lap(track_name, session, best["driver_id"], best["lap_number"], best["best_lap_time"]):
+            return best["driver_id"], best["lap_number"]
+
+        lap_times = self.repository.load_lap_times(track_name, session)
+        laps = lap_times[lap_times['lap_time'] > 0].nsmallest(MAX_REFERENCE_CANDIDATES, 'lap_time')
+        for driver_id, lap, lap_time in zip(laps['vehicle_id'].astype(str), laps['lap'], laps['lap_time']):
+            if self.covers_lap(track_name, session, driver_id, int(lap), float(lap_time)):
+                return driver_id, int(lap)
+        return None
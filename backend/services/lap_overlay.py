@@ -0,0 +1,185 @@
+"""Many laps resampled onto one lap-distance grid for overlay charts."""
+import os
+import warnings
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.lap_distance import LAP_LENGTH_TOLERANCE, LapDistanceService
+from backend.services.result_store import stored_result
+from backend.services.session_repository import get_session_repository
+
+OVERLAY_CHANNELS = ['speed', 'aps', 'pbrake_f']
+DEFAULT_TOP = 10
+DEFAULT_RESOLUTION_M = 10.0
+
+MAX_LAPS = int(os.getenv('OVERLAY_MAX_LAPS', '100'))
+
+
+class LapOverlayService:
+    """Builds (laps x distance bins x channels) matrices from cached distance traces.
+
+    Every lap is scaled to the session best lap's length and cut into the same
+    bins, so bin ``i`` is the same piece of track for all laps. Values are
+    read at the bin centres, one ``np.interp`` per vehicle and channel for
+    all of that vehicle's laps at once.
+    """
+
+    def __init__(self):
+        self.repository = get_session_repository()
+        self.distance = LapDistanceService(self.repository)
+
+    @stored_result("overlay")
+    def build_overlay(self, track_name: str, session: str, driver_id: Optional[str] = None,
+                      laps: Optional[Sequence[int]] = None, top: int = DEFAULT_TOP,
+                      channels: Optional[Sequence[str]] = None,
+                      resolution_m: float = DEFAULT_RESOLUTION_M) -> Dict[str, Any]:
+        """Overlay matrix and per-bin envelopes of a set of laps.
+
+        Args:
+            track_name: Name of the track
+            session: Session name (e.g., 'R1')
+            driver_id: Overlay this vehicle's complete laps; otherwise the best
+                lap of each of the ``top`` fastest vehicles
+            laps: Restrict ``driver_id`` to these lap numbers
+            top: Number of vehicles when no driver is given
+            channels: Channel names (speed, throttle and brake if None)
+            resolution_m: Bin width in metres along the lap
+
+        Returns:
+            'matrix' is float32 [lap][bin][channel] with NaN where a channel has
+            no data; 'envelopes' holds per-bin min/median/max per channel, and
+            'best' is taken from the lap that was fastest through each bin
+        """
+        if resolution_m <= 0:
+            return {"error": "resolution_m must be positive"}
+        channels = list(channels or OVERLAY_CHANNELS)
+
+        reference = self.distance.reference_lap(track_name, session)
+        if reference is None:
+            return {"error": "No lap with telemetry in this session"}
+
+        lap_times = self.repository.load_lap_times(track_name, session)
+        timed = lap_times.loc[lap_times['lap_time'] > 0, ['vehicle_id', 'lap', 'lap_time']]
+        timed = timed.astype({'vehicle_id': str}).drop_duplicates(['vehicle_id', 'lap'])
+        if driver_id is not None:
+            selection = self._driver_laps(track_name, session, timed, driver_id, laps, reference.length_m)
+        else:
+            selection = self._top_laps(track_name, session, timed, top, reference.length_m)
+        if not selection:
+            return {"error": "No complete laps with telemetry to overlay"}
+
+        bins = max(int(round(reference.length_m / resolution_m)), 1)
+        edges = np.linspace(0.0, 1.0, bins + 1)
+        centres = (edges[:-1] + edges[1:]) / 2
+
+        matrix = np.full((len(selection), bins, len(channels)), np.nan, dtype=np.float32)
+        elapsed = np.empty((len(selection), bins + 1))
+
+        rows_by_driver = defaultdict(list)
+        for row, (vehicle, _, _) in enumerate(selection):
+            rows_by_driver[vehicle].append(row)
+
+        for vehicle, rows in rows_by_driver.items():
+            trace = self.distance.distance_trace(track_name, session, vehicle)
+            session_distance, lap_offsets = trace.session_distance()
+            runs = np.array([np.flatnonzero(trace.lap_numbers == selection[row][1])[0] for row in rows])
+            lap_start = lap_offsets[runs][:, None]
+            lap_length = trace.distance_m[trace.lap_end[runs] - 1][:, None]
+            timestamps = trace.timestamps.astype(np.float64)
+
+            # Time at every bin edge and centre of all this vehicle's laps, in one search each
+            edge_times = np.interp(lap_start + edges * lap_length, session_distance, timestamps)
+            centre_times = np.interp(lap_start + centres * lap_length, session_distance, timestamps)
+            elapsed[rows] = (edge_times - edge_times[:, :1]) / 1e9
+
+            loaded = self.repository.load_channels(track_name, session, vehicle, channels)
+            for c, name in enumerate(channels):
+                channel = loaded.get(name)
+                if channel is not None and len(channel.timestamps) > 0:
+                    matrix[rows, :, c] = _values_at(channel.timestamps, channel.values, centre_times)
+
+        # Envelopes are computed channel-major so each one is a contiguous row
+        by_channel = np.ascontiguousarray(np.moveaxis(matrix, 2, 0))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN bins stay NaN
+            low, median, high = (reduce(by_channel, axis=1) for reduce in (np.nanmin, np.nanmedian, np.nanmax))
+
+        # The lap spending the least time in a bin gives that bin's best values
+        fastest = np.argmin(np.diff(elapsed, axis=1), axis=0)
+        best = np.ascontiguousarray(by_channel[:, fastest, np.arange(bins)])
+
+        return {
+            "track": track_name,
+            "session": session,
+            "lap_length_m": round(reference.length_m, 1),
+            "resolution_m": round(reference.length_m / bins, 3),
+            "channels": channels,
+            "laps": [
+                {"driver_id": vehicle, "lap": lap, "lap_time": lap_time}
+                for vehicle, lap, lap_time in selection
+            ],
+            "distance_m": np.round(centres * reference.length_m, 1),
+            "matrix": matrix,
+            "envelopes": {
+                name: {
+                    "min": low[c],
+                    "median": median[c],
+                    "max": high[c],
+                    "best": best[c]
+                }
+                for c, name in enumerate(channels)
+            },
+            "best_lap_index": fastest
+        }
+
+    def _driver_laps(self, track_name: str, session: str, timed: pd.DataFrame, driver_id: str,
+                     laps: Optional[Sequence[int]], length_m: float) -> List[Tuple[str, int, float]]:
+        """Complete laps of one vehicle, in lap order."""
+        driver_laps = timed[timed['vehicle_id'] == driver_id].sort_values('lap')
+        if laps is not None:
+            driver_laps = driver_laps[driver_laps['lap'].isin(laps)]
+
+        selection = []
+        for lap, lap_time in zip(driver_laps['lap'].astype(int), driver_laps['lap_time'].astype(float)):
+            if self._complete(track_name, session, driver_id, lap, lap_time, length_m):
+                selection.append((driver_id, lap, lap_time))
+        return selection[:MAX_LAPS]
+
+    def _top_laps(self, track_name: str, session: str, timed: pd.DataFrame, top: int,
+                  length_m: float) -> List[Tuple[str, int, float]]:
+        """Best complete lap of each of the fastest vehicles, fastest first."""
+        selection = []
+        ordered = timed.sort_values('lap_time', kind='stable')
+        for vehicle, vehicle_laps in ordered.groupby('vehicle_id', sort=False):
+            if len(selection) >= min(top, MAX_LAPS):
+                break
+            if self.distance.distance_trace(track_name, session, vehicle) is None:
+                continue
+            for lap, lap_time in zip(vehicle_laps['lap'].astype(int), vehicle_laps['lap_time'].astype(float)):
+                if self._complete(track_name, session, vehicle, lap, lap_time, length_m):
+                    selection.append((vehicle, lap, lap_time))
+                    break
+        return sorted(selection, key=lambda item: item[2])
+
+    def _complete(self, track_name: str, session: str, driver_id: str, lap: int, lap_time: float,
+                  length_m: float) -> bool:
+        """Whether a lap has a full speed trace of about the reference length."""
+        if not self.distance.covers_lap(track_name, session, driver_id, lap, lap_time):
+            return False
+        trace = self.distance.lap_trace(track_name, session, driver_id, lap)
+        return abs(trace.length_m / length_m - 1) <= LAP_LENGTH_TOLERANCE
+
+
+def _values_at(timestamps: np.ndarray, values: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Channel linearly interpolated at the given times; NaN outside its samples."""
+    if np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, values = timestamps[order], values[order]
+
+    sample_times = timestamps.astype(np.float64)
+    result = np.interp(times, sample_times, values.astype(np.float64))
+    result[(times < sample_times[0]) | (times > sample_times[-1])] = np.nan
+    return result
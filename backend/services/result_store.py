@@ -0,0 +1,227 @@
+"""Persistent store for analysis results, keyed by their inputs and versions."""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from backend.services.session_repository import get_session_repository
+
+_code_version = None
+_code_version_lock = threading.Lock()
+
+
+def code_version() -> str:
+    """Version of the analysis code: APP_CODE_VERSION, or a hash of the backend sources."""
+    global _code_version
+    if _code_version is None:
+        with _code_version_lock:
+            if _code_version is None:
+                _code_version = os.getenv('APP_CODE_VERSION') or \
+                    _hash_sources(Path(__file__).resolve().parent.parent)
+    return _code_version
+
+
+class ResultStore:
+    """Analysis results in a size-bounded SQLite database.
+
+    Each row holds one pickled, zlib-compressed result under a hash of
+    (kind, arguments, session data version, code version), so a changed input
+    file or a deploy simply stops matching old rows. Hits refresh the row's
+    access time; once the stored bytes exceed ``max_bytes`` the least recently
+    used rows are deleted. WAL mode lets worker threads and processes share
+    the file.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.path = Path(path or os.getenv('RESULT_STORE_PATH', 'data/_results/results.sqlite'))
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.getenv('RESULT_STORE_MAX_MB', '256')) * 1024 * 1024)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """A zero budget turns the store off."""
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Stored result for a key, or None."""
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                result = pickle.loads(zlib.decompress(row[0]))
+        except Exception as e:
+            print(f"Warning: result store read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return result
+
+    def put(self, key: str, kind: str, result: Any):
+        """Store a result, then evict least-recently-used rows over budget."""
+        try:
+            value = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), 1)
+            if len(value) > self.max_bytes:
+                return
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, kind, value, nbytes, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, value, len(value), now, now)
+            )
+            conn.commit()
+            evicted = self._evict(conn)
+        except Exception as e:
+            print(f"Warning: could not store {kind} result: {e}")
+            return
+
+        with self._lock:
+            self.stores += 1
+            self.evictions += evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored rows and bytes, and this process's hit counters."""
+        entries, nbytes = 0, 0
+        if self.enabled:
+            try:
+                entries, nbytes = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results").fetchone()
+            except Exception:
+                pass
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        """Delete every stored result."""
+        conn = self._connection()
+        conn.execute("DELETE FROM results")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opening the database on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, kind TEXT NOT NULL, value BLOB NOT NULL, "
+                "nbytes INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Delete the least recently used rows until the store fits the budget."""
+        total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = []
+        for key, nbytes in conn.execute("SELECT key, nbytes FROM results ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= nbytes
+        conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+        conn.commit()
+        return len(evicted)
+
+
+_store: Optional[ResultStore] = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Return the process-wide result store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+        return _store
+
+
+def stored_result(kind: str, session_arg: Optional[str] = None) -> Callable:
+    """Persist a service method's results across requests and restarts.
+
+    The method must take ``(self, track_name, session, ...)`` and depend only
+    on its arguments and the session's data files. A method that also reads
+    another session of the track names the argument holding it in
+    ``session_arg``, and that session's data version joins the key. Error
+    results are not stored, so transient failures are retried.
+    """
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, track_name: str, session: str, *args, **kwargs):
+            store = get_result_store()
+            if not store.enabled:
+                return method(self, track_name, session, *args, **kwargs)
+
+            sessions = [session]
+            if session_arg is not None:
+                other = signature.bind(self, track_name, session, *args, **kwargs).arguments.get(session_arg)
+                if other is not None and other != session:
+                    sessions.append(other)
+
+            repository = get_session_repository()
+            data_version = tuple(repository.session_version(track_name, name) for name in sessions)
+            if None in data_version:
+                return method(self, track_name, session, *args, **kwargs)
+
+            key = hashlib.sha256(repr((
+                kind, track_name, session, args, sorted(kwargs.items()), data_version, code_version()
+            )).encode()).hexdigest()
+            result = store.get(key)
+            if result is not None:
+                return result
+
+            result = method(self, track_name, session, *args, **kwargs)
+            if not (isinstance(result, dict) and "error" in result):
+                store.put(key, kind, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def _hash_sources(root: Path) -> str:
+    """Hash of every Python source under a directory."""
+    digest = hashlib.sha1()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
@@ -1,11 +1,20 @@
 """S3 Data Loader for cloud-hosted race data."""
 import boto3
+import gzip
+import json
 import pandas as pd
-from io import StringIO
+from botocore.exceptions import ClientError
+from io import BytesIO
 import os
-from typing import Optional
+from typing import Dict, Optional
 from pathlib import Path
 
+from backend.services.channel_arrays import ChannelData
+from backend.services.frame_schema import LAP_EVENTS, TELEMETRY, FrameSchema
+from backend.services.s3_disk_cache import S3DiskCache
+from backend.services.s3_manifest import S3KeyManifest
+from backend.services.telemetry_index import INDEX_SUFFIX, is_current, lap_ranges, parse_lap_ranges
+
 class S3DataLoader:
     """Load race data from AWS S3."""
     
@@ -14,65 +23,138 @@ class S3DataLoader:
         self.s3_client = boto3.client('s3')
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'apex-racing-data')
         self.base_url = f"https://{self.bucket_name}.s3.amazonaws.com"
+        self.manifest = S3KeyManifest(self.s3_client, self.bucket_name)
+        self.disk_cache = S3DiskCache()
+        self.downloads = 0
+        self.not_modified = 0
+        
+    def _download_csv_from_s3(self, s3_key: str, schema: Optional[FrameSchema] = None) -> Optional[pd.DataFrame]:
+        """Download and parse CSV from S3, going through the local disk cache.
         
-    def _get_s3_key(self, track_name: str, filename: str) -> list:
-        """Generate S3 keys for a file.
+        A cached copy whose ETag matches the bucket manifest is used without
+        contacting S3. Otherwise the object is fetched with If-None-Match, so an
+        unchanged object costs a 304 instead of a full download.
         
         Args:
-            track_name: Name of the track (e.g., 'barber_motorsports_park')
-            filename: Name of the file (e.g., 'R1_barber_lap_start.csv')
+            s3_key: S3 object key
+            schema: Compact schema to parse the CSV with (pandas defaults if None)
             
         Returns:
-            List of possible S3 keys to try
+            DataFrame if successful, None if error occurs
         """
-        # Handle different track structures
-        track_base = track_name.split("_")[0]  # e.g., "barber" from "barber_motorsports_park"
-        
-        # Extract session from filename if present (e.g., "R1" from "R1_barber_lap_start.csv")
-        session = None
-        if filename.startswith("R1") or filename.startswith("R2"):
-            session = filename[:2]
+        cached_etag = self.disk_cache.etag(s3_key)
+        if cached_etag is not None:
+            listed = self.manifest.get(s3_key)
+            if listed is not None and listed.etag == cached_etag:
+                df = self.disk_cache.load(s3_key)
+                if df is not None:
+                    return df
         
-        # Try multiple subdirectory patterns
-        possible_keys = [
-            f"data/{track_name}/{track_base}/{filename}",  # data/barber_motorsports_park/barber/file.csv
-            f"data/{track_name}/{filename}",  # data/indianapolis/file.csv
-        ]
+        try:
+            conditional = {'IfNoneMatch': cached_etag} if cached_etag else {}
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key, **conditional)
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code')
+            if code in ('304', 'NotModified'):
+                self.not_modified += 1
+                df = self.disk_cache.load(s3_key)
+                if df is not None:
+                    return df
+                return self._download_csv_from_s3_uncached(s3_key, schema)
+            if code not in ('NoSuchKey', '404'):
+                print(f"Error loading {s3_key}: {e}")
+            # Listed key deleted since the last listing
+            return None
+        except Exception as e:
+            print(f"Error loading {s3_key}: {e}")
+            return None
         
-        # Add Race 1/Race 2 patterns for COTA-style structure
-        if session:
-            race_num = session[1]  # "1" or "2"
-            possible_keys.extend([
-                f"data/{track_name}/Race {race_num}/{filename}",  # data/COTA/Race 1/file.csv
-                f"data/{track_name}/race {race_num}/{filename}",  # data/COTA/race 1/file.csv (lowercase)
-            ])
+        return self._parse_and_cache(s3_key, response, schema)
+    
+    def _download_csv_from_s3_uncached(self, s3_key: str, schema: Optional[FrameSchema]) -> Optional[pd.DataFrame]:
+        """Unconditional download, used when the cached copy vanished after a 304."""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+        except Exception as e:
+            print(f"Error loading {s3_key}: {e}")
+            return None
+        return self._parse_and_cache(s3_key, response, schema)
+    
+    def _parse_and_cache(self, s3_key: str, response: dict, schema: Optional[FrameSchema]) -> pd.DataFrame:
+        """Parse a GetObject body and keep the parsed frame on local disk."""
+        self.downloads += 1
+        body = response['Body'].read()
+        if response.get('ContentEncoding') == 'gzip':
+            # Stored compressed by upload_to_s3.py --gzip
+            body = gzip.decompress(body)
+        body = BytesIO(body)
+        df = schema.read_csv(body) if schema is not None else pd.read_csv(body)
+        self.disk_cache.store(s3_key, response.get('ETag'), df)
+        return df
+    
+    def cache_stats(self) -> Dict[str, object]:
+        """Disk cache usage plus S3 download counters."""
+        stats = self.disk_cache.stats()
+        stats.update(downloads=self.downloads, not_modified=self.not_modified)
+        return stats
+    
+    def warm_cache(self, file_types=("lap_start", "lap_end")) -> int:
+        """Fetch every session file of the given types once, e.g. on a cold instance.
         
-        return possible_keys
+        Returns:
+            Number of objects now available locally
+        """
+        warmed = 0
+        for track_name in self.get_available_tracks():
+            for session in self.get_available_sessions(track_name):
+                for file_type in file_types:
+                    s3_key = self._resolve_key(track_name, session, file_type)
+                    if s3_key is not None and self._download_csv_from_s3(s3_key, LAP_EVENTS) is not None:
+                        warmed += 1
+        return warmed
     
-    def _download_csv_from_s3(self, s3_key: str) -> Optional[pd.DataFrame]:
-        """Download and parse CSV from S3.
+    def _resolve_key(self, track_name: str, session: str, file_type: str) -> Optional[str]:
+        """Find the S3 key of a session file in the bucket manifest.
         
         Args:
-            s3_key: S3 object key
+            track_name: Name of the track
+            session: Session name (e.g., 'R1', 'R2')
+            file_type: 'lap_start', 'lap_end' or 'telemetry'
             
         Returns:
-            DataFrame if successful, None if error occurs
+            S3 key if found, None otherwise
         """
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            csv_content = response['Body'].read().decode('utf-8')
-            return pd.read_csv(StringIO(csv_content))
-        except self.s3_client.exceptions.NoSuchKey:
-            # File not found - this is expected when trying patterns
-            return None
+            return self.manifest.resolve(track_name, session, file_type)
         except Exception as e:
-            print(f"Error loading {s3_key}: {e}")
+            print(f"Error listing S3 keys: {e}")
             return None
     
+    def _etag(self, s3_key: Optional[str]) -> Optional[str]:
+        """ETag of a key as of the last manifest listing."""
+        if s3_key is None:
+            return None
+        obj = self.manifest.get(s3_key)
+        return obj.etag if obj is not None else None
+    
+    def get_lap_times_etag(self, track_name: str, session: str, file_type: str = "lap_start") -> Optional[str]:
+        """Get the ETag of a lap timing file, used to detect changed objects.
+        
+        Args:
+            track_name: Name of the track
+            session: Session name (e.g., 'R1', 'R2')
+            file_type: Type of file ('lap_start' or 'lap_end')
+            
+        Returns:
+            ETag string if the file exists, None otherwise
+        """
+        return self._etag(self._resolve_key(track_name, session, file_type))
+    
     def load_lap_times(self, track_name: str, session: str, file_type: str = "lap_start") -> Optional[pd.DataFrame]:
-        """Load lap times from S3 with pattern matching.
+        """Load lap times from S3.
         
-        Tries multiple naming patterns to handle variations in file naming.
+        The key is resolved through the bucket manifest, which knows every
+        naming variant (R1_barber_lap_start.csv, COTA_lap_start_time_R1.csv, ...).
         
         Args:
             track_name: Name of the track
@@ -82,79 +164,110 @@ class S3DataLoader:
         Returns:
             DataFrame with lap times if found, None otherwise
         """
-        track_base = track_name.split("_")[0]
-        track_upper = track_name.upper()
-        
-        # Map file_type to various naming conventions
-        file_type_variants = {
-            "lap_start": ["lap_start", "lap_start_time"],
-            "lap_end": ["lap_end", "lap_end_time"]
-        }
-        
-        variants = file_type_variants.get(file_type, [file_type])
-        
-        # Try different naming patterns for each variant
-        patterns = []
-        for variant in variants:
-            patterns.extend([
-                # Standard patterns
-                f"{session}_{track_base}_{variant}.csv",  # R1_barber_lap_start.csv
-                f"{session}_{track_name}_{variant}.csv",  # R1_indianapolis_lap_start.csv
-                f"{session}_{track_name.replace('_', '-')}_{variant}.csv",  # R1_road-america_lap_start.csv
-                
-                # Full track name patterns
-                f"{session}_indianapolis_motor_speedway_{variant}.csv",
-                f"{session}_circuit_of_the_americas_{variant}.csv",
-                f"{session}_virginia_international_raceway_{variant}.csv",
-                
-                # COTA special pattern (reversed order)
-                f"{track_upper}_{variant}_{session}.csv",  # COTA_lap_start_time_R1.csv
-                f"{track_base.upper()}_{variant}_{session}.csv",  # COTA_lap_start_R1.csv
-                
-                # Generic patterns
-                f"{session}_{variant}.csv",  # R1_lap_start.csv
-            ])
-        
-        for pattern in patterns:
-            # Try all possible S3 key locations
-            possible_keys = self._get_s3_key(track_name, pattern)
-            for s3_key in possible_keys:
-                df = self._download_csv_from_s3(s3_key)
-                if df is not None:
-                    return df
+        s3_key = self._resolve_key(track_name, session, file_type)
+        if s3_key is not None:
+            df = self._download_csv_from_s3(s3_key, LAP_EVENTS)
+            if df is not None:
+                return df
+            # Listed key is gone - list again next time
+            self.manifest.invalidate()
         
         # Only print warning for lap_start files (lap_end is optional)
         if file_type == "lap_start":
             print(f"Warning: Could not find lap times for {track_name}/{session}")
         return None
     
+    def resolve_telemetry_key(self, track_name: str, session: str) -> Optional[str]:
+        """Find the S3 key of a session's telemetry CSV."""
+        return self._resolve_key(track_name, session, "telemetry")
+    
     def load_telemetry(self, track_name: str, session: str) -> Optional[pd.DataFrame]:
-        """Load telemetry data from S3 with pattern matching.
+        """Load telemetry data from S3.
         
-        Tries multiple naming patterns to handle variations in file naming.
+        The key is resolved through the bucket manifest.
         
         Args:
             track_name: Name of the track
-            session: Session name (e.g., 'practice', 'qualifying', 'race')
+            session: Session name (e.g., 'R1', 'R2')
             
         Returns:
             DataFrame with telemetry data if found, None otherwise
         """
-        patterns = [
-            f"{session}_{track_name}_telemetry_data.csv",
-            f"{session}_{track_name.replace('_', '-')}_telemetry_data.csv",
-            f"{session}_telemetry_data.csv"
-        ]
-        
-        for pattern in patterns:
-            s3_key = self._get_s3_key(track_name, pattern)
-            df = self._download_csv_from_s3(s3_key)
+        s3_key = self.resolve_telemetry_key(track_name, session)
+        if s3_key is not None:
+            df = self._download_csv_from_s3(s3_key, TELEMETRY)
             if df is not None:
                 return df
+            self.manifest.invalidate()
         
         print(f"Warning: Could not find telemetry for {track_name}/{session}")
         return None
     
+    def get_telemetry_etag(self, track_name: str, session: str) -> Optional[str]:
+        """Get the ETag of a session's telemetry CSV, used to detect changed objects."""
+        return self._etag(self.resolve_telemetry_key(track_name, session))
+    
+    def load_lap_index(self, track_name: str, session: str) -> Optional[dict]:
+        """Load the (vehicle_id, lap) byte-range index uploaded next to a telemetry CSV.
+        
+        Args:
+            track_name: Name of the track
+            session: Session name (e.g., 'R1', 'R2')
+            
+        Returns:
+            Index dict if present and built from the current object, None otherwise
+        """
+        s3_key = self.resolve_telemetry_key(track_name, session)
+        if s3_key is None or self.manifest.get(s3_key + INDEX_SUFFIX) is None:
+            # No sidecar uploaded for this session
+            return None
+        
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key + INDEX_SUFFIX)
+            index = json.loads(response['Body'].read())
+        except Exception as e:
+            print(f"Error loading {s3_key + INDEX_SUFFIX}: {e}")
+            return None
+        
+        # mtimes don't survive the upload, so only the size can be checked
+        obj = self.manifest.get(s3_key)
+        if obj is None or not is_current(index, obj.size):
+            print(f"Warning: lap index for {s3_key} is stale")
+            return None
+        return index
+    
+    def load_telemetry_lap(self, track_name: str, session: str, vehicle_id: str, lap: int,
+                           index: Optional[dict] = None) -> Optional[Dict[str, ChannelData]]:
+        """Load one vehicle's lap with HTTP range requests instead of the whole file.
+        
+        Args:
+            track_name: Name of the track
+            session: Session name (e.g., 'R1', 'R2')
+            vehicle_id: Vehicle ID
+            lap: Lap number
+            index: Lap index from load_lap_index (fetched if not given)
+            
+        Returns:
+            Mapping of channel name to ChannelData, None if the session has no lap index
+        """
+        index = index or self.load_lap_index(track_name, session)
+        if index is None:
+            return None
+        
+        s3_key = self.resolve_telemetry_key(track_name, session)
+        blocks = []
+        try:
+            for start, end in lap_ranges(index, vehicle_id, lap):
+                response = self.s3_client.get_object(
+                    Bucket=self.bucket_name, Key=s3_key, Range=f"bytes={start}-{end - 1}"
+                )
+                blocks.append(response['Body'].read())
+        except Exception as e:
+            print(f"Error loading lap {lap} of {vehicle_id} from {s3_key}: {e}")
+            return None
+        
+        return parse_lap_ranges(index, blocks, vehicle_id, lap)
+    
     def get_available_tracks(self) -> list:
         """Get list of available tracks from S3.
         
@@ -162,18 +275,7 @@ class S3DataLoader:
             List of track names (subdirectories under 'data/')
         """
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix='data/',
-                Delimiter='/'
-            )
-            
-            tracks = []
-            for prefix in response.get('CommonPrefixes', []):
-                track_name = prefix['Prefix'].replace('data/', '').rstrip('/')
-                tracks.append(track_name)
-            
-            return tracks
+            return self.manifest.tracks()
         except Exception as e:
             print(f"Error listing tracks: {e}")
             return []
@@ -181,6 +283,10 @@ class S3DataLoader:
     def get_available_sessions(self, track_name: str) -> list:
         """Get available sessions for a track.
         
+        Sessions are taken from the lap_start files (R1_barber_lap_start.csv,
+        COTA_lap_start_time_R1.csv, ...) in the bucket manifest, which covers
+        every key rather than the first page of a listing.
+        
         Args:
             track_name: Name of the track
             
@@ -188,37 +294,7 @@ class S3DataLoader:
             List of session names extracted from filenames
         """
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=f'data/{track_name}/'
-            )
-            
-            sessions = set()
-            for obj in response.get('Contents', []):
-                filename = obj['Key'].split('/')[-1]
-                # Skip directory markers and non-CSV files
-                if not filename or filename == '.' or not filename.endswith('.csv'):
-                    continue
-                    
-                # Only process lap_start files
-                if '_lap_start.csv' in filename or 'lap_start_time' in filename:
-                    # Extract session from filename
-                    # Pattern 1: R1_barber_lap_start.csv -> R1
-                    # Pattern 2: COTA_lap_start_time_R1.csv -> R1
-                    
-                    if filename.startswith('R') and len(filename) > 2 and filename[1].isdigit():
-                        # Standard pattern: R1_xxx or R2_xxx
-                        session = filename[:2]  # Get R1 or R2
-                        sessions.add(session)
-                    elif '_R' in filename:
-                        # COTA pattern: COTA_lap_start_time_R1.csv
-                        parts = filename.split('_R')
-                        if len(parts) > 1:
-                            session_num = parts[1].split('.')[0].split('_')[0]  # Get just the number
-                            if session_num.isdigit():
-                                sessions.add(f'R{session_num}')
-            
-            return sorted(list(sessions))
+            return self.manifest.sessions(track_name, "lap_start")
         except Exception as e:
             print(f"Error listing sessions: {e}")
             return []
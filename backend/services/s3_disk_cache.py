@@ -0,0 +1,118 @@
+"""Size-bounded local disk cache for parsed S3 objects."""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+class S3DiskCache:
+    """Parsed S3 objects stored as Parquet files next to their ETag.
+
+    Layout on disk::
+
+        {root}/{sha1(key)}.parquet   the parsed (compact) DataFrame
+        {root}/{sha1(key)}.json      {"key", "etag"}
+
+    Files are written atomically and their mtime is bumped on every hit, so
+    worker processes sharing the directory agree on least-recently-used order
+    when the total size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or os.getenv('S3_CACHE_DIR', 'data/_s3_cache'))
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.getenv('S3_CACHE_MAX_MB', '1024')) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """A zero budget turns the cache off."""
+        return self.max_bytes > 0
+
+    def etag(self, s3_key: str) -> Optional[str]:
+        """ETag of the cached copy of a key, or None if it isn't cached."""
+        try:
+            with open(self._paths(s3_key)[1]) as f:
+                return json.load(f).get('etag')
+        except (OSError, ValueError):
+            return None
+
+    def load(self, s3_key: str) -> Optional[pd.DataFrame]:
+        """Read the cached frame for a key and mark it as recently used."""
+        data_path, meta_path = self._paths(s3_key)
+        try:
+            frame = pd.read_parquet(data_path)
+            os.utime(data_path)
+            os.utime(meta_path)
+        except Exception:
+            return None
+        self.hits += 1
+        return frame
+
+    def store(self, s3_key: str, etag: Optional[str], frame: pd.DataFrame):
+        """Write a parsed object, then evict least-recently-used entries over budget."""
+        if not self.enabled or etag is None:
+            return
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        data_path, meta_path = self._paths(s3_key)
+        suffix = f".tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            frame.to_parquet(str(data_path) + suffix, index=False)
+            os.replace(str(data_path) + suffix, data_path)
+            with open(str(meta_path) + suffix, 'w') as f:
+                json.dump({'key': s3_key, 'etag': etag}, f)
+            os.replace(str(meta_path) + suffix, meta_path)
+        except Exception as e:
+            print(f"Warning: could not cache {s3_key}: {e}")
+            return
+
+        self.stores += 1
+        self._evict()
+
+    def stats(self) -> Dict[str, object]:
+        """Disk usage and hit counters."""
+        files = list(self.root.glob('*.parquet')) if self.root.exists() else []
+        return {
+            "entries": len(files),
+            "bytes": sum(f.stat().st_size for f in files),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def _paths(self, s3_key: str):
+        """Data and metadata file of a key."""
+        digest = hashlib.sha1(s3_key.encode('utf-8')).hexdigest()
+        return self.root / f"{digest}.parquet", self.root / f"{digest}.json"
+
+    def _evict(self):
+        """Drop the least recently used entries until the directory fits the budget."""
+        with self._lock:
+            entries = []
+            for data_path in self.root.glob('*.parquet'):
+                try:
+                    stat = data_path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, data_path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, data_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                for path in (data_path, data_path.with_suffix('.json')):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+                total -= size
+                self.evictions += 1
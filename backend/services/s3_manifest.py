@@ -0,0 +1,172 @@
+"""In-memory manifest of the race data keys in the S3 bucket."""
+import os
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+DATA_PREFIX = "data/"
+
+# file_type -> substrings identifying it in an export filename, most specific first.
+# When a session has several files of one type, the one matching the earliest
+# alias wins, then the one nearest the track directory, then the first by name.
+FILE_TYPE_ALIASES = {
+    "lap_start": ["lap_start_time", "lap_start"],
+    "lap_end": ["lap_end_time", "lap_end"],
+    "telemetry": ["telemetry_data", "telemetry"],
+}
+
+# R1_barber_lap_start.csv / COTA_lap_start_time_R1.csv
+_SESSION_PREFIX = re.compile(r"^(R\d+)_")
+_SESSION_SUFFIX = re.compile(r"_(R\d+)\.csv$", re.IGNORECASE)
+
+
+class S3Object(NamedTuple):
+    """Listing metadata of one object."""
+    key: str
+    size: int
+    etag: str
+
+
+class S3KeyManifest:
+    """All keys under ``data/`` from one paginated listing, refreshed after a TTL.
+
+    Every (track, session, file_type) is resolved through an alias map built
+    from the listed filenames, so looking up a file costs no request at all
+    instead of probing naming patterns one HEAD/GET at a time.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, ttl_seconds: Optional[float] = None,
+                 prefix: str = DATA_PREFIX):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else \
+            float(os.getenv('S3_MANIFEST_TTL_SECONDS', '300'))
+        self._objects: Dict[str, S3Object] = {}
+        self._aliases: Dict[Tuple[str, str, str], List[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+
+    def refresh(self):
+        """Re-list the bucket prefix and rebuild the alias map."""
+        objects = {}
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=self.prefix):
+            for obj in page.get('Contents', []):
+                objects[obj['Key']] = S3Object(obj['Key'], obj['Size'], obj.get('ETag'))
+
+        aliases: Dict[Tuple[str, str, str], List[str]] = {}
+        for key in objects:
+            alias = parse_key(key, self.prefix)
+            if alias is not None:
+                aliases.setdefault(alias, []).append(key)
+        for (_, _, file_type), keys in aliases.items():
+            keys.sort(key=lambda key: _preference(key, file_type))
+
+        with self._lock:
+            self._objects = objects
+            self._aliases = aliases
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+
+    def invalidate(self):
+        """Force a re-list on next use (e.g. after a listed key turned out to be gone)."""
+        with self._lock:
+            self._loaded_at = None
+
+    def get(self, key: str) -> Optional[S3Object]:
+        """Listing metadata of a key, or None if it doesn't exist."""
+        self._ensure_fresh()
+        return self._objects.get(key)
+
+    def keys(self) -> List[str]:
+        """Every listed key."""
+        self._ensure_fresh()
+        return list(self._objects)
+
+    def resolve(self, track_name: str, session: str, file_type: str) -> Optional[str]:
+        """Key of a session file, or None if the bucket has none.
+
+        Args:
+            track_name: Name of the track
+            session: Session name (e.g., 'R1')
+            file_type: 'lap_start', 'lap_end' or 'telemetry'
+
+        Returns:
+            Exactly one S3 key, the same for every listing of the same keys
+        """
+        self._ensure_fresh()
+        candidates = self._aliases.get((track_name, session.upper(), file_type))
+        return candidates[0] if candidates else None
+
+    def tracks(self) -> List[str]:
+        """Track directories under the prefix."""
+        self._ensure_fresh()
+        return sorted({
+            key[len(self.prefix):].split('/', 1)[0]
+            for key in self._objects
+            if '/' in key[len(self.prefix):]
+        })
+
+    def sessions(self, track_name: str, file_type: str = "lap_start") -> List[str]:
+        """Sessions of a track that have a file of the given type."""
+        self._ensure_fresh()
+        return sorted({
+            session for track, session, kind in self._aliases
+            if track == track_name and kind == file_type
+        })
+
+    def stats(self) -> Dict[str, object]:
+        """Manifest size, age and refresh count."""
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+            return {
+                "keys": len(self._objects),
+                "aliases": len(self._aliases),
+                "age_seconds": round(age, 1) if age is not None else None,
+                "refreshes": self.refreshes,
+            }
+
+    def _ensure_fresh(self):
+        """Refresh when never loaded or older than the TTL (one lister at a time)."""
+        if not self._is_stale():
+            return
+        with self._refresh_lock:
+            if self._is_stale():
+                self.refresh()
+
+    def _is_stale(self) -> bool:
+        """Check whether the listing is missing or past its TTL."""
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.ttl_seconds
+
+
+def parse_key(key: str, prefix: str = DATA_PREFIX) -> Optional[Tuple[str, str, str]]:
+    """Map a key like data/{track}/.../R1_barber_lap_start.csv to (track, session, file_type)."""
+    if not key.startswith(prefix):
+        return None
+    parts = key[len(prefix):].split('/')
+    filename = parts[-1]
+    if len(parts) < 2 or not filename.lower().endswith('.csv'):
+        return None
+
+    match = _SESSION_PREFIX.match(filename) or _SESSION_SUFFIX.search(filename)
+    if match is None:
+        return None
+
+    lowered = filename.lower()
+    for file_type, aliases in FILE_TYPE_ALIASES.items():
+        if any(alias in lowered for alias in aliases):
+            return parts[0], match.group(1).upper(), file_type
+    return None
+
+
+def _preference(key: str, file_type: str) -> Tuple[int, int, str]:
+    """Sort key among the files of one type: alias order, then path depth, then name."""
+    filename = key.rsplit('/', 1)[-1].lower()
+    aliases = FILE_TYPE_ALIASES[file_type]
+    rank = next(i for i, alias in enumerate(aliases) if alias in filename)
+    return rank, key.count('/'), key
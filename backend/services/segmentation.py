@@ -0,0 +1,104 @@
+"""Run-length segmentation of telemetry series into threshold events."""
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class Segments(NamedTuple):
+    """Index arrays of the runs found in a series, one element per run."""
+    start: np.ndarray  # first sample of the run
+    end: np.ndarray    # one past the last sample
+    peak: np.ndarray   # sample with the largest value in the run
+
+
+def above_threshold(values: np.ndarray, enter: float, exit: Optional[float] = None) -> np.ndarray:
+    """Boolean state of a threshold detector with hysteresis.
+
+    The state turns on at a sample above ``enter`` and off at a sample at or
+    below ``exit`` (``enter`` when not given). Samples in between, and NaN
+    samples, keep the previous state; the series starts off.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    exit = enter if exit is None else exit
+    if exit > enter:
+        raise ValueError(f"exit threshold {exit} is above enter threshold {enter}")
+
+    on = values > enter
+    undecided = np.flatnonzero(~(on | (values <= exit)))
+    if len(undecided) == 0:
+        return on
+
+    # Each stretch of undecided samples takes the state of the sample before it
+    first = np.flatnonzero(np.r_[True, np.diff(undecided) > 1])
+    stretch_start = undecided[first]
+    carried = np.where(stretch_start > 0, on[np.maximum(stretch_start - 1, 0)], False)
+    state = on.copy()
+    state[undecided] = np.repeat(carried, np.diff(np.r_[first, len(undecided)]))
+    return state
+
+
+def runs(mask: np.ndarray, min_length: int = 1, include_open: bool = True) -> Segments:
+    """Start and end of every run of True in a mask.
+
+    Args:
+        mask: Boolean state per sample
+        min_length: Shortest run (in samples) to keep
+        include_open: Keep a run still in progress at the last sample
+
+    Returns:
+        Segments with ``peak`` set to the middle sample of each run
+    """
+    mask = np.asarray(mask, dtype=bool)
+    edges = np.diff(mask.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    start = np.flatnonzero(edges == 1)
+    end = np.flatnonzero(edges == -1)
+
+    keep = end - start >= min_length
+    if not include_open and len(end) and end[-1] == len(mask):
+        keep[-1] = False
+    start, end = start[keep], end[keep]
+    return Segments(start, end, start + (end - start) // 2)
+
+
+def threshold_runs(values: np.ndarray, enter: float, exit: Optional[float] = None,
+                   min_length: int = 1, include_open: bool = True) -> Segments:
+    """Runs where a series is above a threshold, with optional hysteresis.
+
+    Args:
+        values: Samples of one channel, in time order
+        enter: A run starts at the first sample above this value
+        exit: A run ends at the first sample at or below this value (default ``enter``)
+        min_length: Shortest run (in samples) to keep
+        include_open: Keep a run still in progress at the last sample
+
+    Returns:
+        Segments with ``peak`` at the largest value of each run (first one on ties)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    segments = runs(above_threshold(values, enter, exit), min_length, include_open)
+    return segments._replace(peak=peak_indices(values, segments.start, segments.end))
+
+
+def peak_indices(values: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Index of the largest value in each [start, end) range (first one on ties, NaN never wins)."""
+    if len(start) == 0:
+        return start.copy()
+
+    filled = np.where(np.isnan(values), -np.inf, values)
+    bounds = np.empty(2 * len(start), dtype=np.intp)
+    bounds[0::2], bounds[1::2] = start, end
+    # A sentinel sample lets the last range end at len(values)
+    peak_values = np.maximum.reduceat(np.append(filled, -np.inf), bounds)[0::2]
+
+    # Run number of every sample (valid inside runs only)
+    starts = np.zeros(len(values), dtype=np.int64)
+    starts[start] = 1
+    run_ids = np.cumsum(starts) - 1
+    inside = np.zeros(len(values) + 1, dtype=np.int8)
+    inside[start] = 1
+    inside[end] -= 1
+    inside = np.cumsum(inside[:-1], dtype=np.int8).astype(bool)
+
+    hits = np.flatnonzero(inside & (filled == peak_values[np.maximum(run_ids, 0)]))
+    hit_runs = run_ids[hits]
+    return hits[np.r_[True, hit_runs[1:] != hit_runs[:-1]]]
@@ -0,0 +1,588 @@
+"""Process-wide repository for parsed session data with a memory-budgeted LRU cache."""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+import pandas as pd
+
+from backend.services.channel_arrays import ChannelArrayStore, ChannelData
+from backend.services.frame_schema import LAP_EVENTS, SECTIONS
+from backend.services.telemetry_index import index_path, load_lap_index, read_lap
+from backend.services.telemetry_reader import read_channel_arrays, read_telemetry_csv
+from backend.services.telemetry_store import TelemetryStore
+from backend.services.trace_pyramid import TraceLevel, TracePyramidStore, build_levels
+
+
+@dataclass
+class _CacheEntry:
+    """A cached value with its size and the source version it was built from."""
+    value: Any
+    nbytes: int
+    version: Hashable
+    checked_at: float
+
+
+@dataclass
+class _Load:
+    """A load in progress that concurrent misses on the same key wait for."""
+    done: threading.Event
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+class SessionRepository:
+    """Loads lap, section and telemetry tables once and shares them across analyzers.
+
+    Entries are keyed by (kind, track, session, ...) and evicted least-recently-used
+    first once the configured byte budget is exceeded. Each entry remembers the
+    version of its source files (mtime/size locally, ETag on S3) and is reloaded
+    when that version changes. Versions are rechecked at most every
+    ``revalidate_seconds`` so a cache hit does not cost a stat or HEAD request.
+
+    Cached DataFrames are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, data_dir: Optional[Path] = None, max_bytes: Optional[int] = None,
+                 revalidate_seconds: Optional[float] = None):
+        self.data_dir = Path(data_dir or "data")
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.getenv('SESSION_CACHE_MAX_MB', '512')) * 1024 * 1024)
+        self.revalidate_seconds = revalidate_seconds if revalidate_seconds is not None else \
+            float(os.getenv('SESSION_CACHE_REVALIDATE_SECONDS', '5'))
+        self.use_s3 = os.getenv('USE_S3_DATA', 'false').lower() == 'true'
+        self.telemetry_store = TelemetryStore()
+        self.channel_arrays = ChannelArrayStore()
+        self.trace_pyramids = TracePyramidStore(arrays=self.channel_arrays)
+
+        if self.use_s3:
+            from backend.services.s3_data_loader import S3DataLoader
+            self.s3_loader = S3DataLoader()
+
+        self._cache: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._loading: Dict[Hashable, _Load] = {}
+        self._coalesced = 0
+
+    # ------------------------------------------------------------------
+    # Data discovery
+    # ------------------------------------------------------------------
+
+    def track_dirs(self, track_name: str) -> List[Path]:
+        """Existing local directories that may hold a track's CSV files."""
+        track_base = track_name.split("_")[0]  # e.g., "barber" from "barber_motorsports_park"
+        possible_dirs = [
+            self.data_dir / track_name / track_name.replace("_", "-"),
+            self.data_dir / track_name / track_name,
+            self.data_dir / track_name / track_base,  # e.g., data/barber_motorsports_park/barber
+        ]
+        return [d for d in possible_dirs if d.exists()]
+
+    def resolve_track_dir(self, track_name: str) -> Optional[Path]:
+        """Find the first local directory holding a track's CSV files."""
+        track_dirs = self.track_dirs(track_name)
+        return track_dirs[0] if track_dirs else None
+
+    # ------------------------------------------------------------------
+    # Cached loaders
+    # ------------------------------------------------------------------
+
+    def load_lap_times(self, track_name: str, session: str) -> pd.DataFrame:
+        """Load merged lap start/end times with a computed 'lap_time' column."""
+        if self.use_s3:
+            return self._get_or_load(
+                ('lap_times', track_name, session),
+                lambda: self._s3_lap_times_version(track_name, session),
+                lambda: self._read_s3_lap_times(track_name, session)
+            )
+
+        files = self._local_lap_time_files(track_name, session)
+        if files is None:
+            return pd.DataFrame()
+
+        return self._get_or_load(
+            ('lap_times', track_name, session),
+            lambda: self._file_version(files),
+            lambda: self._merge_lap_times(LAP_EVENTS.read_csv(files[0]), LAP_EVENTS.read_csv(files[1]))
+        )
+
+    def load_sections(self, track_name: str, session: str) -> pd.DataFrame:
+        """Load section/sector data."""
+        section_file = self._local_section_file(track_name, session)
+        if section_file is None:
+            return pd.DataFrame()
+
+        return self._get_or_load(
+            ('sections', track_name, session),
+            lambda: self._file_version([section_file]),
+            lambda: SECTIONS.read_csv(section_file)
+        )
+
+    def load_telemetry(self, track_name: str, session: str, driver_id: Optional[str] = None,
+                       channels: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Load long-format telemetry for one driver (or all) and a set of channels.
+
+        Ingested sessions are read from the columnar store; otherwise the raw
+        CSV is streamed in chunks, keeping only the requested rows.
+        """
+        channel_key = tuple(channels) if channels is not None else None
+
+        key = self._covering_key(('telemetry', track_name, session, driver_id, channel_key))
+
+        if self.telemetry_store.has_session(track_name, session):
+            session_dir = self.telemetry_store.session_dir(track_name, session)
+            telemetry = self._get_or_load(
+                key,
+                lambda: self._file_version([session_dir]),
+                lambda: self.telemetry_store.read(
+                    track_name, session,
+                    vehicle_ids=[driver_id] if driver_id else None,
+                    channels=key[-1]
+                )
+            )
+        else:
+            telemetry_file = self._local_telemetry_file(track_name, session)
+            if telemetry_file is None:
+                return pd.DataFrame()
+
+            telemetry = self._get_or_load(
+                key,
+                lambda: self._file_version([telemetry_file]),
+                lambda: read_telemetry_csv(
+                    telemetry_file,
+                    vehicle_ids=[driver_id] if driver_id else None,
+                    channels=key[-1]
+                )
+            )
+
+        if key[-1] == channel_key:
+            return telemetry
+        return telemetry[telemetry['telemetry_name'].isin(channels)]
+
+    def has_telemetry(self, track_name: str, session: str) -> bool:
+        """Check whether any telemetry source exists for a session."""
+        return (
+            self.channel_arrays.has_session(track_name, session)
+            or self.telemetry_store.has_session(track_name, session)
+            or self._local_telemetry_file(track_name, session) is not None
+            or (self.use_s3 and self.s3_loader.resolve_telemetry_key(track_name, session) is not None)
+        )
+
+    def load_channels(self, track_name: str, session: str, driver_id: str,
+                      channels: Optional[Sequence[str]] = None) -> Dict[str, ChannelData]:
+        """Load one driver's telemetry as per-channel arrays.
+
+        When memory-mapped arrays have been built for the session the returned
+        arrays are zero-copy views shared with every other worker process.
+        Otherwise they are extracted from the columnar store or streamed from
+        the raw CSV, and cached; a subset of channels already cached for the
+        driver is taken from that entry without reading the source again.
+
+        Args:
+            track_name: Name of the track
+            session: Session name (e.g., 'R1')
+            driver_id: Vehicle ID
+            channels: Channel names to load (all available if None)
+
+        Returns:
+            Mapping of channel name to ChannelData; channels without samples are omitted
+        """
+        if self.channel_arrays.has_session(track_name, session):
+            names = channels if channels is not None else \
+                self.channel_arrays.list_channels(track_name, session, driver_id)
+            result = {}
+            for name in names:
+                channel = self.channel_arrays.get_channel(track_name, session, driver_id, name)
+                if channel is not None:
+                    result[name] = channel
+            return result
+
+        if not self.telemetry_store.has_session(track_name, session):
+            telemetry_file = self._local_telemetry_file(track_name, session)
+            if telemetry_file is None:
+                return {}
+            key = self._covering_key(
+                ('channels', track_name, session, driver_id, tuple(channels) if channels is not None else None))
+            loaded = self._get_or_load(
+                key,
+                lambda: self._file_version([telemetry_file]),
+                lambda: read_channel_arrays(telemetry_file, driver_id, key[-1])
+            )
+            if channels is None or key[-1] == tuple(channels):
+                return loaded
+            return {name: loaded[name] for name in channels if name in loaded}
+
+        telemetry = self.load_telemetry(track_name, session, driver_id, channels)
+        if telemetry.empty:
+            return {}
+
+        timestamps = telemetry['timestamp'].to_numpy()
+
+        result = {}
+        offset = 0
+        for name, positions in telemetry.groupby('telemetry_name', observed=True, sort=True).indices.items():
+            result[str(name)] = ChannelData(
+                timestamps[positions],
+                telemetry['telemetry_value'].to_numpy()[positions],
+                telemetry['lap'].to_numpy()[positions],
+                offset
+            )
+            offset += len(positions)
+        return result
+
+    def load_lap_channels(self, track_name: str, session: str, driver_id: str, lap: int,
+                          channels: Optional[Sequence[str]] = None) -> Dict[str, ChannelData]:
+        """Load one driver's lap as per-channel arrays.
+
+        Raw CSVs with a current lap index (locally or on S3) are read by seeking
+        to the indexed byte ranges; other sources are sliced from the driver's
+        full channels.
+        """
+        key = ('lap', track_name, session, driver_id, lap, tuple(channels) if channels is not None else None)
+
+        if not self.channel_arrays.has_session(track_name, session) and \
+                not self.telemetry_store.has_session(track_name, session):
+            telemetry_file = self._local_telemetry_file(track_name, session)
+            if telemetry_file is not None:
+                index = load_lap_index(telemetry_file)
+                if index is not None:
+                    return self._get_or_load(
+                        key,
+                        lambda: self._file_version([telemetry_file, index_path(telemetry_file)]),
+                        lambda: read_lap(telemetry_file, index, driver_id, lap, channels)
+                    )
+            elif self.use_s3:
+                index = self.s3_loader.load_lap_index(track_name, session)
+                if index is not None:
+                    return self._get_or_load(
+                        key,
+                        lambda: self.s3_loader.get_telemetry_etag(track_name, session),
+                        lambda: self.s3_loader.load_telemetry_lap(track_name, session, driver_id, lap, index) or {}
+                    )
+
+        result = {}
+        for name, channel in self.load_channels(track_name, session, driver_id, channels).items():
+            mask = channel.laps == lap
+            if mask.any():
+                result[name] = ChannelData(channel.timestamps[mask], channel.values[mask], channel.laps[mask])
+        return result
+
+    def load_lap_trace_levels(self, track_name: str, session: str, driver_id: str, lap: int,
+                              channels: Sequence[str]) -> Dict[str, List[TraceLevel]]:
+        """Load the multi-resolution traces of one driver's lap.
+
+        Precomputed pyramids are memory-mapped when they match the session's
+        channel arrays; otherwise the levels are built from the lap's samples
+        and cached.
+
+        Returns:
+            Mapping of channel name to its levels, raw first; channels without samples are omitted
+        """
+        if self.trace_pyramids.has_session(track_name, session):
+            result = {}
+            for name in channels:
+                levels = self.trace_pyramids.get_levels(track_name, session, driver_id, name, lap)
+                if levels:
+                    result[name] = levels
+            return result
+
+        return self.get_or_compute(
+            ('trace_levels', track_name, session, driver_id, lap, tuple(channels)),
+            lambda: self.telemetry_version(track_name, session),
+            lambda: self._build_trace_levels(track_name, session, driver_id, lap, channels)
+        )
+
+    def _build_trace_levels(self, track_name: str, session: str, driver_id: str, lap: int,
+                            channels: Sequence[str]) -> Dict[str, List[TraceLevel]]:
+        """Trace levels of a lap built from its samples, in the requested channel order."""
+        loaded = self.load_lap_channels(track_name, session, driver_id, lap, channels)
+        return {
+            name: build_levels(loaded[name].timestamps, loaded[name].values)
+            for name in channels
+            if name in loaded and len(loaded[name].values) > 0
+        }
+
+    def telemetry_version(self, track_name: str, session: str) -> Hashable:
+        """Version token of whichever telemetry source backs a session."""
+        if self.channel_arrays.has_session(track_name, session):
+            return self._file_version([self.channel_arrays.index_path(track_name, session)])
+        if self.telemetry_store.has_session(track_name, session):
+            return self._file_version([self.telemetry_store.session_dir(track_name, session)])
+        telemetry_file = self._local_telemetry_file(track_name, session)
+        return self._file_version([telemetry_file]) if telemetry_file else None
+
+    def session_version(self, track_name: str, session: str) -> Hashable:
+        """Version of every source behind a session's analyses, without loading any.
+
+        Covers lap times, sections and telemetry: local files by mtime/size,
+        S3 objects by the ETags in the bucket listing. None if the session has
+        no data at all.
+        """
+        if self.use_s3:
+            lap_times = self._s3_lap_times_version(track_name, session)
+            s3_telemetry = self.s3_loader.get_telemetry_etag(track_name, session)
+        else:
+            files = self._local_lap_time_files(track_name, session)
+            lap_times = self._file_version(files) if files else None
+            s3_telemetry = None
+
+        section_file = self._local_section_file(track_name, session)
+        version = (
+            lap_times,
+            self._file_version([section_file]) if section_file else None,
+            self.telemetry_version(track_name, session),
+            s3_telemetry
+        )
+        return version if any(part not in (None, (None, None)) for part in version) else None
+
+    def get_or_compute(self, key: Hashable, version_fn: Callable[[], Hashable],
+                       compute_fn: Callable[[], Any]) -> Any:
+        """Cache a derived result under the same byte budget and invalidation rules.
+
+        Args:
+            key: Cache key; should start with a kind tag, e.g. ('resampled', track, ...)
+            version_fn: Returns the version of the inputs the result depends on
+            compute_fn: Builds the result on a miss
+
+        Returns:
+            The cached or freshly computed result
+        """
+        return self._get_or_load(key, version_fn, compute_fn)
+
+    # ------------------------------------------------------------------
+    # Cache management
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters and memory usage."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._cache),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "loading": len(self._loading),
+                "coalesced_loads": self._coalesced
+            }
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._cache.clear()
+            self._current_bytes = 0
+
+    def _get_or_load(self, key: Hashable, version_fn: Callable[[], Hashable],
+                     load_fn: Callable[[], Any]) -> Any:
+        """Return a cached value, revalidating its source version, or load it."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry.checked_at < self.revalidate_seconds:
+                return self._hit(key, entry)
+
+        # Revalidate outside the lock: version_fn may stat files or re-list an S3 bucket
+        version = version_fn() if entry is not None else None
+
+        with self._lock:
+            current = self._cache.get(key)
+            if current is not None and current is not entry:
+                # Another caller reloaded it meanwhile
+                return self._hit(key, current)
+            if current is not None:
+                if version == entry.version:
+                    return self._hit(key, entry)
+                # Source changed since this entry was built
+                self._drop(key)
+                self._invalidations += 1
+            self._misses += 1
+
+            # Concurrent misses on one key share the first caller's load
+            load = self._loading.get(key)
+            leader = load is None
+            if leader:
+                load = self._loading[key] = _Load(threading.Event())
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+            return load.value
+
+        # Load outside the lock so slow reads don't block unrelated sessions
+        try:
+            if entry is None:
+                version = version_fn()
+            load.value = value = load_fn()
+        except BaseException as e:
+            load.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._loading[key]
+            load.done.set()
+        nbytes = _estimate_nbytes(value)
+
+        with self._lock:
+            if key in self._cache:
+                self._drop(key)
+            if nbytes <= self.max_bytes:
+                self._cache[key] = _CacheEntry(value, nbytes, version, time.monotonic())
+                self._current_bytes += nbytes
+                while self._current_bytes > self.max_bytes:
+                    oldest = next(iter(self._cache))
+                    self._drop(oldest)
+                    self._evictions += 1
+
+        return value
+
+    def _covering_key(self, key: tuple) -> tuple:
+        """A cached or loading key whose channels include those of ``key``, else ``key``.
+
+        Channel keys end in a channel tuple (None for all channels); a request
+        for a subset of channels already loaded for the same driver is served
+        from that entry instead of streaming the source again.
+        """
+        channels = key[-1]
+        if channels is None:
+            return key
+        with self._lock:
+            if key in self._cache or key in self._loading:
+                return key
+            for candidate in [*reversed(self._cache), *self._loading]:
+                if isinstance(candidate, tuple) and len(candidate) == len(key) and \
+                        candidate[:-1] == key[:-1] and \
+                        (candidate[-1] is None or set(channels) <= set(candidate[-1])):
+                    return candidate
+        return key
+
+    def _hit(self, key: Hashable, entry: _CacheEntry) -> Any:
+        """Count a cache hit and mark the entry fresh (call with the lock held)."""
+        entry.checked_at = time.monotonic()
+        self._cache.move_to_end(key)
+        self._hits += 1
+        return entry.value
+
+    def _drop(self, key: Hashable):
+        """Remove an entry and release its bytes from the budget."""
+        entry = self._cache.pop(key)
+        self._current_bytes -= entry.nbytes
+
+    # ------------------------------------------------------------------
+    # Source helpers
+    # ------------------------------------------------------------------
+
+    def _local_lap_time_files(self, track_name: str, session: str) -> Optional[List[Path]]:
+        """Find the local lap start/end CSVs for a session."""
+        for track_dir in self.track_dirs(track_name):
+            lap_start_files = list(track_dir.glob(f"{session}_*_lap_start.csv"))
+            lap_end_files = list(track_dir.glob(f"{session}_*_lap_end.csv"))
+            if lap_start_files and lap_end_files:
+                return [lap_start_files[0], lap_end_files[0]]
+        return None
+
+    def _local_section_file(self, track_name: str, session: str) -> Optional[Path]:
+        """Find the local sections CSV for a session."""
+        for track_dir in self.track_dirs(track_name):
+            section_file = track_dir / f"23_AnalysisEnduranceWithSections_{session.replace('R', 'Race ')}_Anonymized.CSV"
+            if section_file.exists():
+                return section_file
+        return None
+
+    def _local_telemetry_file(self, track_name: str, session: str) -> Optional[Path]:
+        """Find the local raw telemetry CSV for a session."""
+        for track_dir in self.track_dirs(track_name):
+            for pattern in [f"{session}_*_telemetry_data.csv", f"{session}_*_telemetry.csv"]:
+                for telemetry_file in track_dir.glob(pattern):
+                    return telemetry_file
+        return None
+
+    def _read_s3_lap_times(self, track_name: str, session: str) -> pd.DataFrame:
+        """Download lap start/end tables from S3 and merge them."""
+        start_df = self.s3_loader.load_lap_times(track_name, session, "lap_start")
+        if start_df is None:
+            return pd.DataFrame()
+
+        end_df = self.s3_loader.load_lap_times(track_name, session, "lap_end")
+        if end_df is None:
+            return pd.DataFrame()
+
+        return self._merge_lap_times(LAP_EVENTS.apply(start_df), LAP_EVENTS.apply(end_df))
+
+    def _s3_lap_times_version(self, track_name: str, session: str) -> Hashable:
+        """ETags of the S3 objects behind a session's lap table."""
+        return (
+            self.s3_loader.get_lap_times_etag(track_name, session, "lap_start"),
+            self.s3_loader.get_lap_times_etag(track_name, session, "lap_end")
+        )
+
+    @staticmethod
+    def _merge_lap_times(start_df: pd.DataFrame, end_df: pd.DataFrame) -> pd.DataFrame:
+        """Merge compact lap start and end tables into per-lap durations.
+
+        start_time/end_time stay int64 epoch nanoseconds as loaded.
+        """
+        merged = pd.merge(
+            start_df[['vehicle_id', 'lap', 'timestamp']].rename(columns={'timestamp': 'start_time'}),
+            end_df[['vehicle_id', 'lap', 'timestamp']].rename(columns={'timestamp': 'end_time'}),
+            on=['vehicle_id', 'lap'],
+            how='inner'
+        )
+        # The two files carry different category sets, which merge falls back to objects for
+        merged['vehicle_id'] = merged['vehicle_id'].astype('category')
+
+        merged['lap_time'] = (merged['end_time'] - merged['start_time']) / 1e9
+        # Filter out invalid times (lap time should be at least 60 seconds for a race track)
+        return merged[(merged['lap_time'] > 60) & (merged['lap_time'] < 300)]
+
+    @staticmethod
+    def _file_version(paths: Sequence[Path]) -> Hashable:
+        """Version token built from file modification times and sizes."""
+        version = []
+        for path in paths:
+            try:
+                stat = path.stat()
+                version.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append((str(path), None, None))
+        return tuple(version)
+
+
+def _estimate_nbytes(value: Any) -> int:
+    """Approximate resident size of a cached value."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, dict):
+        return sum(_estimate_nbytes(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_estimate_nbytes(item) for item in value)
+    nbytes = getattr(value, 'nbytes', None)
+    return int(nbytes) if nbytes is not None else 0
+
+
+_repository: Optional[SessionRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_session_repository() -> SessionRepository:
+    """Return the process-wide session repository."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = SessionRepository()
+        return _repository
@@ -1,14 +1,15 @@
 """Race strategy and prediction engine."""
 import pandas as pd
 import numpy as np
-from pathlib import Path
 from typing import Dict, Any
+from backend.services.result_store import stored_result
+from backend.services.session_repository import get_session_repository
 
 class StrategyEngine:
     """Calculates race strategy and predictions."""
     
     def __init__(self):
-        self.data_dir = Path("data")
+        self.repository = get_session_repository()
         self.pit_loss_time = 25.0  # Average pit stop time loss in seconds
     
     def calculate_pit_window(
@@ -22,7 +23,7 @@ class StrategyEngine:
         fuel_level: float
     ) -> Dict[str, Any]:
         """Calculate optimal pit stop window."""
-        lap_times = self._load_lap_times(track_name, session)
+        lap_times = self.repository.load_lap_times(track_name, session)
         
         if lap_times.empty:
             return {"error": "No lap time data available"}
@@ -51,9 +52,10 @@ class StrategyEngine:
             "avg_lap_time": float(avg_lap_time)
         }
     
+    @stored_result("tire_degradation")
     def predict_tire_degradation(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Predict tire degradation over race distance."""
-        lap_times = self._load_lap_times(track_name, session)
+        lap_times = self.repository.load_lap_times(track_name, session)
         
         if lap_times.empty:
             return {"error": "No lap time data available"}
@@ -85,9 +87,10 @@ class StrategyEngine:
             "lap_deltas": driver_laps[['lap', 'delta']].to_dict('records')
         }
     
+    @stored_result("consistency")
     def analyze_consistency(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Calculate driver consistency metrics."""
-        lap_times = self._load_lap_times(track_name, session)
+        lap_times = self.repository.load_lap_times(track_name, session)
         
         if lap_times.empty:
             return {"error": "No lap time data available"}
@@ -119,40 +122,3 @@ class StrategyEngine:
             "laps_within_05s": int(within_threshold),
             "total_laps": len(lap_times_array)
         }
-    
-    def _load_lap_times(self, track_name: str, session: str) -> pd.DataFrame:
-        """Load lap time data."""
-        # Try multiple directory patterns
-        track_base = track_name.split("_")[0]
-        possible_dirs = [
-            self.data_dir / track_name / track_name.replace("_", "-"),
-            self.data_dir / track_name / track_name,
-            self.data_dir / track_name / track_base,
-        ]
-        
-        for track_dir in possible_dirs:
-            if track_dir.exists():
-                # Try to load lap start and end files to calculate lap times
-                lap_start_files = list(track_dir.glob(f"{session}_*_lap_start.csv"))
-                lap_end_files = list(track_dir.glob(f"{session}_*_lap_end.csv"))
-                
-                if lap_start_files and lap_end_files:
-                    start_df = pd.read_csv(lap_start_files[0])
-                    end_df = pd.read_csv(lap_end_files[0])
-                    
-                    # Merge on vehicle_id and lap
-                    start_df['start_time'] = pd.to_datetime(start_df['timestamp'])
-                    end_df['end_time'] = pd.to_datetime(end_df['timestamp'])
-                    
-                    merged = pd.merge(
-                        start_df[['vehicle_id', 'lap', 'start_time']],
-                        end_df[['vehicle_id', 'lap', 'end_time']],
-                        on=['vehicle_id', 'lap'],
-                        how='inner'
-                    )
-                    
-                    merged['lap_time'] = (merged['end_time'] - merged['start_time']).dt.total_seconds()
-                    # Filter out invalid times (lap time should be at least 60 seconds for a race track)
-                    return merged[(merged['lap_time'] > 60) & (merged['lap_time'] < 300)]
-        
-        return pd.DataFrame()
@@ -1,64 +1,67 @@
 """Telemetry data analysis service."""
 import pandas as pd
 import numpy as np
-from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from backend.services.channel_arrays import ChannelData
+from backend.services.frame_schema import sensor_float
+from backend.services.result_store import stored_result
+from backend.services.session_repository import get_session_repository
+from backend.services.trace_pyramid import select_level
+
+# Speed, throttle and brake traces, charted when no channels are requested
+TRACE_CHANNELS = ['vehspd_can', 'aps', 'pbrake_f']
 
 class TelemetryAnalyzer:
     """Analyzes telemetry data for performance insights."""
     
     def __init__(self):
-        self.data_dir = Path("data")
+        self.repository = get_session_repository()
     
     def get_lap_data(self, track_name: str, session: str, driver_id: str, lap_number: int) -> Dict[str, Any]:
         """Get detailed telemetry for a specific lap."""
-        telemetry = self._load_telemetry(track_name, session)
-        
-        if telemetry.empty:
+        if not self.repository.has_telemetry(track_name, session):
             return {"error": "No telemetry data available"}
         
-        lap_data = telemetry[
-            (telemetry['vehicle_id'] == driver_id) & 
-            (telemetry['lap'] == lap_number)
-        ]
+        # Per-channel samples recorded on this lap
+        lap_channels = self.repository.load_lap_channels(track_name, session, driver_id, lap_number)
+        lap_data = {name: channel.values for name, channel in lap_channels.items()}
+        data_points = sum(len(values) for values in lap_data.values())
         
-        if lap_data.empty:
+        if data_points == 0:
             return {"error": f"No data for lap {lap_number}"}
         
         # Extract key metrics
-        speed_data = lap_data[lap_data['telemetry_name'] == 'vehspd_can']
-        throttle_data = lap_data[lap_data['telemetry_name'] == 'aps']
-        brake_data = lap_data[lap_data['telemetry_name'].str.contains('brake', case=False, na=False)]
+        speed_data = lap_data.get('vehspd_can', np.empty(0))
+        throttle_data = lap_data.get('aps', np.empty(0))
         
         return {
             "lap_number": lap_number,
             "driver_id": driver_id,
             "speed": {
-                "max": float(speed_data['telemetry_value'].max()) if not speed_data.empty else 0,
-                "avg": float(speed_data['telemetry_value'].mean()) if not speed_data.empty else 0,
-                "min": float(speed_data['telemetry_value'].min()) if not speed_data.empty else 0
+                "max": sensor_float(np.nanmax(speed_data)) if len(speed_data) else 0,
+                "avg": float(np.nanmean(speed_data, dtype=np.float64)) if len(speed_data) else 0,
+                "min": sensor_float(np.nanmin(speed_data)) if len(speed_data) else 0
             },
-            "throttle_avg": float(throttle_data['telemetry_value'].mean()) if not throttle_data.empty else 0,
-            "data_points": len(lap_data)
+            "throttle_avg": float(np.nanmean(throttle_data, dtype=np.float64)) if len(throttle_data) else 0,
+            "data_points": data_points
         }
     
+    @stored_result("telemetry_braking")
     def analyze_braking(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Analyze braking points and efficiency."""
-        telemetry = self._load_telemetry(track_name, session)
-        
-        if telemetry.empty:
+        if not self.repository.has_telemetry(track_name, session):
             return {"error": "No telemetry data available"}
         
-        driver_data = telemetry[telemetry['vehicle_id'] == driver_id]
-        brake_data = driver_data[driver_data['telemetry_name'].str.contains('brake', case=False, na=False)]
+        channels = self.repository.load_channels(track_name, session, driver_id)
+        brake_data = self._matching_values(channels, 'brake')
         
-        if brake_data.empty:
+        if len(brake_data) == 0:
             return {"message": "No braking data available"}
         
         # Calculate braking metrics
-        brake_applications = len(brake_data[brake_data['telemetry_value'] > 0])
-        avg_brake_pressure = float(brake_data['telemetry_value'].mean())
-        max_brake_pressure = float(brake_data['telemetry_value'].max())
+        brake_applications = int(np.count_nonzero(brake_data > 0))
+        avg_brake_pressure = float(np.nanmean(brake_data, dtype=np.float64))
+        max_brake_pressure = sensor_float(np.nanmax(brake_data))
         
         return {
             "driver_id": driver_id,
@@ -68,23 +71,23 @@ class TelemetryAnalyzer:
             "braking_efficiency": float(avg_brake_pressure / max_brake_pressure * 100) if max_brake_pressure > 0 else 0
         }
     
+    @stored_result("telemetry_speed")
     def analyze_speed(self, track_name: str, session: str, driver_id: str) -> Dict[str, Any]:
         """Analyze speed profile (vMin, vMax, acceleration)."""
-        telemetry = self._load_telemetry(track_name, session)
-        
-        if telemetry.empty:
+        if not self.repository.has_telemetry(track_name, session):
             return {"error": "No telemetry data available"}
         
-        driver_data = telemetry[telemetry['vehicle_id'] == driver_id]
-        speed_data = driver_data[driver_data['telemetry_name'] == 'vehspd_can']
-        accel_data = driver_data[driver_data['telemetry_name'].str.contains('acc', case=False, na=False)]
+        channels = self.repository.load_channels(track_name, session, driver_id)
+        speed_channel = channels.get('vehspd_can')
+        accel_data = self._matching_values(channels, 'acc')
         
-        if speed_data.empty:
+        if speed_channel is None or len(speed_channel.values) == 0:
             return {"message": "No speed data available"}
         
-        vmax = float(speed_data['telemetry_value'].max())
-        vmin = float(speed_data['telemetry_value'].min())
-        vavg = float(speed_data['telemetry_value'].mean())
+        speed_data = speed_channel.values
+        vmax = sensor_float(np.nanmax(speed_data))
+        vmin = sensor_float(np.nanmin(speed_data))
+        vavg = float(np.nanmean(speed_data, dtype=np.float64))
         
         return {
             "driver_id": driver_id,
@@ -92,24 +95,58 @@ class TelemetryAnalyzer:
             "vmin": vmin,
             "vavg": vavg,
             "speed_range": vmax - vmin,
-            "avg_acceleration": float(accel_data['telemetry_value'].mean()) if not accel_data.empty else 0
+            "avg_acceleration": float(np.nanmean(accel_data, dtype=np.float64)) if len(accel_data) else 0
         }
     
-    def _load_telemetry(self, track_name: str, session: str) -> pd.DataFrame:
-        """Load telemetry data."""
-        # Try multiple directory patterns
-        track_base = track_name.split("_")[0]
-        possible_dirs = [
-            self.data_dir / track_name / track_name.replace("_", "-"),
-            self.data_dir / track_name / track_name,
-            self.data_dir / track_name / track_base,
-        ]
+    def get_lap_trace(self, track_name: str, session: str, driver_id: str, lap_number: int,
+                      channels: Optional[List[str]] = None, width: int = 1000,
+                      start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """Downsampled channel traces of one lap, sized for a chart width.
+
+        Each channel is served from the coarsest pyramid level that still has
+        one min/max bucket per pixel inside the requested time window.
+
+        Args:
+            channels: Channel names (speed, throttle and brake if None)
+            width: Chart width in pixels
+            start: Window start in seconds from the lap start (lap start if None)
+            end: Window end in seconds from the lap start (lap end if None)
+        """
+        if not self.repository.has_telemetry(track_name, session):
+            return {"error": "No telemetry data available"}
         
-        for track_dir in possible_dirs:
-            if track_dir.exists():
-                # Look for any telemetry_data.csv file that starts with the session
-                for telemetry_file in track_dir.glob(f"{session}_*_telemetry_data.csv"):
-                    # Load only first 100k rows for performance
-                    return pd.read_csv(telemetry_file, nrows=100000)
+        channels = channels or TRACE_CHANNELS
+        lap_levels = self.repository.load_lap_trace_levels(track_name, session, driver_id, lap_number, channels)
+        if not lap_levels:
+            return {"error": f"No data for lap {lap_number}"}
+        
+        # Times are reported relative to the first sample of any requested channel
+        lap_start_ns = min(int(levels[0].timestamps[0]) for levels in lap_levels.values())
+        start_ns = lap_start_ns + int(start * 1e9) if start is not None else None
+        end_ns = lap_start_ns + int(end * 1e9) if end is not None else None
+        
+        traces = {}
+        for name, levels in lap_levels.items():
+            level, raw_samples = select_level(levels, width, start_ns, end_ns)
+            traces[name] = {
+                "samples_per_bucket": level.bucket,
+                "raw_samples": raw_samples,
+                "t": np.round((level.timestamps - lap_start_ns) / 1e9, 3),
+                "v": np.round(level.values.astype(np.float64), 4)
+            }
         
-        return pd.DataFrame()
+        return {
+            "lap_number": lap_number,
+            "driver_id": driver_id,
+            "lap_start": pd.Timestamp(lap_start_ns, unit='ns', tz='UTC').isoformat(),
+            "width": width,
+            "channels": traces
+        }
+    
+    def _matching_values(self, channels: Dict[str, ChannelData], pattern: str) -> np.ndarray:
+        """Values of every channel whose name contains pattern (case-insensitive)."""
+        matching = [
+            channel.values for name, channel in channels.items()
+            if pattern.lower() in name.lower()
+        ]
+        return np.concatenate(matching) if matching else np.empty(0)
@@ -0,0 +1,178 @@
+"""Sidecar byte-offset index of raw telemetry CSVs by (vehicle_id, lap)."""
+import json
+import os
+from io import BytesIO
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.services.channel_arrays import ChannelData
+from backend.services.telemetry_reader import collect_channel_arrays, iter_telemetry_chunks
+
+INDEX_SUFFIX = ".lapidx.json"
+INDEX_VERSION = 1
+
+# Rows scanned per chunk while building an index
+DEFAULT_CHUNK_ROWS = 500000
+
+# Rows of one (vehicle, lap) separated by less than this are fetched as one range.
+# Raw exports interleave vehicles, so this trades a bounded over-read for far
+# fewer seeks / HTTP range requests.
+DEFAULT_MAX_GAP_BYTES = 256 * 1024
+
+
+def index_path(csv_path: Path) -> Path:
+    """Sidecar index location for a telemetry CSV."""
+    return Path(str(csv_path) + INDEX_SUFFIX)
+
+
+def build_lap_index(csv_path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    max_gap_bytes: int = DEFAULT_MAX_GAP_BYTES) -> Dict:
+    """Scan a telemetry CSV once and write its (vehicle_id, lap) byte-range index.
+
+    The sidecar records the source file's size and mtime so a later reader can
+    tell whether the CSV changed after the index was built.
+
+    Args:
+        csv_path: Raw long-format telemetry CSV
+        chunk_rows: Rows parsed per chunk while scanning
+        max_gap_bytes: Largest gap between two rows of a lap that is read through
+
+    Returns:
+        The index that was written
+    """
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    vehicles: Dict[str, Dict[str, Dict]] = {}
+    rows = 0
+
+    with open(csv_path, "rb") as raw:
+        header = raw.readline()
+        position = len(header)
+
+        reader = pd.read_csv(
+            csv_path,
+            usecols=["vehicle_id", "lap"],
+            dtype={"vehicle_id": "category", "lap": "float64"},
+            chunksize=chunk_rows,
+            skip_blank_lines=False
+        )
+        with reader:
+            for chunk in reader:
+                # Byte span of every data line in this chunk
+                lengths = np.fromiter(map(len, islice(raw, len(chunk))), dtype=np.int64, count=len(chunk))
+                ends = position + np.cumsum(lengths)
+                starts = ends - lengths
+                position = int(ends[-1])
+                rows += len(chunk)
+
+                for vehicle_id, lap, start, end, count in _merged_ranges(chunk, starts, ends, max_gap_bytes):
+                    entry = vehicles.setdefault(vehicle_id, {}).setdefault(str(lap), {"rows": 0, "ranges": []})
+                    entry["rows"] += count
+                    ranges = entry["ranges"]
+                    # Continue a range left open by the previous chunk
+                    if ranges and start - ranges[-1][1] <= max_gap_bytes:
+                        ranges[-1][1] = end
+                    else:
+                        ranges.append([start, end])
+
+    index = {
+        "version": INDEX_VERSION,
+        "source": {"name": csv_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+        "header": header.decode("utf-8"),
+        "rows": rows,
+        "vehicles": vehicles,
+    }
+
+    tmp_path = index_path(csv_path).with_suffix(f".tmp-{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path(csv_path))
+    return index
+
+
+def _merged_ranges(chunk: pd.DataFrame, starts: np.ndarray, ends: np.ndarray, max_gap_bytes: int):
+    """Yield (vehicle_id, lap, start, end, rows) ranges for one chunk, merged across small gaps."""
+    codes = chunk["vehicle_id"].cat.codes.to_numpy()
+    laps = chunk["lap"].to_numpy()
+    categories = chunk["vehicle_id"].cat.categories
+
+    # Rows without a vehicle or lap (including blank lines) can't be looked up
+    keep = (codes >= 0) & ~np.isnan(laps)
+    codes, laps, starts, ends = codes[keep], laps[keep].astype(np.int64), starts[keep], ends[keep]
+    if len(codes) == 0:
+        return
+
+    # Group rows by (vehicle, lap) in file order, then split where the gap is too large
+    order = np.lexsort((starts, laps, codes))
+    codes, laps, starts, ends = codes[order], laps[order], starts[order], ends[order]
+    boundary = np.ones(len(codes), dtype=bool)
+    boundary[1:] = (codes[1:] != codes[:-1]) | (laps[1:] != laps[:-1]) | (starts[1:] - ends[:-1] > max_gap_bytes)
+
+    first = np.flatnonzero(boundary)
+    last = np.append(first[1:], len(codes)) - 1
+    counts = last - first + 1
+    for i, j, count in zip(first, last, counts):
+        yield str(categories[codes[i]]), int(laps[i]), int(starts[i]), int(ends[j]), int(count)
+
+
+def load_lap_index(csv_path: Path) -> Optional[Dict]:
+    """Read a CSV's sidecar index, or None if it is missing or stale."""
+    sidecar = index_path(csv_path)
+    try:
+        with open(sidecar) as f:
+            index = json.load(f)
+        stat = Path(csv_path).stat()
+    except (OSError, ValueError):
+        return None
+
+    if not is_current(index, stat.st_size, stat.st_mtime_ns):
+        print(f"Warning: {sidecar} is stale, rebuild it with scripts/ingest_telemetry.py")
+        return None
+    return index
+
+
+def is_current(index: Dict, size: int, mtime_ns: Optional[int] = None) -> bool:
+    """Check an index against the current size (and mtime, when known) of its source."""
+    source = index.get("source", {})
+    if index.get("version") != INDEX_VERSION or source.get("size") != size:
+        return False
+    return mtime_ns is None or source.get("mtime_ns") == mtime_ns
+
+
+def lap_ranges(index: Dict, vehicle_id: str, lap: int) -> List[List[int]]:
+    """[start, end) byte ranges holding one vehicle's lap (empty if absent)."""
+    entry = index["vehicles"].get(vehicle_id, {}).get(str(lap))
+    return entry["ranges"] if entry else []
+
+
+def parse_lap_ranges(index: Dict, blocks: Iterable[bytes], vehicle_id: str, lap: int,
+                     channels: Optional[List[str]] = None) -> Dict[str, ChannelData]:
+    """Parse byte ranges fetched for one lap into per-channel arrays.
+
+    Ranges may include rows of other vehicles and laps; they are filtered out here.
+    """
+    data = b"".join(blocks)
+    if not data:
+        return {}
+
+    source = BytesIO(index["header"].encode("utf-8") + data)
+    chunks = (
+        chunk[chunk["lap"] == lap]
+        for chunk in iter_telemetry_chunks(source, [vehicle_id], channels)
+    )
+    return collect_channel_arrays(chunks)
+
+
+def read_lap(csv_path: Path, index: Dict, vehicle_id: str, lap: int,
+             channels: Optional[List[str]] = None) -> Dict[str, ChannelData]:
+    """Read one vehicle's lap from a local CSV by seeking to its indexed ranges."""
+    blocks = []
+    with open(csv_path, "rb") as f:
+        for start, end in lap_ranges(index, vehicle_id, lap):
+            f.seek(start)
+            blocks.append(f.read(end - start))
+    return parse_lap_ranges(index, blocks, vehicle_id, lap, channels)
@@ -0,0 +1,106 @@
+"""Streaming reader for raw long-format telemetry CSVs."""
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.services.channel_arrays import ChannelData
+from backend.services.frame_schema import TELEMETRY, to_epoch_ns
+from backend.services.telemetry_store import TELEMETRY_COLUMNS
+
+# Rows parsed per chunk; bounds peak memory independently of the file size
+DEFAULT_CHUNK_ROWS = int(os.getenv('TELEMETRY_CSV_CHUNK_ROWS', '500000'))
+
+
+def iter_telemetry_chunks(csv_path, vehicle_ids: Optional[Sequence[str]] = None,
+                          channels: Optional[Sequence[str]] = None,
+                          chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Stream a telemetry CSV, keeping only the requested vehicles and channels.
+
+    Only TELEMETRY_COLUMNS are parsed (meta_*, expire_at and the other string
+    columns are skipped), and each chunk is filtered before its timestamps
+    are converted, so rows for other vehicles never leave the parser buffer.
+
+    Args:
+        csv_path: Raw telemetry CSV (path or binary file object)
+        vehicle_ids: Vehicles to keep (all if None)
+        channels: telemetry_name values to keep (all if None)
+        chunk_rows: Rows parsed per chunk (defaults to TELEMETRY_CSV_CHUNK_ROWS)
+
+    Yields:
+        Non-empty DataFrames in the compact TELEMETRY schema
+    """
+    reader = pd.read_csv(
+        csv_path,
+        usecols=TELEMETRY_COLUMNS,
+        dtype=TELEMETRY.csv_dtypes(),
+        chunksize=chunk_rows or DEFAULT_CHUNK_ROWS
+    )
+    with reader:
+        for chunk in reader:
+            mask = np.ones(len(chunk), dtype=bool)
+            if vehicle_ids is not None:
+                mask &= chunk['vehicle_id'].isin(vehicle_ids).to_numpy()
+            if channels is not None:
+                mask &= chunk['telemetry_name'].isin(channels).to_numpy()
+            if not mask.any():
+                continue
+
+            chunk = chunk.loc[mask, TELEMETRY_COLUMNS]
+            chunk['timestamp'] = to_epoch_ns(chunk['timestamp'])
+            yield chunk
+
+
+def read_telemetry_csv(csv_path: Path, vehicle_ids: Optional[Sequence[str]] = None,
+                       channels: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read the requested slice of a telemetry CSV as one long-format DataFrame."""
+    chunks = list(iter_telemetry_chunks(csv_path, vehicle_ids, channels))
+    if not chunks:
+        return TELEMETRY.apply(pd.DataFrame(columns=TELEMETRY_COLUMNS))
+
+    telemetry = pd.concat(chunks, ignore_index=True)
+    # Chunks carry their own category sets, which concat falls back to objects for
+    for column in ('vehicle_id', 'telemetry_name'):
+        telemetry[column] = telemetry[column].astype('category')
+    return telemetry
+
+
+def read_channel_arrays(csv_path: Path, vehicle_id: str,
+                        channels: Optional[Sequence[str]] = None) -> Dict[str, ChannelData]:
+    """Stream one vehicle's samples from a telemetry CSV into per-channel arrays."""
+    return collect_channel_arrays(iter_telemetry_chunks(csv_path, [vehicle_id], channels))
+
+
+def collect_channel_arrays(chunks: Iterable[pd.DataFrame]) -> Dict[str, ChannelData]:
+    """Concatenate one vehicle's telemetry chunks into per-channel arrays.
+
+    Returns:
+        Mapping of channel name to ChannelData, with offsets assigned in
+        channel-name order as in the memory-mapped array layout
+    """
+    parts: Dict[str, Dict[str, List[np.ndarray]]] = {}
+
+    for chunk in chunks:
+        timestamps = chunk['timestamp'].to_numpy()
+        values = chunk['telemetry_value'].to_numpy()
+        laps = chunk['lap'].to_numpy()
+        for name, positions in chunk.groupby('telemetry_name', observed=True, sort=False).indices.items():
+            channel = parts.setdefault(str(name), {'timestamps': [], 'values': [], 'laps': []})
+            channel['timestamps'].append(timestamps[positions])
+            channel['values'].append(values[positions])
+            channel['laps'].append(laps[positions])
+
+    result = {}
+    offset = 0
+    for name in sorted(parts):
+        channel = ChannelData(
+            np.concatenate(parts[name]['timestamps']),
+            np.concatenate(parts[name]['values']),
+            np.concatenate(parts[name]['laps']),
+            offset
+        )
+        result[name] = channel
+        offset += len(channel.values)
+    return result
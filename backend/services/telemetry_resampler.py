@@ -0,0 +1,162 @@
+"""Time-aligned resampling of independently sampled telemetry channels."""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.services.channel_arrays import ChannelData
+from backend.services.session_repository import SessionRepository, get_session_repository
+
+# Channels holding discrete states; resampled with sample-and-hold instead of interpolation
+STEP_CHANNELS = {'gear', 'lap'}
+
+# Upper bound on the common sample rate when it is derived from the data
+MAX_RATE_HZ = 100.0
+
+# Grid points further than this from a real sample on either side become NaN
+DEFAULT_MAX_GAP_S = 1.0
+
+
+class TelemetryResampler:
+    """Pivots long-format telemetry into wide matrices on a common time base.
+
+    Each channel is logged at its own rate and timestamps, so samples with the
+    same position in two channels were not recorded at the same instant. The
+    resampler builds one uniform time grid per vehicle (and optionally lap) and
+    interpolates every channel onto it with ``np.searchsorted``, giving rows
+    that can be combined column-wise. Results are cached in the session
+    repository and invalidated together with the underlying telemetry.
+    """
+
+    def __init__(self, repository: Optional[SessionRepository] = None):
+        self.repository = repository or get_session_repository()
+
+    def resample(self, track_name: str, session: str, driver_id: str, channels: Sequence[str],
+                 lap: Optional[int] = None, rate_hz: Optional[float] = None,
+                 max_gap_s: float = DEFAULT_MAX_GAP_S) -> pd.DataFrame:
+        """Get a time-aligned wide matrix of channels for one driver.
+
+        Args:
+            track_name: Name of the track
+            session: Session name (e.g., 'R1')
+            driver_id: Vehicle ID
+            channels: Channel names to align (missing channels are skipped)
+            lap: Restrict to one lap (whole session if None)
+            rate_hz: Grid rate; defaults to the fastest native channel rate
+            max_gap_s: Largest sample gap bridged by interpolation
+
+        Returns:
+            DataFrame indexed by a RangeIndex with a 'timestamp' column (epoch ns),
+            a 'lap' column and one float column per available channel.
+            Empty if the driver has none of the channels.
+        """
+        key = ('resampled', track_name, session, driver_id, tuple(channels), lap, rate_hz, max_gap_s)
+        return self.repository.get_or_compute(
+            key,
+            lambda: self.repository.telemetry_version(track_name, session),
+            lambda: self._resample(track_name, session, driver_id, channels, lap, rate_hz, max_gap_s)
+        )
+
+    def _resample(self, track_name: str, session: str, driver_id: str, channels: Sequence[str],
+                  lap: Optional[int], rate_hz: Optional[float], max_gap_s: float) -> pd.DataFrame:
+        """Build the aligned matrix (uncached)."""
+        loaded = self.repository.load_channels(track_name, session, driver_id, channels)
+
+        series: Dict[str, ChannelData] = {}
+        for name in channels:
+            channel = loaded.get(name)
+            if channel is None:
+                continue
+            if lap is not None:
+                mask = channel.laps == lap
+                channel = ChannelData(channel.timestamps[mask], channel.values[mask], channel.laps[mask])
+            if len(channel.timestamps) > 0:
+                series[name] = _sorted_by_time(channel)
+
+        if not series:
+            return pd.DataFrame()
+
+        grid = _time_grid(series.values(), rate_hz)
+
+        # Lap numbers follow the densest channel with sample-and-hold
+        reference = max(series.values(), key=lambda c: len(c.timestamps))
+        columns = {
+            'timestamp': grid,
+            'lap': _sample_and_hold(reference.timestamps, reference.laps, grid),
+        }
+
+        max_gap_ns = int(max_gap_s * 1e9)
+        for name, channel in series.items():
+            if name in STEP_CHANNELS:
+                columns[name] = _sample_and_hold(channel.timestamps, channel.values.astype(np.float64), grid,
+                                                 max_gap_ns)
+            else:
+                columns[name] = _interpolate(channel.timestamps, channel.values, grid, max_gap_ns)
+
+        return pd.DataFrame(columns)
+
+
+def _sorted_by_time(channel: ChannelData) -> ChannelData:
+    """Return the channel ordered by timestamp (a no-op view when already sorted)."""
+    if len(channel.timestamps) < 2 or np.all(np.diff(channel.timestamps) >= 0):
+        return channel
+    order = np.argsort(channel.timestamps, kind='stable')
+    return ChannelData(channel.timestamps[order], channel.values[order], channel.laps[order], channel.offset)
+
+
+def _time_grid(channels, rate_hz: Optional[float]) -> np.ndarray:
+    """Uniform epoch-ns grid spanning every channel's samples."""
+    start = min(int(c.timestamps[0]) for c in channels)
+    end = max(int(c.timestamps[-1]) for c in channels)
+
+    if rate_hz is None:
+        # Fastest native rate, so no channel is downsampled by alignment
+        intervals = [np.median(np.diff(c.timestamps)) for c in channels if len(c.timestamps) > 1]
+        positive = [i for i in intervals if i > 0]
+        rate_hz = min(1e9 / min(positive), MAX_RATE_HZ) if positive else 1.0
+
+    step_ns = max(int(1e9 / rate_hz), 1)
+    return np.arange(start, end + 1, step_ns, dtype=np.int64)
+
+
+def _interpolate(timestamps: np.ndarray, values: np.ndarray, grid: np.ndarray,
+                 max_gap_ns: int) -> np.ndarray:
+    """Linear interpolation onto the grid; NaN outside coverage or across gaps."""
+    n = len(timestamps)
+    left = np.searchsorted(timestamps, grid, side='right') - 1
+    lo = np.clip(left, 0, n - 1)
+    hi = np.clip(left + 1, 0, n - 1)
+
+    # Grid points landing exactly on a sample don't need a right neighbour
+    exact = (left >= 0) & (timestamps[lo] == grid)
+    hi = np.where(exact, lo, hi)
+    valid = (left >= 0) & ((left + 1 < n) | exact)
+
+    t0 = timestamps[lo]
+    t1 = timestamps[hi]
+    v0 = values[lo].astype(np.float64)
+    v1 = values[hi].astype(np.float64)
+
+    span = (t1 - t0).astype(np.float64)
+    weight = np.divide((grid - t0).astype(np.float64), span, out=np.zeros(len(grid)), where=span > 0)
+    result = v0 + (v1 - v0) * weight
+
+    valid &= span <= max_gap_ns
+    result[~valid] = np.nan
+    return result
+
+
+def _sample_and_hold(timestamps: np.ndarray, values: np.ndarray, grid: np.ndarray,
+                     max_gap_ns: Optional[int] = None) -> np.ndarray:
+    """Most recent sample at or before each grid point."""
+    n = len(timestamps)
+    idx = np.searchsorted(timestamps, grid, side='right') - 1
+    held = values[np.clip(idx, 0, n - 1)]
+
+    if np.issubdtype(held.dtype, np.floating):
+        invalid = idx < 0
+        if max_gap_ns is not None:
+            invalid |= (grid - timestamps[np.clip(idx, 0, n - 1)]) > max_gap_ns
+        held = held.copy()
+        held[invalid] = np.nan
+    return held
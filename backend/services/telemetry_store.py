@@ -0,0 +1,164 @@
+"""Columnar telemetry store backed by partitioned Parquet datasets."""
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, Sequence
+from urllib.parse import unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+
+from backend.services.frame_schema import TELEMETRY
+
+# Columns kept from the raw long-format CSV (meta_* and expire_at are dropped)
+TELEMETRY_COLUMNS = ["vehicle_id", "telemetry_name", "telemetry_value", "lap", "timestamp"]
+
+TELEMETRY_COLUMN_TYPES = {
+    "vehicle_id": pa.string(),
+    "telemetry_name": pa.string(),
+    "telemetry_value": pa.float32(),
+    "lap": pa.int32(),
+    "timestamp": pa.timestamp("ns", tz="UTC"),
+}
+
+PARTITION_SCHEMA = pa.schema([
+    ("vehicle_id", pa.string()),
+    ("telemetry_name", pa.string()),
+])
+
+
+class TelemetryStore:
+    """Reads and writes telemetry partitioned by track/session/vehicle_id/telemetry_name.
+
+    Layout on disk::
+
+        {root}/{track}/{session}/vehicle_id=GR86-002-000/telemetry_name=speed/part-0.parquet
+
+    Readers only touch the partitions matching the requested vehicles and
+    channels, so load time depends on the slice asked for, not the file size.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or os.getenv("TELEMETRY_STORE_DIR", "data/_columnar"))
+
+    def session_dir(self, track_name: str, session: str) -> Path:
+        """Directory holding the partitioned dataset for one session."""
+        return self.root / track_name / session
+
+    def has_session(self, track_name: str, session: str) -> bool:
+        """Check whether a session has been ingested."""
+        session_dir = self.session_dir(track_name, session)
+        return session_dir.exists() and any(session_dir.iterdir())
+
+    def list_vehicles(self, track_name: str, session: str) -> List[str]:
+        """List vehicle IDs present in an ingested session."""
+        return self._list_partition_values(self.session_dir(track_name, session), "vehicle_id")
+
+    def list_channels(self, track_name: str, session: str) -> List[str]:
+        """List telemetry channel names present in an ingested session."""
+        channels = set()
+        session_dir = self.session_dir(track_name, session)
+        if session_dir.exists():
+            for vehicle_dir in session_dir.iterdir():
+                channels.update(self._list_partition_values(vehicle_dir, "telemetry_name"))
+        return sorted(channels)
+
+    def read(
+        self,
+        track_name: str,
+        session: str,
+        vehicle_ids: Optional[Sequence[str]] = None,
+        channels: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """Read telemetry for a session, pruning partitions by vehicle and channel.
+
+        Args:
+            track_name: Name of the track
+            session: Session name (e.g., 'R1')
+            vehicle_ids: Vehicles to load (all if None)
+            channels: Telemetry channel names to load (all if None)
+
+        Returns:
+            Long-format DataFrame in the compact TELEMETRY schema, empty if nothing matches
+        """
+        if not self.has_session(track_name, session):
+            return pd.DataFrame()
+
+        dataset = ds.dataset(
+            self.session_dir(track_name, session),
+            format="parquet",
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+        )
+
+        filter_expr = None
+        if vehicle_ids is not None:
+            filter_expr = ds.field("vehicle_id").isin(list(vehicle_ids))
+        if channels is not None:
+            channel_expr = ds.field("telemetry_name").isin(list(channels))
+            filter_expr = channel_expr if filter_expr is None else filter_expr & channel_expr
+
+        table = dataset.to_table(columns=TELEMETRY_COLUMNS, filter=filter_expr)
+        return TELEMETRY.apply(table.to_pandas())
+
+    def ingest_csv(self, csv_path: Path, track_name: str, session: str, block_size: int = 64 << 20) -> int:
+        """Convert a raw telemetry CSV into the partitioned columnar layout.
+
+        The CSV is streamed in blocks, so memory use stays bounded regardless of
+        file size. Any previous ingest of the same session is replaced.
+
+        Args:
+            csv_path: Path to a '{session}_*_telemetry_data.csv' file
+            track_name: Name of the track
+            session: Session name (e.g., 'R1')
+            block_size: Bytes of CSV decoded per batch
+
+        Returns:
+            Number of rows written
+        """
+        session_dir = self.session_dir(track_name, session)
+        if session_dir.exists():
+            shutil.rmtree(session_dir)
+        session_dir.mkdir(parents=True, exist_ok=True)
+
+        reader = pv.open_csv(
+            csv_path,
+            read_options=pv.ReadOptions(block_size=block_size),
+            convert_options=pv.ConvertOptions(
+                include_columns=TELEMETRY_COLUMNS,
+                column_types=TELEMETRY_COLUMN_TYPES,
+            ),
+        )
+
+        rows_written = 0
+
+        def batches():
+            nonlocal rows_written
+            for batch in reader:
+                rows_written += batch.num_rows
+                yield batch
+
+        ds.write_dataset(
+            batches(),
+            session_dir,
+            schema=reader.schema,
+            format="parquet",
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+            basename_template="part-{i}.parquet",
+            max_partitions=1 << 16,
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        return rows_written
+
+    @staticmethod
+    def _list_partition_values(directory: Path, key: str) -> List[str]:
+        """List hive partition values for a key directly under a directory."""
+        if not directory.exists():
+            return []
+        prefix = f"{key}="
+        return sorted(
+            unquote(d.name[len(prefix):])
+            for d in directory.iterdir()
+            if d.is_dir() and d.name.startswith(prefix)
+        )
@@ -0,0 +1,234 @@
+"""Multi-resolution min/max trace pyramids for charting lap telemetry."""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from backend.services.channel_arrays import ChannelArrayStore
+from backend.services.decimation import extrema_indices
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+# Each level holds the min and max of buckets FACTOR times longer than the previous one
+FACTOR = 4
+
+# Laps are reduced until their coarsest level is this short
+MIN_LEVEL_POINTS = 128
+
+ARRAY_FILES = {
+    "timestamps": ("timestamps.i8", "<i8"),  # epoch nanoseconds (UTC)
+    "values": ("values.f4", "<f4"),
+}
+
+
+class TraceLevel(NamedTuple):
+    """One resolution of a lap's channel trace, sorted by time.
+
+    ``bucket`` is the number of raw samples each min/max pair summarises
+    (1 for the raw trace).
+    """
+    bucket: int
+    timestamps: np.ndarray
+    values: np.ndarray
+
+
+def build_levels(timestamps: np.ndarray, values: np.ndarray) -> List[TraceLevel]:
+    """Raw trace plus min/max envelopes with buckets of FACTOR, FACTOR**2, ... samples."""
+    valid = ~np.isnan(values)
+    order = np.argsort(timestamps[valid], kind="stable")
+    timestamps = np.asarray(timestamps[valid][order], dtype=np.int64)
+    values = np.asarray(values[valid][order], dtype=np.float32)
+
+    levels = [TraceLevel(1, timestamps, values)]
+    positions = np.arange(len(values), dtype=np.int64)
+    bucket = FACTOR
+    while len(levels[-1].values) > MIN_LEVEL_POINTS:
+        keep = extrema_indices(positions // bucket, values)
+        levels.append(TraceLevel(bucket, timestamps[keep], values[keep]))
+        bucket *= FACTOR
+    return levels
+
+
+def select_level(levels: List[TraceLevel], width: int, start_ns: Optional[int] = None,
+                 end_ns: Optional[int] = None) -> Tuple[TraceLevel, int]:
+    """Coarsest level with at least one bucket per pixel in a time window.
+
+    Only binary searches and the returned slice touch the arrays, so the cost
+    follows the number of points drawn rather than the raw sample count.
+
+    Returns:
+        (the level sliced to [start_ns, end_ns), raw samples in the window)
+    """
+    raw = levels[0]
+    lo, hi = _window(raw.timestamps, start_ns, end_ns)
+    raw_samples = hi - lo
+
+    chosen = raw
+    for level in levels[1:]:
+        if level.bucket * width > raw_samples:
+            break
+        chosen = level
+
+    lo, hi = _window(chosen.timestamps, start_ns, end_ns)
+    return TraceLevel(chosen.bucket, chosen.timestamps[lo:hi], chosen.values[lo:hi]), raw_samples
+
+
+def _window(timestamps: np.ndarray, start_ns: Optional[int], end_ns: Optional[int]) -> Tuple[int, int]:
+    """Index range of the samples in [start_ns, end_ns)."""
+    lo = 0 if start_ns is None else int(np.searchsorted(timestamps, start_ns, side="left"))
+    hi = len(timestamps) if end_ns is None else int(np.searchsorted(timestamps, end_ns, side="left"))
+    return lo, max(hi, lo)
+
+
+class _MappedPyramids:
+    """Open memory maps and the level index for one session."""
+
+    def __init__(self, session_dir: Path):
+        index_path = session_dir / INDEX_FILE
+        self.index_mtime_ns = index_path.stat().st_mtime_ns
+        with open(index_path) as f:
+            self.index = json.load(f)
+
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (filename, dtype) in ARRAY_FILES.items():
+            if self.index["rows"] == 0:
+                self.arrays[name] = np.empty(0, dtype=dtype)
+            else:
+                self.arrays[name] = np.memmap(session_dir / filename, dtype=dtype, mode="r",
+                                              shape=(self.index["rows"],))
+
+    def levels(self, vehicle_id: str, channel: str, lap: int) -> Optional[List[TraceLevel]]:
+        """Views of every level of one lap trace."""
+        spans = self.index["vehicles"].get(vehicle_id, {}).get(channel, {}).get(str(lap))
+        if spans is None:
+            return None
+        return [
+            TraceLevel(bucket, self.arrays["timestamps"][offset:offset + count],
+                       self.arrays["values"][offset:offset + count])
+            for bucket, offset, count in spans
+        ]
+
+
+class TracePyramidStore:
+    """Precomputed trace levels per (vehicle, channel, lap), built from the channel arrays.
+
+    Layout on disk::
+
+        {root}/{track}/{session}/timestamps.i8   epoch-ns timestamps of every level
+        {root}/{track}/{session}/values.f4       values of every level (float32)
+        {root}/{track}/{session}/index.json      vehicle -> channel -> lap -> [[bucket, offset, count], ...]
+
+    The index records the mtime of the channel array index it was built from;
+    pyramids left over from an older build of the arrays are ignored.
+    """
+
+    def __init__(self, root: Optional[Path] = None, arrays: Optional[ChannelArrayStore] = None):
+        self.root = Path(root or os.getenv("TRACE_PYRAMID_DIR", "data/_pyramids"))
+        self.arrays = arrays or ChannelArrayStore()
+        self._sessions: Dict[tuple, _MappedPyramids] = {}
+        self._lock = threading.Lock()
+
+    def session_dir(self, track_name: str, session: str) -> Path:
+        """Directory holding the pyramids for one session."""
+        return self.root / track_name / session
+
+    def has_session(self, track_name: str, session: str) -> bool:
+        """Check whether pyramids of the session's current channel arrays exist."""
+        mapped = self._open(track_name, session)
+        return mapped is not None and mapped.index.get("source_mtime_ns") == self._source_mtime_ns(track_name, session)
+
+    def get_levels(self, track_name: str, session: str, vehicle_id: str, channel: str,
+                   lap: int) -> Optional[List[TraceLevel]]:
+        """Zero-copy levels of one lap trace, or None if absent."""
+        mapped = self._open(track_name, session)
+        if mapped is None:
+            return None
+        return mapped.levels(vehicle_id, channel, lap)
+
+    def build_from_arrays(self, track_name: str, session: str) -> int:
+        """Write the pyramids for a session whose channel arrays have been built.
+
+        Returns:
+            Number of points written across all levels
+        """
+        if not self.arrays.has_session(track_name, session):
+            raise FileNotFoundError(f"No channel arrays for {track_name}/{session}")
+        source_mtime_ns = self._source_mtime_ns(track_name, session)
+
+        session_dir = self.session_dir(track_name, session)
+        tmp_dir = session_dir.with_name(f"{session}.tmp-{os.getpid()}")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        handles = {name: open(tmp_dir / filename, "wb") for name, (filename, _) in ARRAY_FILES.items()}
+        vehicles: Dict[str, Dict[str, Dict[str, List[List[int]]]]] = {}
+        rows = 0
+
+        try:
+            for vehicle_id in self.arrays.list_vehicles(track_name, session):
+                for channel_name in self.arrays.list_channels(track_name, session, vehicle_id):
+                    channel = self.arrays.get_channel(track_name, session, vehicle_id, channel_name)
+                    laps = np.asarray(channel.laps)
+                    order = np.argsort(laps, kind="stable")
+                    boundaries = np.flatnonzero(np.diff(laps[order])) + 1
+
+                    lap_spans = vehicles.setdefault(vehicle_id, {}).setdefault(channel_name, {})
+                    for positions in np.split(order, boundaries):
+                        if len(positions) == 0:
+                            continue
+                        spans = []
+                        for level in build_levels(channel.timestamps[positions], channel.values[positions]):
+                            handles["timestamps"].write(level.timestamps.astype("<i8").tobytes())
+                            handles["values"].write(level.values.astype("<f4").tobytes())
+                            spans.append([level.bucket, rows, len(level.values)])
+                            rows += len(level.values)
+                        lap_spans[str(int(laps[positions[0]]))] = spans
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        index = {
+            "version": INDEX_VERSION,
+            "track": track_name,
+            "session": session,
+            "factor": FACTOR,
+            "source_mtime_ns": source_mtime_ns,
+            "rows": rows,
+            "vehicles": vehicles,
+        }
+        with open(tmp_dir / INDEX_FILE, "w") as f:
+            json.dump(index, f)
+
+        if session_dir.exists():
+            shutil.rmtree(session_dir)
+        tmp_dir.rename(session_dir)
+        return rows
+
+    def _open(self, track_name: str, session: str) -> Optional[_MappedPyramids]:
+        """Map a session's pyramids, reopening them if they were rebuilt."""
+        index_path = self.session_dir(track_name, session) / INDEX_FILE
+        try:
+            mtime_ns = index_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        key = (track_name, session)
+        with self._lock:
+            mapped = self._sessions.get(key)
+            if mapped is None or mapped.index_mtime_ns != mtime_ns:
+                mapped = _MappedPyramids(index_path.parent)
+                self._sessions[key] = mapped
+            return mapped
+
+    def _source_mtime_ns(self, track_name: str, session: str) -> Optional[int]:
+        """Version of the channel arrays the pyramids are built from."""
+        try:
+            return self.arrays.index_path(track_name, session).stat().st_mtime_ns
+        except OSError:
+            return None
@@ -1,28 +1,104 @@
 """Create sampled data for deployment."""
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import shutil
 
-def sample_telemetry(input_file, output_file, sample_rate=10):
-    """Sample telemetry data to reduce size."""
+from backend.services.decimation import extrema_indices
+
+# Size budget of each sampled telemetry file
+TARGET_TELEMETRY_MB = 15
+
+# Rows parsed per chunk while streaming a telemetry file
+CHUNK_ROWS = 500000
+
+SERIES_COLUMNS = ["vehicle_id", "telemetry_name", "lap"]
+
+
+def sample_telemetry(input_file, output_file, target_bytes=TARGET_TELEMETRY_MB * 1024 * 1024):
+    """Decimate telemetry to about target_bytes, keeping the peaks of every channel.
+    
+    Every (vehicle, channel, lap) series is split into buckets of equal sample
+    count, and only the rows holding each bucket's minimum and maximum value
+    are kept. Short series keep at least their extremes, so no vehicle,
+    channel or lap disappears, and brake-pressure and G-force peaks survive.
+    Kept rows are copied verbatim, in their original order.
+    """
     print(f"📊 Sampling {input_file.name}...")
     
-    # Read and sample every Nth row
-    df = pd.read_csv(input_file)
-    original_size = len(df)
+    with open(input_file, "rb") as raw:
+        header = raw.readline()
+        original_size = sum(1 for _ in raw)
+    file_size = input_file.stat().st_size
+    
+    if file_size <= target_bytes or original_size == 0:
+        shutil.copy2(input_file, output_file)
+        print(f"✅ Already within budget, copied {original_size:,} rows")
+        return output_file.stat().st_size
     
-    # Keep every Nth row
-    sampled_df = df.iloc[::sample_rate]
+    # Rows per bucket so that two rows per bucket fit the budget
+    bytes_per_row = (file_size - len(header)) / original_size
+    target_rows = max(target_bytes / bytes_per_row, 1)
+    bucket_rows = max(int(np.ceil(2 * original_size / target_rows)), 1)
     
-    # Save sampled data
-    sampled_df.to_csv(output_file, index=False)
+    keep = np.zeros(original_size, dtype=bool)
+    keep[_select_rows(input_file, bucket_rows)] = True
     
-    new_size = len(sampled_df)
+    # Copy the kept lines as they are
+    with open(input_file, "rb") as raw, open(output_file, "wb") as out:
+        out.write(raw.readline())
+        for row, line in enumerate(raw):
+            if keep[row]:
+                out.write(line)
+    
+    new_size = int(keep.sum())
     reduction = (1 - new_size/original_size) * 100
     
     print(f"✅ Reduced from {original_size:,} to {new_size:,} rows ({reduction:.1f}% reduction)")
     return output_file.stat().st_size
 
+
+def _select_rows(input_file, bucket_rows):
+    """Row numbers holding the min/max of each bucket of every (vehicle, channel, lap) series."""
+    series_ids = {}
+    series_counts = np.zeros(0, dtype=np.int64)
+    labels, values, rows = [], [], []
+    position = 0
+    
+    reader = pd.read_csv(
+        input_file,
+        usecols=SERIES_COLUMNS + ["telemetry_value"],
+        dtype={"vehicle_id": "str", "telemetry_name": "str", "lap": "float64", "telemetry_value": "float64"},
+        chunksize=CHUNK_ROWS,
+        skip_blank_lines=False
+    )
+    with reader:
+        for chunk in reader:
+            keys = chunk[SERIES_COLUMNS].fillna({"lap": -1})
+            codes, uniques = pd.factorize(pd.MultiIndex.from_frame(keys))
+    
+            # Continue each series' sample count from previous chunks
+            sids = np.array([series_ids.setdefault(key, len(series_ids)) for key in uniques], dtype=np.int64)
+            if len(series_ids) > len(series_counts):
+                series_counts = np.pad(series_counts, (0, len(series_ids) - len(series_counts)))
+            sample_sids = sids[codes]
+            ordinal = series_counts[sample_sids] + pd.Series(codes).groupby(codes).cumcount().to_numpy()
+            series_counts += np.bincount(sample_sids, minlength=len(series_counts))
+    
+            # Bucket extremes in this chunk; buckets split across chunks are reduced again below
+            chunk_labels = sample_sids * (1 << 32) + ordinal // bucket_rows
+            chunk_values = chunk["telemetry_value"].to_numpy()
+            selected = extrema_indices(chunk_labels, chunk_values)
+            labels.append(chunk_labels[selected])
+            values.append(chunk_values[selected])
+            rows.append(position + selected)
+            position += len(chunk)
+    
+    if not labels:
+        return np.zeros(0, dtype=np.int64)
+    labels, values, rows = np.concatenate(labels), np.concatenate(values), np.concatenate(rows)
+    return rows[extrema_indices(labels, values)]
+
 def prepare_sampled_data():
     """Prepare sampled data for deployment."""
     
@@ -58,10 +134,10 @@ def prepare_sampled_data():
             total_size += size
             print(f"✅ Copied {file.name} ({size/1024/1024:.2f} MB)")
     
-    # Sample telemetry files (huge)
+    # Decimate telemetry files (huge) to a fixed budget each
     for file in track_data.glob("*_telemetry_data.csv"):
         dest = track_dest / file.name
-        size = sample_telemetry(file, dest, sample_rate=100)  # Keep 1% of data
+        size = sample_telemetry(file, dest)
         total_size += size
         print(f"✅ Sampled {file.name} ({size/1024/1024:.2f} MB)")
     
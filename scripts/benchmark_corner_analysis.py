@@ -0,0 +1,134 @@
+"""Benchmark AMICOS corner metrics: segment reductions vs the former per-corner loop.
+
+Runs both on a synthetic aligned session (speed, accx, accy with NaN gaps)
+holding thousands of corners and checks that every corner's metrics match:
+
+    python scripts/benchmark_corner_analysis.py --samples 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.amicos_engine import AMICOSEngine
+
+
+def synthetic_session(samples: int, seed: int) -> pd.DataFrame:
+    """Straights and corners of random length with noisy sensors and a few NaN."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(8, 300, size=samples // 40 + 1)
+    cornering = np.repeat(np.arange(len(lengths)) % 2 == 1, lengths)[:samples]
+    side = np.repeat(rng.choice([-1.0, 1.0], len(lengths)), lengths)[:samples]
+
+    accy = np.where(cornering, side * rng.uniform(0.5, 1.3, samples), rng.normal(0, 0.15, samples))
+    accx = rng.normal(0, 0.4, samples)
+    speed = np.clip(150 - 60 * cornering + rng.normal(0, 5, samples), 0, None)
+    for values in (speed, accx, accy):
+        values[rng.random(samples) < 0.002] = np.nan
+    return pd.DataFrame({"speed": speed, "accx_can": accx, "accy_can": accy})
+
+
+def analyze_single_corner(engine: AMICOSEngine, corner: dict, speed_data: pd.Series,
+                          accx_data: pd.Series, accy_data: pd.Series) -> dict:
+    """The former AMICOSEngine._analyze_single_corner, without the unused steering slice."""
+    start_idx, end_idx = corner['start_idx'], corner['end_idx']
+    corner_speed = speed_data.iloc[start_idx:end_idx]
+    corner_accx = accx_data.iloc[start_idx:end_idx]
+    corner_accy = accy_data.iloc[start_idx:end_idx]
+
+    entry_speed = corner_speed.iloc[0] if len(corner_speed) > 0 else 0
+    apex_speed = corner_speed.iloc[len(corner_speed)//2] if len(corner_speed) > 0 else 0
+    exit_speed = corner_speed.iloc[-1] if len(corner_speed) > 0 else 0
+    entry_speed_ms = entry_speed / 3.6
+    apex_speed_ms = apex_speed / 3.6
+    exit_speed_ms = exit_speed / 3.6
+
+    max_lateral_g = abs(corner_accy).max() if not corner_accy.empty else 0
+    if max_lateral_g > 0.1:
+        corner_radius = (apex_speed_ms ** 2) / (max_lateral_g * engine.g)
+    else:
+        corner_radius = 100
+    theoretical_max_speed_kmh = np.sqrt(engine.mu_dry * engine.g * corner_radius) * 3.6
+
+    entry_momentum = engine.mass_kg * entry_speed_ms
+    exit_momentum = engine.mass_kg * exit_speed_ms
+    if corner_radius > 0:
+        apex_yaw_rate = apex_speed_ms / corner_radius
+        angular_momentum = engine.moment_of_inertia * apex_yaw_rate
+    else:
+        apex_yaw_rate = 0
+        angular_momentum = 0
+    if max_lateral_g > 0:
+        lateral_load_transfer = (engine.mass_kg * max_lateral_g * engine.g * engine.cg_height_m) / engine.track_width_m
+    else:
+        lateral_load_transfer = 0
+    if not corner_accx.empty and not corner_accy.empty:
+        max_combined_g = np.sqrt(corner_accx**2 + corner_accy**2).max()
+        grip_utilization = (max_combined_g / engine.mu_dry) * 100
+    else:
+        max_combined_g = 0
+        grip_utilization = 0
+    speed_efficiency = (apex_speed / theoretical_max_speed_kmh * 100) if theoretical_max_speed_kmh > 0 else 0
+    momentum_gain = ((exit_momentum - entry_momentum) / entry_momentum * 100) if entry_momentum > 0 else 0
+
+    def safe_round(value, decimals=1):
+        return round(float(value), decimals) if not np.isnan(value) and not np.isinf(value) else 0.0
+
+    return {
+        "corner_number": len(corner_speed),
+        "entry_speed_kmh": safe_round(entry_speed, 1),
+        "apex_speed_kmh": safe_round(apex_speed, 1),
+        "exit_speed_kmh": safe_round(exit_speed, 1),
+        "theoretical_max_speed_kmh": safe_round(theoretical_max_speed_kmh, 1),
+        "speed_efficiency_pct": safe_round(speed_efficiency, 1),
+        "corner_radius_m": safe_round(corner_radius, 1),
+        "max_lateral_g": safe_round(max_lateral_g, 2),
+        "max_combined_g": safe_round(max_combined_g, 2),
+        "grip_utilization_pct": safe_round(grip_utilization, 1),
+        "angular_momentum": safe_round(angular_momentum, 1),
+        "yaw_rate_rad_s": safe_round(apex_yaw_rate, 3),
+        "lateral_load_transfer_n": safe_round(lateral_load_transfer, 1),
+        "momentum_gain_pct": safe_round(momentum_gain, 1)
+    }
+
+
+def timed(fn, repeat: int):
+    """Best-of-repeat wall time of fn() in milliseconds, and its result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = AMICOSEngine()
+    aligned = synthetic_session(args.samples, seed=7)
+    speed, accx, accy = aligned["speed"], aligned["accx_can"], aligned["accy_can"]
+    corners = engine._detect_corners(speed, accy, pd.Series(dtype=float))
+    corner_dicts = [{'start_idx': int(s), 'end_idx': int(e)} for s, e in zip(corners.start, corners.end)]
+
+    loop_ms, expected = timed(
+        lambda: [analyze_single_corner(engine, corner, speed, accx, accy) for corner in corner_dicts], args.repeat)
+    batch_ms, result = timed(lambda: engine._analyze_corners(corners, speed, accx, accy), args.repeat)
+
+    print(f"📦 {args.samples:,} samples, {len(corner_dicts):,} corners, best of {args.repeat}\n")
+    print(f"per-corner loop    {loop_ms:10.1f} ms")
+    print(f"segment reductions {batch_ms:10.1f} ms   ({loop_ms / batch_ms:.0f}x)")
+    print(f"{'✅' if result == expected else '❌'} metrics {'match' if result == expected else 'differ'} "
+          f"for all {len(expected):,} corners")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Benchmark S3 key resolution: per-request pattern probing vs. the bucket manifest.
+
+Runs against an in-process S3 stand-in (moto), with an optional simulated
+round-trip latency per request:
+
+    pip install "moto[s3]"
+    python scripts/benchmark_s3_manifest.py --tracks 6 --filler 1500 --latency-ms 20
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BUCKET = "apex-racing-data"
+
+# How each track names its files (mirrors the layouts handled by S3DataLoader)
+LAYOUTS = [
+    "data/{track}/{base}/{session}_{base}_{kind}.csv",
+    "data/{track}/{session}_{track}_{kind}.csv",
+    "data/{track}/Race {n}/{upper}_{kind}_time_{session}.csv",
+]
+
+
+def populate(s3_client, tracks: int, filler: int):
+    """Create lap files for every track/session plus unrelated filler objects."""
+    names = []
+    for t in range(tracks):
+        track = f"track{t}_raceway"
+        base = track.split("_")[0]
+        names.append(track)
+        layout = LAYOUTS[t % len(LAYOUTS)]
+        for n in (1, 2):
+            for kind in ("lap_start", "lap_end"):
+                key = layout.format(track=track, base=base, session=f"R{n}", n=n, kind=kind, upper=base.upper())
+                s3_client.put_object(Bucket=BUCKET, Key=key, Body=b"vehicle_id,lap,timestamp\n")
+    for i in range(filler):
+        s3_client.put_object(Bucket=BUCKET, Key=f"data/{names[0]}/extra/file_{i:05d}.txt", Body=b"")
+    return names
+
+
+def legacy_filenames(track: str, session: str, file_type: str) -> list:
+    """The filename patterns the loader used to try, in order."""
+    base = track.split("_")[0]
+    patterns = []
+    for variant in (file_type, f"{file_type}_time"):
+        patterns.extend([
+            f"{session}_{base}_{variant}.csv",
+            f"{session}_{track}_{variant}.csv",
+            f"{session}_{track.replace('_', '-')}_{variant}.csv",
+            f"{session}_indianapolis_motor_speedway_{variant}.csv",
+            f"{session}_circuit_of_the_americas_{variant}.csv",
+            f"{session}_virginia_international_raceway_{variant}.csv",
+            f"{track.upper()}_{variant}_{session}.csv",
+            f"{base.upper()}_{variant}_{session}.csv",
+            f"{session}_{variant}.csv",
+        ])
+    return patterns
+
+
+def legacy_keys(track: str, session: str, filename: str) -> list:
+    """The key prefixes the loader used to try for each filename."""
+    n = session[1:]
+    return [
+        f"data/{track}/{track.split('_')[0]}/{filename}",
+        f"data/{track}/{filename}",
+        f"data/{track}/Race {n}/{filename}",
+        f"data/{track}/race {n}/{filename}",
+    ]
+
+
+def legacy_resolve(loader, track: str, session: str, file_type: str):
+    """The previous resolution strategy: HEAD every candidate key until one exists."""
+    for filename in legacy_filenames(track, session, file_type):
+        for s3_key in legacy_keys(track, session, filename):
+            try:
+                loader.s3_client.head_object(Bucket=loader.bucket_name, Key=s3_key)
+                return s3_key
+            except Exception:
+                continue
+    return None
+
+
+def legacy_sessions(loader, track: str):
+    """The previous session listing: a single, unpaginated list_objects_v2 call."""
+    response = loader.s3_client.list_objects_v2(Bucket=loader.bucket_name, Prefix=f"data/{track}/")
+    sessions = set()
+    for obj in response.get("Contents", []):
+        filename = obj["Key"].split("/")[-1]
+        if "lap_start" not in filename:
+            continue
+        if filename.startswith("R") and filename[1].isdigit():
+            sessions.add(filename[:2])
+        elif "_R" in filename:
+            sessions.add("R" + filename.split("_R")[1].split(".")[0])
+    return sorted(sessions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=6)
+    parser.add_argument("--filler", type=int, default=1500,
+                        help="Unrelated objects in the first track, to exceed one listing page")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated round trip per S3 request")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ["S3_BUCKET_NAME"] = BUCKET
+
+    from moto import mock_aws
+    from backend.services.s3_data_loader import S3DataLoader
+
+    with mock_aws():
+        loader = S3DataLoader()
+        loader.s3_client.create_bucket(Bucket=BUCKET)
+        tracks = populate(loader.s3_client, args.tracks, args.filler)
+
+        requests = {"count": 0}
+
+        def on_request(**kwargs):
+            requests["count"] += 1
+            if args.latency_ms:
+                time.sleep(args.latency_ms / 1000)
+
+        loader.s3_client.meta.events.register("before-call.s3.*", on_request)
+
+        lookups = [(t, s, k) for t in tracks for s in ("R1", "R2") for k in ("lap_start", "lap_end")]
+
+        def run(label, resolve):
+            requests["count"] = 0
+            start = time.perf_counter()
+            found = [resolve(*lookup) for lookup in lookups]
+            elapsed = time.perf_counter() - start
+            print(f"{label:<10} {len(lookups)} lookups, {sum(k is not None for k in found)} found, "
+                  f"{requests['count']} S3 requests, {elapsed * 1000:.1f} ms")
+            return found
+
+        print(f"📦 {len(tracks)} tracks, {args.filler} filler objects, {args.latency_ms} ms/request\n")
+        legacy = run("probing", lambda *lookup: legacy_resolve(loader, *lookup))
+        manifest = run("manifest", loader._resolve_key)
+        agree = sum(a == b for a, b in zip(legacy, manifest) if a is not None)
+        print(f"\n✅ Manifest agrees on {agree}/{sum(k is not None for k in legacy)} keys found by probing")
+
+        requests["count"] = 0
+        truncated = sum(len(legacy_sessions(loader, t)) for t in tracks)
+        complete = sum(len(loader.get_available_sessions(t)) for t in tracks)
+        print(f"📋 Sessions found - single listing page: {truncated}, manifest: {complete} "
+              f"(expected {len(tracks) * 2})")
+
+
+if __name__ == "__main__":
+    main()
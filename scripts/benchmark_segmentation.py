@@ -0,0 +1,106 @@
+"""Benchmark the NumPy run-length segmentation against the Python loops it replaced.
+
+Synthetic brake pressure and lateral G traces with realistic event lengths
+(20 Hz-like runs of tens to hundreds of samples) and a few NaN gaps:
+
+    python scripts/benchmark_segmentation.py --samples 2000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.segmentation import above_threshold, runs, threshold_runs
+
+
+def synthetic_trace(samples: int, high: float, seed: int) -> np.ndarray:
+    """Alternating quiet and active stretches with noise and occasional NaN."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(5, 400, size=samples // 50 + 1)
+    levels = np.where(np.arange(len(lengths)) % 2 == 0, 0.1 * high, 2.5 * high)
+    trace = np.repeat(levels, lengths)[:samples] + rng.normal(0, 0.3 * high, samples)
+    trace[rng.random(samples) < 0.001] = np.nan
+    return trace
+
+
+def loop_brake_applications(pressure: pd.Series, threshold: float) -> int:
+    """The former AdvancedAnalytics.get_braking_analysis loop."""
+    brake_applications = 0
+    in_braking_zone = False
+    for value in pressure:
+        if value > threshold and not in_braking_zone:
+            brake_applications += 1
+            in_braking_zone = True
+        elif value <= threshold:
+            in_braking_zone = False
+    return brake_applications
+
+
+def loop_corners(accy: pd.Series, threshold: float) -> list:
+    """The former AMICOSEngine._detect_corners loop."""
+    corner_mask = abs(accy) > threshold
+    corners = []
+    in_corner = False
+    corner_start = 0
+    for idx, is_cornering in enumerate(corner_mask):
+        if is_cornering and not in_corner:
+            corner_start = idx
+            in_corner = True
+        elif not is_cornering and in_corner:
+            if idx - corner_start > 10:
+                corners.append((corner_start, idx, corner_start + (idx - corner_start) // 2))
+            in_corner = False
+    return corners
+
+
+def vector_corners(accy: pd.Series, threshold: float) -> list:
+    """The AMICOSEngine._detect_corners kernel call."""
+    lateral_g = np.nan_to_num(np.abs(accy.to_numpy(dtype=np.float64)), nan=0.0)
+    segments = runs(lateral_g > threshold, min_length=11, include_open=False)
+    return list(zip(segments.start.tolist(), segments.end.tolist(), segments.peak.tolist()))
+
+
+def timed(fn, repeat: int):
+    """Best-of-repeat wall time of fn() in milliseconds, and its result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pressure = pd.Series(synthetic_trace(args.samples, 2.0, seed=1))
+    accy = pd.Series(synthetic_trace(args.samples, 0.4, seed=2) * np.where(np.arange(args.samples) % 3, 1, -1))
+
+    print(f"📦 {args.samples:,} samples, best of {args.repeat}\n")
+    print(f"{'kernel':<22}{'loop ms':>10}{'numpy ms':>10}{'speedup':>9}{'events':>9}  match")
+
+    loop_ms, expected = timed(lambda: loop_brake_applications(pressure, 2.0), args.repeat)
+    numpy_ms, segments = timed(lambda: runs(above_threshold(pressure.to_numpy(dtype=np.float64), 2.0)), args.repeat)
+    print(f"{'brake applications':<22}{loop_ms:10.1f}{numpy_ms:10.2f}{loop_ms / numpy_ms:8.0f}x"
+          f"{len(segments.start):9,}  {'✅' if len(segments.start) == expected else '❌'}")
+
+    loop_ms, expected = timed(lambda: loop_corners(accy, 0.4), args.repeat)
+    numpy_ms, corners = timed(lambda: vector_corners(accy, 0.4), args.repeat)
+    print(f"{'corners':<22}{loop_ms:10.1f}{numpy_ms:10.2f}{loop_ms / numpy_ms:8.0f}x"
+          f"{len(corners):9,}  {'✅' if corners == expected else '❌'}")
+
+    numpy_ms, segments = timed(lambda: threshold_runs(pressure.to_numpy(dtype=np.float64), 2.0, exit=1.0,
+                                                      min_length=5), args.repeat)
+    print(f"{'hysteresis + peaks':<22}{'-':>10}{numpy_ms:10.2f}{'-':>9}{len(segments.start):9,}")
+
+
+if __name__ == "__main__":
+    main()
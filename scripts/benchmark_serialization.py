@@ -0,0 +1,102 @@
+"""Benchmark response serialization and compression on real analysis payloads.
+
+Compares the stock path (FastAPI's jsonable_encoder + json.dumps) with the
+orjson renderer, and the bytes on the wire uncompressed, gzip and brotli:
+
+    python scripts/benchmark_serialization.py --track barber_motorsports_park --session R1
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def build_payloads(track: str, session: str, lap: int):
+    """Session-wide payloads as returned by the services, keyed by name."""
+    from backend.services.lap_analyzer import LapAnalyzer
+    from backend.services.strategy_engine import StrategyEngine
+    from backend.services.telemetry_analyzer import TelemetryAnalyzer
+
+    analyzer = LapAnalyzer()
+    strategy = StrategyEngine()
+    drivers = analyzer.get_drivers(track, session)
+
+    payloads = {
+        "sector-analysis": analyzer.analyze_sectors(track, session),
+        "degradation (all drivers)": {
+            driver: strategy.predict_tire_degradation(track, session, driver) for driver in drivers
+        },
+        "performance (all drivers)": {
+            driver: analyzer.analyze_driver_performance(track, session, driver) for driver in drivers
+        },
+    }
+
+    telemetry = TelemetryAnalyzer()
+    for driver in drivers:
+        trace = telemetry.get_lap_trace(track, session, driver, lap, width=2000)
+        if "error" not in trace:
+            # numpy arrays as returned by the service
+            payloads["lap trace, 2000 px"] = trace
+            break
+    return payloads
+
+
+def timed(fn, repeat: int):
+    """Best-of-repeat wall time of fn() in milliseconds, and its result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--track", default="barber_motorsports_park")
+    parser.add_argument("--session", default="R1")
+    parser.add_argument("--lap", type=int, default=3, help="Lap used for the trace payload")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+
+    from backend.compression import brotli, compress
+    from backend.routers.negotiation import FastJSONResponse
+
+    def stock(payload):
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def fast(payload):
+        return FastJSONResponse(payload).body
+
+    payloads = build_payloads(args.track, args.session, args.lap)
+    print(f"📦 {args.track}/{args.session}, best of {args.repeat}\n")
+    print(f"{'payload':<28}{'stock ms':>10}{'orjson ms':>11}{'json KB':>10}{'gzip KB':>10}{'gzip ms':>9}"
+          f"{'br KB':>8}{'br ms':>8}")
+
+    for name, payload in payloads.items():
+        try:
+            stock_ms, _ = timed(lambda: stock(payload), args.repeat)
+            stock_cell = f"{stock_ms:10.2f}"
+        except (TypeError, ValueError):
+            stock_cell = f"{'fails':>10}"  # numpy arrays / NaN
+        fast_ms, body = timed(lambda: fast(payload), args.repeat)
+        gzip_ms, gz = timed(lambda: compress(body, "gzip"), args.repeat)
+        line = f"{name:<28}{stock_cell}{fast_ms:11.2f}{len(body) / 1024:10.1f}{len(gz) / 1024:10.1f}{gzip_ms:9.2f}"
+        if brotli is not None:
+            br_ms, br = timed(lambda: compress(body, "br"), args.repeat)
+            line += f"{len(br) / 1024:8.1f}{br_ms:8.2f}"
+        else:
+            line += f"{'n/a':>8}{'n/a':>8}"
+        print(line)
+
+    if brotli is None:
+        print("\nℹ️  brotli is not installed; responses fall back to gzip")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Build a track's corner catalog from a reference lap and store it in vehicle_specs.py.
+
+The fastest lap with a complete speed trace is used unless one is chosen:
+
+    python scripts/build_corner_catalog.py --track barber_motorsports_park
+    python scripts/build_corner_catalog.py --track barber_motorsports_park --session R2 --driver GR86-065-5 --lap 5
+"""
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.config.vehicle_specs import CORNER_CATALOG
+from backend.services.corner_catalog import CornerCatalogBuilder
+from backend.services.lap_analyzer import LapAnalyzer
+
+SPECS_PATH = Path(__file__).resolve().parent.parent / "backend" / "config" / "vehicle_specs.py"
+BLOCK = re.compile(r"(# BEGIN CORNER_CATALOG[^\n]*\n).*?(# END CORNER_CATALOG)", re.DOTALL)
+
+
+def render_catalog(catalogs: dict) -> str:
+    """CORNER_CATALOG as Python source, one corner per line."""
+    lines = ["CORNER_CATALOG = {"]
+    for t, (track_name, catalog) in enumerate(sorted(catalogs.items())):
+        corners = ",\n".join(f"            {json.dumps(corner)}" for corner in catalog["corners"])
+        lines += [
+            f"    {json.dumps(track_name)}: {{",
+            f"        \"lap_length_m\": {catalog['lap_length_m']},",
+            f"        \"reference\": {json.dumps(catalog['reference'])},",
+            "        \"corners\": [",
+            corners,
+            "        ]",
+            "    }" + ("," if t < len(catalogs) - 1 else ""),
+        ]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--track", required=True, help="Track to catalog (e.g., barber_motorsports_park)")
+    parser.add_argument("--session", action="append", help="Session(s) to pick the reference lap from (default: all)")
+    parser.add_argument("--driver", help="Take the reference lap from this vehicle")
+    parser.add_argument("--lap", type=int, help="Use this lap of --driver as the reference")
+    parser.add_argument("--dry-run", action="store_true", help="Print the catalog without writing vehicle_specs.py")
+    args = parser.parse_args()
+
+    if args.lap is not None and args.driver is None:
+        parser.error("--lap requires --driver")
+
+    sessions = args.session or LapAnalyzer().get_sessions(args.track)
+    catalog = CornerCatalogBuilder().build(args.track, sessions, driver_id=args.driver, lap=args.lap)
+    if "error" in catalog:
+        print(f"❌ {catalog['error']}")
+        sys.exit(1)
+
+    reference = catalog["reference"]
+    print(f"🏁 {args.track}: reference {reference['session']} {reference['driver_id']} lap {reference['lap']} "
+          f"({reference['lap_time_s']:.3f}s, {catalog['lap_length_m']:.0f} m)")
+    for corner in catalog["corners"]:
+        print(f"   {corner['id']:>4}  {corner['start_m']:7.1f} → {corner['end_m']:7.1f} m  "
+              f"apex {corner['apex_m']:7.1f} m  {corner['apex_speed_kmh']:5.1f} km/h  {corner['max_lateral_g']:.2f} G")
+
+    if args.dry_run:
+        return
+
+    source = SPECS_PATH.read_text()
+    rendered = render_catalog({**CORNER_CATALOG, args.track: catalog})
+    SPECS_PATH.write_text(BLOCK.sub(lambda m: m.group(1) + rendered + m.group(2), source))
+    print(f"✅ {len(catalog['corners'])} corners written to {SPECS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Convert raw telemetry CSVs into the partitioned columnar store, memory-mapped arrays and trace pyramids."""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.channel_arrays import ChannelArrayStore
+from backend.services.telemetry_index import build_lap_index, index_path
+from backend.services.telemetry_store import TelemetryStore
+from backend.services.trace_pyramid import TracePyramidStore
+
+TELEMETRY_PATTERNS = ["*_telemetry_data.csv", "*_telemetry.csv"]
+
+
+def find_telemetry_files(data_dir: Path, track: str = None):
+    """Yield (track_name, session, csv_path) for every raw telemetry file."""
+    for track_dir in sorted(data_dir.iterdir()):
+        if not track_dir.is_dir() or track_dir.name.startswith("_"):
+            continue
+        if track and track_dir.name != track:
+            continue
+        seen = set()
+        for pattern in TELEMETRY_PATTERNS:
+            for csv_path in sorted(track_dir.rglob(pattern)):
+                session = csv_path.name.split("_")[0]
+                if session in seen:
+                    continue
+                seen.add(session)
+                yield track_dir.name, session, csv_path
+
+
+def ingest_all(data_dir: Path, track: str = None, session: str = None, force: bool = False,
+               build_arrays: bool = True, lap_index_only: bool = False):
+    """Ingest every telemetry CSV under data_dir into the columnar store."""
+    store = TelemetryStore()
+    arrays = ChannelArrayStore()
+    pyramids = TracePyramidStore(arrays=arrays)
+
+    for track_name, file_session, csv_path in find_telemetry_files(data_dir, track):
+        if session and file_session != session:
+            continue
+
+        # The lap index sits next to the CSV so it is uploaded to S3 with it
+        start = time.perf_counter()
+        index = build_lap_index(csv_path)
+        print(f"🗂️  {track_name}/{file_session}: lap index for {len(index['vehicles'])} vehicles "
+              f"in {time.perf_counter() - start:.1f}s -> {index_path(csv_path)}")
+        if lap_index_only:
+            continue
+
+        if store.has_session(track_name, file_session) and not force:
+            print(f"⏭️  {track_name}/{file_session} already ingested (use --force to rebuild)")
+            continue
+
+        size_mb = csv_path.stat().st_size / 1024 / 1024
+        print(f"📦 Ingesting {csv_path} ({size_mb:.1f} MB)...")
+        start = time.perf_counter()
+        rows = store.ingest_csv(csv_path, track_name, file_session)
+        elapsed = time.perf_counter() - start
+        print(f"✅ {track_name}/{file_session}: {rows:,} rows in {elapsed:.1f}s "
+              f"-> {store.session_dir(track_name, file_session)}")
+
+        if build_arrays:
+            start = time.perf_counter()
+            samples = arrays.build_from_store(store, track_name, file_session)
+            elapsed = time.perf_counter() - start
+            print(f"✅ {track_name}/{file_session}: {samples:,} samples mapped in {elapsed:.1f}s "
+                  f"-> {arrays.session_dir(track_name, file_session)}")
+
+            start = time.perf_counter()
+            points = pyramids.build_from_arrays(track_name, file_session)
+            elapsed = time.perf_counter() - start
+            print(f"✅ {track_name}/{file_session}: {points:,} trace pyramid points in {elapsed:.1f}s "
+                  f"-> {pyramids.session_dir(track_name, file_session)}")
+
+    print("\n🏁 Telemetry ingestion complete!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data-dir", default="data", help="Root of the extracted race data")
+    parser.add_argument("--track", help="Only ingest this track (e.g., barber_motorsports_park)")
+    parser.add_argument("--session", help="Only ingest this session (e.g., R1)")
+    parser.add_argument("--force", action="store_true", help="Rebuild sessions that were already ingested")
+    parser.add_argument("--skip-arrays", action="store_true", help="Don't build the memory-mapped channel arrays and trace pyramids")
+    parser.add_argument("--lap-index-only", action="store_true",
+                        help="Only (re)build the per-lap byte-offset index next to each CSV")
+    args = parser.parse_args()
+
+    ingest_all(Path(args.data_dir), track=args.track, session=args.session, force=args.force,
+               build_arrays=not args.skip_arrays, lap_index_only=args.lap_index_only)
+
+
+if __name__ == "__main__":
+    main()
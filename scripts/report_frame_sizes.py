@@ -0,0 +1,56 @@
+"""Report how much memory the compact frame schemas save per session."""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.frame_schema import LAP_EVENTS, TELEMETRY, schema_savings
+
+# filename pattern -> schema applied when that table is loaded
+SESSION_FILES = [
+    ("{session}_*lap_start.csv", LAP_EVENTS),
+    ("{session}_*lap_end.csv", LAP_EVENTS),
+    ("{session}_*_telemetry_data.csv", TELEMETRY),
+]
+
+
+def _mb(nbytes: int) -> str:
+    return f"{nbytes / 1024 / 1024:,.1f} MB"
+
+
+def report(data_dir: Path, track: str = None, max_rows: int = None):
+    """Print raw vs compact resident size for every session table under data_dir."""
+    for track_dir in sorted(data_dir.iterdir()):
+        if not track_dir.is_dir() or track_dir.name.startswith("_"):
+            continue
+        if track and track_dir.name != track:
+            continue
+
+        sessions = sorted({p.name.split("_")[0] for p in track_dir.rglob("R*_*.csv")})
+        for session in sessions:
+            raw_total = compact_total = 0
+            print(f"\n📊 {track_dir.name}/{session}")
+            for pattern, schema in SESSION_FILES:
+                for csv_path in sorted(track_dir.rglob(pattern.format(session=session))):
+                    sizes = schema_savings(csv_path, schema, max_rows=max_rows)
+                    raw_total += sizes["raw_bytes"]
+                    compact_total += sizes["compact_bytes"]
+                    ratio = sizes["raw_bytes"] / sizes["compact_bytes"] if sizes["compact_bytes"] else 0
+                    print(f"   {csv_path.name}: {sizes['rows']:,} rows, {_mb(sizes['raw_bytes'])} -> "
+                          f"{_mb(sizes['compact_bytes'])} ({ratio:.1f}x)")
+            print(f"   ✅ saved {_mb(raw_total - compact_total)} of {_mb(raw_total)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data-dir", default="data", help="Root of the extracted race data")
+    parser.add_argument("--track", help="Only report this track (e.g., barber_motorsports_park)")
+    parser.add_argument("--max-rows", type=int, help="Only measure the first N rows of each file")
+    args = parser.parse_args()
+
+    report(Path(args.data_dir), track=args.track, max_rows=args.max_rows)
+
+
+if __name__ == "__main__":
+    main()
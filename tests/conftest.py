@@ -0,0 +1,9 @@
+"""Shared test setup: import from the repository root and keep results out of the result store."""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Services under test are given synthetic data; never persist or reuse their results
+os.environ['RESULT_STORE_MAX_MB'] = '0'
@@ -0,0 +1,69 @@
+"""Batch endpoint: per-driver channel preload and independent session groups."""
+import asyncio
+
+import orjson
+
+from backend.routers import batch
+from backend.routers.batch import Analysis, BatchItem, BatchRequest
+
+
+class RecordingRepository:
+    """Records preload calls instead of reading any data."""
+
+    def __init__(self):
+        self.calls = []
+
+    def load_lap_times(self, track_name, session):
+        self.calls.append(("lap_times", session))
+
+    def load_channels(self, track_name, session, driver_id, channels=None):
+        self.calls.append(("channels", session, driver_id, channels))
+
+
+def item(analysis, session="R1", driver_id="GR86-001-1", **params):
+    return BatchItem(analysis=analysis, track_name="barber", session=session, driver_id=driver_id, params=params)
+
+
+def test_preload_reads_each_drivers_channel_union_once(monkeypatch):
+    repository = RecordingRepository()
+    monkeypatch.setattr(batch, "get_session_repository", lambda: repository)
+
+    asyncio.run(batch._preload("barber", "R1", [
+        item("speed-analysis"),
+        item("amicos-analysis"),
+        item("delta", lap_number=3),
+        item("performance"),
+        item("speed-analysis", driver_id="GR86-002-2"),
+        item("telemetry-speed-analysis", driver_id="GR86-002-2"),
+        item("lap", driver_id="GR86-003-3", lap_number=3),
+        item("drivers", driver_id=None),
+    ]))
+
+    assert sorted(repository.calls, key=str) == sorted([
+        ("lap_times", "R1"),
+        ("channels", "R1", "GR86-001-1", ("Steering_Angle", "accx_can", "accy_can", "aps", "pbrake_f",
+                                          "speed", "vehspd_can")),
+        ("channels", "R1", "GR86-002-2", None),
+    ], key=str)
+
+
+def test_groups_stream_without_waiting_for_each_other(monkeypatch):
+    monkeypatch.setitem(batch.ANALYSES, "drivers", Analysis(lambda track_name, session: session, per_driver=False))
+    slow_loaded = asyncio.Event()
+
+    async def preload(track_name, session, items):
+        if session == "R2":
+            await slow_loaded.wait()
+
+    monkeypatch.setattr(batch, "_preload", preload)
+
+    async def main():
+        request = BatchRequest(items=[item("drivers", session="R2", driver_id=None),
+                                      item("drivers", session="R1", driver_id=None)])
+        lines = (await batch.run_batch(request)).body_iterator
+        first = orjson.loads(await lines.__anext__())
+        slow_loaded.set()
+        return [first] + [orjson.loads(line) async for line in lines]
+
+    results = asyncio.run(main())
+    assert [(line["index"], line["result"]) for line in results] == [(1, "R1"), (0, "R2")]
@@ -0,0 +1,86 @@
+"""Accept-Encoding negotiation and the compression middleware."""
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend import compression
+from backend.compression import CompressionMiddleware, choose_encoding
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    """Negotiate as if brotli were installed (only its presence is checked)."""
+    monkeypatch.setattr(compression, "brotli", object())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br;q=0.1, gzip;q=1.0", "gzip"),
+    ("gzip;q=0.5, br;q=0.8", "br"),
+    ("gzip, br", "br"),
+    ("br, gzip", "br"),
+    ("gzip;q=0.7, *;q=0.9", "br"),
+    ("*", "br"),
+    ("br;q=0, *", "gzip"),
+    ("gzip;q=0.5, identity", None),
+    ("br;q=0, gzip;q=0", None),
+    ("deflate", None),
+    ("", None),
+    (None, None),
+])
+def test_choose_encoding_with_brotli(with_brotli, header, expected):
+    assert choose_encoding(header) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br;q=1.0, gzip;q=0.1", "gzip"),
+    ("br", None),
+    ("*", "gzip"),
+    ("GZIP;q=0.3", "gzip"),
+])
+def test_choose_encoding_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding(header) == expected
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    def large():
+        return {"values": list(range(500))}
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b'{"a": 1}\n'] * 100), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+def test_middleware_compresses_large_json(client, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == {"values": list(range(500))}  # the client decodes it
+
+
+def test_middleware_leaves_small_and_streamed_bodies(client):
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_gzip_is_reproducible():
+    body = b"x" * 1000
+    assert compression.compress(body, "gzip") == compression.compress(body, "gzip")
+    assert gzip.decompress(compression.compress(body, "gzip")) == body
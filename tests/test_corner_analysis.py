@@ -0,0 +1,46 @@
+"""AMICOS corner metrics: segment reductions against the former per-corner loop."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services.amicos_engine import AMICOSEngine
+from backend.services.segmentation import Segments
+from scripts.benchmark_corner_analysis import analyze_single_corner, synthetic_session
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return AMICOSEngine()
+
+
+def loop_metrics(engine, corners, speed, accx, accy):
+    return [
+        analyze_single_corner(engine, {'start_idx': int(s), 'end_idx': int(e)}, speed, accx, accy)
+        for s, e in zip(corners.start, corners.end)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_detected_corners_match_loop(engine, seed):
+    aligned = synthetic_session(20000, seed=seed)
+    speed, accx, accy = aligned["speed"], aligned["accx_can"], aligned["accy_can"]
+    corners = engine._detect_corners(speed, accy, pd.Series(dtype=float))
+
+    assert len(corners.start) > 50
+    assert engine._analyze_corners(corners, speed, accx, accy) == loop_metrics(engine, corners, speed, accx, accy)
+
+
+def test_corners_with_nan_and_single_samples_match_loop(engine):
+    speed = pd.Series([np.nan, 120.0, 80.0, np.nan, 90.0, 0.0, 0.0, 140.0, 150.0, np.nan])
+    accx = pd.Series([0.1, np.nan, -0.8, 0.2, 0.3, 0.0, 0.0, np.nan, np.nan, np.nan])
+    accy = pd.Series([0.5, 1.1, np.nan, -1.3, 0.9, 0.05, 0.0, 0.2, np.nan, np.nan])
+    start, end = np.array([0, 2, 5, 7, 8]), np.array([5, 3, 7, 9, 10])
+    corners = Segments(start, end, start + (end - start) // 2)
+
+    assert engine._analyze_corners(corners, speed, accx, accy) == loop_metrics(engine, corners, speed, accx, accy)
+
+
+def test_no_corners(engine):
+    empty = np.zeros(0, dtype=np.intp)
+    series = pd.Series(dtype=float)
+    assert engine._analyze_corners(Segments(empty, empty, empty), series, series, series) == []
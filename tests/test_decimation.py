@@ -0,0 +1,50 @@
+"""Extreme-preserving decimation."""
+import numpy as np
+import pytest
+
+from backend.services.decimation import extrema_indices, minmax_indices
+
+
+def loop_extrema(groups, values):
+    """Index of the min and max of every group, one group at a time (NaN skipped)."""
+    found = set()
+    for group in np.unique(groups):
+        members = np.flatnonzero((groups == group) & ~np.isnan(values))
+        if len(members):
+            found.add(int(members[np.argmin(values[members])]))
+            found.add(int(members[np.argmax(values[members])]))
+    return sorted(found)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_extrema_match_loop(seed):
+    rng = np.random.default_rng(seed)
+    groups = rng.integers(0, 40, 2000)
+    values = rng.permutation(2000).astype(np.float64)  # distinct, so each extreme is one sample
+    values[rng.random(2000) < 0.05] = np.nan
+
+    assert extrema_indices(groups, values).tolist() == loop_extrema(groups, values)
+
+
+def test_extrema_skip_nan_groups_and_ties():
+    groups = np.array([0, 0, 0, 1, 1, 2, 2])
+    values = np.array([3.0, np.nan, 3.0, np.nan, np.nan, 1.0, 5.0])
+    result = extrema_indices(groups, values)
+
+    # Ties: the first tied sample is the min and the last the max; an all-NaN group keeps none
+    assert result.tolist() == [0, 2, 5, 6]
+
+
+def test_extrema_all_nan():
+    assert len(extrema_indices(np.zeros(3, dtype=int), np.full(3, np.nan))) == 0
+
+
+def test_minmax_keeps_ends_and_peaks():
+    values = np.sin(np.linspace(0, 20, 10000))
+    values[1234] = 5.0
+    values[8765] = -5.0
+    kept = minmax_indices(values, 200)
+
+    assert len(kept) <= 202
+    assert {0, 1234, 8765, 9999} <= set(kept.tolist())
+    assert minmax_indices(values[:100], 200).tolist() == list(range(100))
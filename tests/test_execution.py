@@ -0,0 +1,116 @@
+"""Request coalescing: identical concurrent calls share one execution."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.services.execution import ExecutionPool, SingleFlight, _call_key
+
+
+class Service:
+    """Records every call that actually runs."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def analyze(self, track_name, session, lap=None):
+        with self._lock:
+            self.calls.append((track_name, session, lap))
+        time.sleep(0.1)
+        return {"track": track_name, "session": session, "lap": lap}
+
+    def fail(self, track_name):
+        with self._lock:
+            self.calls.append(track_name)
+        time.sleep(0.1)
+        raise ValueError(f"bad track {track_name}")
+
+
+@pytest.fixture
+def pool():
+    pool = ExecutionPool("test", "thread", 8)
+    yield pool
+    pool.shutdown()
+
+
+def run_all(flight, pool, calls):
+    """Run (fn, args, kwargs) calls concurrently through one SingleFlight."""
+    async def main():
+        return await asyncio.gather(*(
+            flight.run(_call_key(fn, args, kwargs), lambda fn=fn, args=args, kwargs=kwargs: pool.run(fn, *args, **kwargs))
+            for fn, args, kwargs in calls
+        ), return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_identical_calls_run_once(pool):
+    service, flight = Service(), SingleFlight()
+    results = run_all(flight, pool, [(service.analyze, ("barber", "R1"), {"lap": 3})] * 10)
+
+    assert len(service.calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["deduplicated"] == 9
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_calls_run_separately(pool):
+    service, other, flight = Service(), Service(), SingleFlight()
+    results = run_all(flight, pool, [
+        (service.analyze, ("barber", "R1"), {}),
+        (service.analyze, ("barber", "R2"), {}),
+        (service.analyze, ("barber", "R1"), {"lap": 3}),
+        (service.analyze, ("sonoma", "R1"), {}),
+        (other.analyze, ("barber", "R1"), {}),
+    ])
+
+    assert len(service.calls) == 4 and len(other.calls) == 1
+    assert [result["session"] for result in results] == ["R1", "R2", "R1", "R1", "R1"]
+    assert flight.stats()["deduplicated"] == 0
+
+
+def test_exception_reaches_every_waiter(pool):
+    service, flight = Service(), SingleFlight()
+    results = run_all(flight, pool, [(service.fail, ("barber",), {})] * 5)
+
+    assert len(service.calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    # The failed call is not kept: the next one runs again
+    run_all(flight, pool, [(service.fail, ("barber",), {})])
+    assert len(service.calls) == 2
+
+
+def test_cancelled_waiter_leaves_others_running(pool):
+    service, flight = Service(), SingleFlight()
+    key = _call_key(service.analyze, ("barber", "R1"), {})
+
+    async def main():
+        start = lambda: pool.run(service.analyze, "barber", "R1")
+        first = asyncio.ensure_future(flight.run(key, start))
+        second = asyncio.ensure_future(flight.run(key, start))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main())["session"] == "R1"
+    assert len(service.calls) == 1
+
+
+def test_call_key():
+    service, other = Service(), Service()
+    key = _call_key(service.analyze, ("barber", "R1"), {"lap": 3, "extra": 1})
+
+    assert key == _call_key(service.analyze, ("barber", "R1"), {"extra": 1, "lap": 3})
+    assert key != _call_key(other.analyze, ("barber", "R1"), {"lap": 3, "extra": 1})
+    assert key != _call_key(service.fail, ("barber", "R1"), {"lap": 3, "extra": 1})
+    assert key != _call_key(service.analyze, ("barber", "R1"), {"lap": 4, "extra": 1})
+    assert _call_key(service.analyze, ("barber", ["R1"]), {}) is None
+
+
+def test_unhashable_or_disabled_calls_are_not_shared(pool):
+    service = Service()
+    run_all(SingleFlight(), pool, [(service.analyze, ("barber", ["R1"]), {})] * 3)
+    run_all(SingleFlight(enabled=False), pool, [(service.analyze, ("barber", "R1"), {})] * 3)
+    assert len(service.calls) == 6
@@ -0,0 +1,89 @@
+"""Field-wide metrics against the per-driver endpoints they replace."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services.field_analyzer import MIN_DEGRADATION_LAPS, FieldAnalyzer
+from backend.services.lap_analyzer import LapAnalyzer
+from backend.services.strategy_engine import StrategyEngine
+
+TRACK, SESSION = "test_track", "R1"
+
+
+class LapTableRepository:
+    """Serves one lap table for every session."""
+
+    def __init__(self, lap_times: pd.DataFrame):
+        self.lap_times = lap_times
+
+    def load_lap_times(self, track_name: str, session: str) -> pd.DataFrame:
+        return self.lap_times.copy()
+
+
+def synthetic_lap_times(seed: int) -> pd.DataFrame:
+    """Drivers with 1 to 20 laps, slowly degrading, rows in random order."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for car in range(12):
+        laps = rng.choice(np.arange(1, 26), size=rng.integers(1, 21), replace=False)
+        for lap in laps:
+            rows.append({
+                "vehicle_id": f"GR86-{car:03d}-{car * 7}",
+                "lap": int(lap),
+                "lap_time": 95 + rng.uniform(0, 2) + 0.05 * lap
+            })
+    return pd.DataFrame(rows).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def with_repository(service, lap_times):
+    service.repository = LapTableRepository(lap_times)
+    return service
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_field_matches_per_driver_endpoints(seed):
+    lap_times = synthetic_lap_times(seed)
+    field = with_repository(FieldAnalyzer(), lap_times).analyze_field(TRACK, SESSION)
+    analyzer = with_repository(LapAnalyzer(), lap_times)
+    strategy = with_repository(StrategyEngine(), lap_times)
+
+    assert field["driver_count"] == lap_times["vehicle_id"].nunique()
+    for driver_id, metrics in field["drivers"].items():
+        performance = analyzer.analyze_driver_performance(TRACK, SESSION, driver_id)
+        assert metrics["performance"] == pytest.approx({
+            name: value for name, value in performance.items() if name not in ("driver_id", "lap_times")
+        }, nan_ok=True)
+
+        consistency = strategy.analyze_consistency(TRACK, SESSION, driver_id)
+        assert metrics["consistency"] == pytest.approx({
+            name: consistency[name]
+            for name in ("consistency_score", "coefficient_of_variation", "std_deviation", "laps_within_05s")
+        })
+
+        degradation = strategy.predict_tire_degradation(TRACK, SESSION, driver_id)
+        if metrics["performance"]["total_laps"] < MIN_DEGRADATION_LAPS:
+            assert metrics["tire_degradation"] is None
+            assert "message" in degradation
+        else:
+            assert metrics["tire_degradation"] == pytest.approx({
+                "degradation_rate_per_lap": degradation["degradation_rate_per_lap"],
+                "current_delta": degradation["current_delta"],
+                "laps_analyzed": degradation["laps_analyzed"]
+            }, abs=1e-9)
+
+
+def test_field_skips_invalid_lap_times():
+    lap_times = pd.DataFrame({
+        "vehicle_id": ["A", "A", "A", "B"],
+        "lap": [1, 2, 3, 1],
+        "lap_time": [100.0, 0.0, 101.0, -1.0]
+    })
+    field = with_repository(FieldAnalyzer(), lap_times).analyze_field(TRACK, SESSION)
+
+    assert list(field["drivers"]) == ["A"]
+    assert field["drivers"]["A"]["performance"]["total_laps"] == 2
+
+
+def test_field_without_laps():
+    field = with_repository(FieldAnalyzer(), pd.DataFrame()).analyze_field(TRACK, SESSION)
+    assert "error" in field
@@ -0,0 +1,100 @@
+"""ETag and 304 round trips through the conditional cache middleware."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import http_cache
+from backend.http_cache import ConditionalCacheMiddleware
+
+ROUTE = "/api/analytics/track/barber/session/R1/summary"
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    """Data version per session; a session missing from it has no data."""
+    versions = {"R1": "r1-v1", "R2": "r2-v1"}
+
+    def fake_versions(track_name, sessions):
+        data_version = tuple(versions.get(session) for session in sessions)
+        return None if None in data_version else ("code-v1", data_version)
+
+    monkeypatch.setattr(http_cache, "_versions", fake_versions)
+    return versions
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(versions, calls):
+    app = FastAPI()
+    app.add_middleware(ConditionalCacheMiddleware, max_age=60)
+
+    @app.get("/api/analytics/track/{track_name}/session/{session}/summary")
+    def summary(track_name: str, session: str):
+        calls.append(session)
+        return {"track": track_name, "session": session}
+
+    @app.post("/api/analytics/track/{track_name}/session/{session}/summary")
+    def update(track_name: str, session: str):
+        return {}
+
+    return TestClient(app)
+
+
+def test_etag_round_trip(client, calls):
+    first = client.get(ROUTE)
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "public, max-age=60"
+    assert "Accept-Encoding" in first.headers["vary"]
+
+    again = client.get(ROUTE, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert calls == ["R1"]
+
+
+def test_weak_and_listed_validators_match(client):
+    etag = client.get(ROUTE).headers["etag"]
+    assert client.get(ROUTE, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get(ROUTE, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get(ROUTE, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_data_change_changes_etag(client, versions):
+    etag = client.get(ROUTE).headers["etag"]
+    versions["R1"] = "r1-v2"
+
+    changed = client.get(ROUTE, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_etag_depends_on_representation(client):
+    etag = client.get(ROUTE).headers["etag"]
+    assert client.get(ROUTE + "?limit=5").headers["etag"] != etag
+    assert client.get(ROUTE, headers={"Accept": "application/vnd.apache.arrow.stream"}).headers["etag"] != etag
+    assert client.get(ROUTE, headers={"Accept-Encoding": "identity"}).headers["etag"] != etag
+
+
+def test_ref_session_data_change_changes_etag(client, versions):
+    url = ROUTE + "?ref_session=R2"
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    versions["R2"] = "r2-v2"
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_untagged_without_data_or_for_writes(client, versions):
+    del versions["R1"]
+    assert "etag" not in client.get(ROUTE).headers
+    versions["R1"] = "r1-v1"
+    assert "etag" not in client.post(ROUTE).headers
+    assert "etag" not in client.get(ROUTE + "?ref_session=R3").headers
@@ -0,0 +1,58 @@
+"""Lap distance integration."""
+import numpy as np
+import pytest
+
+from backend.services.lap_distance import integrate_lap_distance
+
+NS = 1_000_000_000
+
+
+def loop_distance(timestamps, speed_kmh, laps):
+    """Trapezoidal distance from each lap's first sample, one interval at a time."""
+    distance = [0.0]
+    for i in range(1, len(timestamps)):
+        if laps[i] != laps[i - 1]:
+            distance.append(0.0)
+            continue
+        step = (speed_kmh[i] + speed_kmh[i - 1]) / 2 / 3.6 * (timestamps[i] - timestamps[i - 1]) / NS
+        distance.append(distance[-1] + (0.0 if np.isnan(step) else step))
+    return np.array(distance)
+
+
+def test_constant_speed_restarts_every_lap():
+    timestamps = np.arange(22) * NS // 10
+    laps = np.repeat([1, 2], 11)
+    distance = integrate_lap_distance(timestamps, np.full(22, 36.0), laps)
+
+    # 10 m/s for ten 0.1 s intervals per lap; the interval across the line adds nothing
+    np.testing.assert_allclose(distance[:11], np.arange(11) * 1.0)
+    np.testing.assert_allclose(distance[11:], np.arange(11) * 1.0)
+
+
+def test_lap_number_returning_starts_a_new_lap():
+    timestamps = np.arange(6) * NS
+    distance = integrate_lap_distance(timestamps, np.full(6, 3.6), np.array([1, 1, 2, 2, 1, 1]))
+    np.testing.assert_allclose(distance, [0, 1, 0, 1, 0, 1])
+
+
+def test_nan_speed_adds_no_distance():
+    timestamps = np.arange(5) * NS
+    distance = integrate_lap_distance(timestamps, np.array([3.6, 3.6, np.nan, 3.6, 3.6]), np.ones(5))
+    np.testing.assert_allclose(distance, [0, 1, 1, 1, 2])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_loop(seed):
+    rng = np.random.default_rng(seed)
+    n = 3000
+    timestamps = 1_700_000_000 * NS + np.cumsum(rng.integers(NS // 50, NS // 5, n))
+    speed = rng.uniform(0, 220, n)
+    speed[rng.random(n) < 0.01] = np.nan
+    laps = np.repeat(np.arange(1, 11), n // 10)
+
+    np.testing.assert_allclose(integrate_lap_distance(timestamps, speed, laps),
+                               loop_distance(timestamps, speed, laps), rtol=1e-9, atol=1e-6)
+
+
+def test_empty():
+    assert len(integrate_lap_distance(np.zeros(0), np.zeros(0), np.zeros(0))) == 0
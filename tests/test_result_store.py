@@ -0,0 +1,134 @@
+"""Persistent result store: keys follow data and code versions, and the byte budget holds."""
+import itertools
+
+import numpy as np
+import pytest
+
+from backend.services import result_store
+from backend.services.result_store import ResultStore, stored_result
+
+
+class VersionedRepository:
+    """Reports a settable data version per session."""
+
+    def __init__(self):
+        self.versions = {"R1": "r1-v1", "R2": "r2-v1"}
+
+    def session_version(self, track_name, session):
+        return self.versions.get(session)
+
+
+class Analysis:
+    """Counts how often each analysis actually runs."""
+
+    def __init__(self):
+        self.runs = 0
+
+    @stored_result("test")
+    def summary(self, track_name, session, lap=1):
+        self.runs += 1
+        return {"track": track_name, "session": session, "lap": lap}
+
+    @stored_result("test_failing")
+    def failing(self, track_name, session):
+        self.runs += 1
+        return {"error": "No data"}
+
+    @stored_result("test_pair", session_arg="other_session")
+    def pair(self, track_name, session, other_session=None):
+        self.runs += 1
+        return {"sessions": [session, other_session]}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ResultStore(tmp_path / "results.sqlite", max_bytes=1024 * 1024)
+    monkeypatch.setattr(result_store, "_store", store)
+    monkeypatch.setattr(result_store, "_code_version", "code-v1")
+    return store
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    repository = VersionedRepository()
+    monkeypatch.setattr(result_store, "get_session_repository", lambda: repository)
+    return repository
+
+
+def test_hit_until_data_version_changes(store, repository):
+    analysis = Analysis()
+    assert analysis.summary("barber", "R1") == analysis.summary("barber", "R1")
+    assert analysis.runs == 1
+
+    repository.versions["R1"] = "r1-v2"
+    analysis.summary("barber", "R1")
+    assert analysis.runs == 2
+    assert store.stats()["hits"] == 1
+
+
+def test_code_version_change_misses(store, repository, monkeypatch):
+    analysis = Analysis()
+    analysis.summary("barber", "R1")
+    monkeypatch.setattr(result_store, "_code_version", "code-v2")
+    analysis.summary("barber", "R1")
+    assert analysis.runs == 2
+
+
+def test_arguments_are_part_of_the_key(store, repository):
+    analysis = Analysis()
+    analysis.summary("barber", "R1", lap=1)
+    analysis.summary("barber", "R1", lap=2)
+    analysis.summary("barber", "R2", lap=1)
+    assert analysis.runs == 3
+
+
+def test_other_session_version_is_part_of_the_key(store, repository):
+    analysis = Analysis()
+    analysis.pair("barber", "R1", other_session="R2")
+    analysis.pair("barber", "R1", other_session="R2")
+    assert analysis.runs == 1
+
+    repository.versions["R2"] = "r2-v2"
+    analysis.pair("barber", "R1", other_session="R2")
+    assert analysis.runs == 2
+
+
+def test_errors_and_unversioned_sessions_are_not_stored(store, repository):
+    analysis = Analysis()
+    analysis.failing("barber", "R1")
+    analysis.failing("barber", "R1")
+    analysis.summary("barber", "R9")
+    analysis.summary("barber", "R9")
+    assert analysis.runs == 4
+    assert store.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used_down_to_budget(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(result_store.time, "time", lambda: float(next(clock)))
+    store = ResultStore(tmp_path / "results.sqlite", max_bytes=1)
+    payload = np.random.default_rng(0).random(200)  # incompressible, about 1.6 kB stored
+
+    store.max_bytes = 10**9
+    store.put("probe", "test", payload)
+    row_bytes = store.stats()["bytes"]
+    store.clear()
+    store.max_bytes = 3 * row_bytes
+
+    for key in ("a", "b", "c"):
+        store.put(key, "test", payload)
+    assert store.get("a") is not None  # "b" is now the least recently used
+    store.put("d", "test", payload)
+
+    stats = store.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= store.max_bytes
+    assert stats["evictions"] == 1
+    assert store.get("b") is None
+    assert all(store.get(key) is not None for key in ("a", "c", "d"))
+
+
+def test_result_larger_than_budget_is_skipped(tmp_path):
+    store = ResultStore(tmp_path / "results.sqlite", max_bytes=100)
+    store.put("big", "test", np.random.default_rng(0).random(200))
+    assert store.stats()["entries"] == 0
@@ -0,0 +1,78 @@
+"""Bucket manifest key resolution."""
+import pytest
+
+from backend.services.s3_manifest import S3KeyManifest, parse_key
+
+
+class ListingClient:
+    """Serves a fixed key listing in pages, as list_objects_v2 does."""
+
+    def __init__(self, keys, page_size=2):
+        self.keys = keys
+        self.page_size = page_size
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        keys = [key for key in self.keys if key.startswith(Prefix)]
+        for i in range(0, len(keys), self.page_size):
+            yield {"Contents": [{"Key": key, "Size": 1, "ETag": f'"{key}"'} for key in keys[i:i + self.page_size]]}
+
+
+def manifest(keys):
+    return S3KeyManifest(ListingClient(keys), "bucket", ttl_seconds=60)
+
+
+@pytest.mark.parametrize("key, expected", [
+    ("data/barber_motorsports_park/barber/R1_barber_lap_start.csv", ("barber_motorsports_park", "R1", "lap_start")),
+    ("data/COTA/Race 2/COTA_lap_end_time_R2.csv", ("COTA", "R2", "lap_end")),
+    ("data/sonoma/R1_sonoma_telemetry_data.csv", ("sonoma", "R1", "telemetry")),
+    ("data/sonoma/R1_sonoma_results.csv", None),
+    ("data/R1_lap_start.csv", None),
+    ("other/sonoma/R1_lap_start.csv", None),
+])
+def test_parse_key(key, expected):
+    assert parse_key(key) == expected
+
+
+def test_resolves_every_layout():
+    keys = [
+        "data/barber_motorsports_park/barber/R1_barber_lap_start.csv",
+        "data/COTA/Race 1/COTA_lap_start_time_R1.csv",
+        "data/indianapolis/R2_indianapolis_motor_speedway_lap_end.csv",
+    ]
+    listed = manifest(keys)
+    assert listed.resolve("barber_motorsports_park", "R1", "lap_start") == keys[0]
+    assert listed.resolve("COTA", "r1", "lap_start") == keys[1]
+    assert listed.resolve("indianapolis", "R2", "lap_end") == keys[2]
+    assert listed.resolve("indianapolis", "R1", "lap_end") is None
+    assert listed.sessions("COTA") == ["R1"]
+
+
+def test_ambiguous_files_resolve_by_alias_order_then_depth():
+    keys = [
+        "data/vir/extra/R1_vir_lap_start.csv",
+        "data/vir/R1_vir_lap_start.csv",
+        "data/vir/Race 1/VIR_lap_start_time_R1.csv",
+        "data/vir/R1_vir_telemetry.csv",
+        "data/vir/R1_vir_telemetry_data.csv",
+    ]
+    for order in (keys, keys[::-1]):
+        listed = manifest(order)
+        assert listed.resolve("vir", "R1", "lap_start") == "data/vir/Race 1/VIR_lap_start_time_R1.csv"
+        assert listed.resolve("vir", "R1", "telemetry") == "data/vir/R1_vir_telemetry_data.csv"
+
+    listed = manifest(keys[:2])
+    assert listed.resolve("vir", "R1", "lap_start") == "data/vir/R1_vir_lap_start.csv"
+
+
+def test_lists_once_until_invalidated():
+    listed = manifest(["data/vir/R1_vir_lap_start.csv"])
+    listed.resolve("vir", "R1", "lap_start")
+    listed.resolve("vir", "R1", "lap_end")
+    assert listed.refreshes == 1
+
+    listed.invalidate()
+    listed.resolve("vir", "R1", "lap_start")
+    assert listed.refreshes == 2
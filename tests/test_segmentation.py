@@ -0,0 +1,96 @@
+"""Run-length segmentation against the Python loops it replaced."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services.segmentation import above_threshold, peak_indices, runs, threshold_runs
+from scripts.benchmark_segmentation import loop_brake_applications, loop_corners, synthetic_trace, vector_corners
+
+
+def loop_state(values, enter, exit):
+    """Hysteresis detector, one sample at a time (NaN keeps the state)."""
+    state, states = False, []
+    for value in values:
+        if value > enter:
+            state = True
+        elif value <= exit:
+            state = False
+        states.append(state)
+    return np.array(states, dtype=bool)
+
+
+def loop_runs(mask):
+    """(start, end) of every run of True, one sample at a time."""
+    found, start = [], None
+    for i, on in enumerate(mask):
+        if on and start is None:
+            start = i
+        elif not on and start is not None:
+            found.append((start, i))
+            start = None
+    if start is not None:
+        found.append((start, len(mask)))
+    return found
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("enter, exit", [(10.0, 10.0), (10.0, 4.0), (0.5, -0.5)])
+def test_above_threshold_matches_loop(seed, enter, exit):
+    values = synthetic_trace(5000, high=enter or 1.0, seed=seed)
+    np.testing.assert_array_equal(above_threshold(values, enter, exit), loop_state(values, enter, exit))
+
+
+def test_above_threshold_nan_keeps_state():
+    values = np.array([np.nan, 5, np.nan, np.nan, 2, np.nan, 0, np.nan, 5, 3, np.nan])
+    expected = [False, True, True, True, True, True, False, False, True, True, True]
+    np.testing.assert_array_equal(above_threshold(values, 4.0, 1.0), expected)
+
+
+def test_above_threshold_defaults_exit_to_enter():
+    values = np.array([1.0, 3.0, 2.0, 2.5, 1.0])
+    np.testing.assert_array_equal(above_threshold(values, 2.0), [False, True, False, True, False])
+
+
+def test_above_threshold_rejects_exit_above_enter():
+    with pytest.raises(ValueError):
+        above_threshold(np.zeros(3), 1.0, 2.0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_runs_match_loop(seed):
+    mask = np.random.default_rng(seed).random(2000) < 0.6
+    segments = runs(mask)
+    assert list(zip(segments.start.tolist(), segments.end.tolist())) == loop_runs(mask)
+    np.testing.assert_array_equal(segments.peak, segments.start + (segments.end - segments.start) // 2)
+
+
+def test_runs_min_length_and_open_run():
+    mask = np.array([1, 1, 0, 1, 1, 1, 0, 0, 1, 1, 1], dtype=bool)
+    assert runs(mask, min_length=3).start.tolist() == [3, 8]
+    assert runs(mask, min_length=3, include_open=False).start.tolist() == [3]
+    assert runs(np.zeros(0, dtype=bool)).start.tolist() == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_brake_applications_match_loop(seed):
+    pressure = pd.Series(synthetic_trace(20000, high=10.0, seed=seed))
+    assert len(threshold_runs(pressure.to_numpy(), 10.0).start) == loop_brake_applications(pressure, 10.0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_corners_match_loop(seed):
+    accy = pd.Series(synthetic_trace(20000, high=0.4, seed=seed) * np.where(seed % 2, 1, -1))
+    assert vector_corners(accy, 0.4) == loop_corners(accy, 0.4)
+
+
+def test_threshold_runs_peak_is_first_largest_value():
+    values = np.array([0, 5, 7, 7, 1, 0, 3, np.nan, 9, 0])
+    segments = threshold_runs(values, 2.0)
+    assert segments.start.tolist() == [1, 6]
+    assert segments.end.tolist() == [4, 9]
+    assert segments.peak.tolist() == [2, 8]
+
+
+def test_peak_indices_skip_nan():
+    values = np.array([np.nan, 1.0, np.nan, np.nan, 2.0])
+    assert peak_indices(values, np.array([0, 2]), np.array([2, 5])).tolist() == [1, 4]
@@ -0,0 +1,186 @@
+"""Session repository cache: byte budget, revalidation and load coalescing."""
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services import session_repository
+from backend.services.session_repository import SessionRepository
+
+TRACK = "test_track"
+
+
+def write_lap_files(track_dir, lap_seconds):
+    """Lap start/end CSVs for one car driving laps of the given durations."""
+    start, starts, ends = pd.Timestamp("2025-09-06T18:40:00Z"), [], []
+    for lap, seconds in enumerate(lap_seconds, start=1):
+        end = start + pd.Timedelta(seconds=seconds)
+        starts.append(f"GR86-001-1,{lap},{start.isoformat()}")
+        ends.append(f"GR86-001-1,{lap},{end.isoformat()}")
+        start = end
+    for name, rows in (("lap_start", starts), ("lap_end", ends)):
+        (track_dir / f"R1_test_{name}.csv").write_text("vehicle_id,lap,timestamp\n" + "\n".join(rows) + "\n")
+
+
+def write_telemetry_file(track_dir, channels):
+    """A raw telemetry CSV with ten samples of each channel for one car."""
+    start = pd.Timestamp("2025-09-06T18:40:00Z")
+    rows = [
+        f"GR86-001-1,{name},{i * 1.5},1,{(start + pd.Timedelta(milliseconds=100 * i)).isoformat()}"
+        for name in channels for i in range(10)
+    ]
+    (track_dir / "R1_test_telemetry_data.csv").write_text(
+        "vehicle_id,telemetry_name,telemetry_value,lap,timestamp\n" + "\n".join(rows) + "\n")
+
+
+@pytest.fixture
+def track_dir(tmp_path):
+    track_dir = tmp_path / TRACK / TRACK
+    track_dir.mkdir(parents=True)
+    return track_dir
+
+
+def test_evicts_least_recently_used_at_byte_budget():
+    repository = SessionRepository(max_bytes=3000, revalidate_seconds=60)
+    load = lambda: np.zeros(125)  # 1000 bytes
+
+    for key in ("a", "b", "c"):
+        repository.get_or_compute(key, lambda: 1, load)
+    repository.get_or_compute("a", lambda: 1, load)  # "b" is now the oldest
+    repository.get_or_compute("d", lambda: 1, load)
+
+    stats = repository.stats()
+    assert stats["bytes"] == 3000
+    assert stats["evictions"] == 1
+    assert list(repository._cache) == ["c", "a", "d"]
+
+
+def test_value_larger_than_budget_is_not_cached():
+    repository = SessionRepository(max_bytes=500, revalidate_seconds=60)
+    repository.get_or_compute("big", lambda: 1, lambda: np.zeros(125))
+    assert repository.stats()["entries"] == 0
+
+
+def test_reloads_after_file_changes(tmp_path, track_dir):
+    write_lap_files(track_dir, [90.0, 91.0])
+    repository = SessionRepository(data_dir=tmp_path, revalidate_seconds=0)
+
+    first = repository.load_lap_times(TRACK, "R1")
+    assert repository.load_lap_times(TRACK, "R1") is first
+    assert first["lap_time"].tolist() == [90.0, 91.0]
+
+    write_lap_files(track_dir, [90.0, 91.0, 92.0])
+    lap_start = track_dir / "R1_test_lap_start.csv"
+    os.utime(lap_start, ns=(time.time_ns(), lap_start.stat().st_mtime_ns + 1_000_000_000))
+
+    reloaded = repository.load_lap_times(TRACK, "R1")
+    assert reloaded["lap_time"].tolist() == [90.0, 91.0, 92.0]
+    assert repository.stats()["invalidations"] == 1
+
+
+def test_version_is_rechecked_only_after_revalidate_seconds():
+    repository = SessionRepository(max_bytes=10_000, revalidate_seconds=60)
+    checks = []
+
+    def version():
+        checks.append(1)
+        return 1
+
+    for _ in range(3):
+        repository.get_or_compute("a", version, lambda: np.zeros(1))
+    assert len(checks) == 1  # the load's own check
+
+
+def test_concurrent_misses_share_one_load():
+    repository = SessionRepository(max_bytes=10_000, revalidate_seconds=60)
+    callers = 8
+    barrier = threading.Barrier(callers)
+    loads, results = [], []
+
+    def load():
+        loads.append(1)
+        time.sleep(0.2)
+        return np.arange(10)
+
+    def call():
+        barrier.wait()
+        results.append(repository.get_or_compute("a", lambda: 1, load))
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert len(results) == callers and all(result is results[0] for result in results)
+    assert repository.stats()["coalesced_loads"] == callers - 1
+
+
+def test_failed_load_reaches_every_waiter():
+    repository = SessionRepository(max_bytes=10_000, revalidate_seconds=60)
+    callers = 4
+    barrier = threading.Barrier(callers)
+    errors = []
+
+    def load():
+        time.sleep(0.2)
+        raise OSError("unreadable")
+
+    def call():
+        barrier.wait()
+        try:
+            repository.get_or_compute("a", lambda: 1, load)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(errors) == callers
+    assert repository.stats()["loading"] == 0
+
+
+def test_revalidation_runs_outside_the_lock():
+    repository = SessionRepository(max_bytes=10_000, revalidate_seconds=0)
+    held = []
+
+    def version():
+        held.append(repository._lock._is_owned())
+        return 1
+
+    for _ in range(3):
+        repository.get_or_compute("a", version, lambda: np.zeros(1))
+    assert held == [False, False, False]
+    assert repository.stats()["hits"] == 2
+
+
+def test_channel_subsets_are_served_from_a_cached_superset(tmp_path, track_dir, monkeypatch):
+    write_telemetry_file(track_dir, ["speed", "aps", "pbrake_f", "accx_can"])
+    reads = []
+    read_channel_arrays = session_repository.read_channel_arrays
+    monkeypatch.setattr(session_repository, "read_channel_arrays",
+                        lambda *args: reads.append(args[2]) or read_channel_arrays(*args))
+    repository = SessionRepository(data_dir=tmp_path, revalidate_seconds=60)
+
+    union = repository.load_channels(TRACK, "R1", "GR86-001-1", ("accx_can", "aps", "speed"))
+    speed = repository.load_channels(TRACK, "R1", "GR86-001-1", ["speed"])
+    inputs = repository.load_channels(TRACK, "R1", "GR86-001-1", ["aps", "speed"])
+    assert reads == [("accx_can", "aps", "speed")]
+    assert list(speed) == ["speed"] and speed["speed"] is union["speed"]
+    assert list(inputs) == ["aps", "speed"]
+
+    # Channels outside the cached set, or all of them, need their own read
+    repository.load_channels(TRACK, "R1", "GR86-001-1", ["pbrake_f"])
+    everything = repository.load_channels(TRACK, "R1", "GR86-001-1")
+    assert reads[1:] == [("pbrake_f",), None]
+    assert len(everything) == 4
+
+    repository.load_channels(TRACK, "R1", "GR86-001-1", ["pbrake_f", "accx_can"])
+    assert len(reads) == 3
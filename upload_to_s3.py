@@ -1,63 +1,223 @@
 """Upload race data to AWS S3."""
-import boto3
+import argparse
+import gzip
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
 # AWS Configuration
 # You'll need to set these environment variables or replace with your values:
 # AWS_ACCESS_KEY_ID
 # AWS_SECRET_ACCESS_KEY
 # AWS_REGION (e.g., 'us-east-1')
 # S3_BUCKET_NAME (e.g., 'apex-racing-data')
+# S3_ENDPOINT_URL (optional, e.g. a local MinIO/moto server for testing)
+
+DEFAULT_WORKERS = 8
+DEFAULT_MANIFEST = ".s3_upload_manifest.json"
+
+# Files above the threshold are sent as multipart uploads, several parts at a time
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+MULTIPART_CONCURRENCY = 4
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+class UploadManifest:
+    """Local record of what was uploaded, keyed by S3 key.
+
+    Each entry holds the file's size, mtime and SHA-256 plus the encoding it
+    was uploaded with. A file whose size and mtime are unchanged reuses its
+    recorded hash instead of being read again. The manifest is rewritten
+    after every upload, so an interrupted run resumes with the files it had
+    not finished yet.
+    """
+
+    def __init__(self, path: Path, bucket_name: str):
+        self.path = Path(path)
+        self.bucket_name = bucket_name
+        self._lock = threading.Lock()
+        self.files = {}
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+            if saved.get("bucket") == bucket_name:
+                self.files = saved.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def file_hash(self, s3_key, file_path: Path, stat) -> str:
+        """SHA-256 of a file, reused from the manifest while size and mtime match."""
+        entry = self.files.get(s3_key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def is_uploaded(self, s3_key, sha256, encoding) -> bool:
+        """Check whether this exact content was already uploaded to the key."""
+        entry = self.files.get(s3_key)
+        return bool(entry) and entry["sha256"] == sha256 and entry.get("encoding") == encoding
+
+    def record(self, s3_key, stat, sha256, encoding):
+        """Remember a finished upload and persist the manifest."""
+        with self._lock:
+            self.files[s3_key] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": sha256,
+                "encoding": encoding,
+            }
+            tmp_path = self.path.with_name(self.path.name + f".tmp-{os.getpid()}")
+            with open(tmp_path, "w") as f:
+                json.dump({"bucket": self.bucket_name, "files": self.files}, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+def iter_upload_files(local_path: Path):
+    """Data files to upload, skipping local-only stores (data/_arrays, data/_s3_cache, ...)."""
+    for file_path in sorted(local_path.rglob('*')):
+        relative_parts = file_path.relative_to(local_path).parts
+        if any(part.startswith('_') for part in relative_parts[:-1]):
+            continue
+        if file_path.is_file() and '.tmp-' not in file_path.name:
+            yield file_path
+
+
+def should_gzip(file_path: Path) -> bool:
+    """CSV files that can be stored gzip-encoded.
+
+    Telemetry exports stay uncompressed: the API reads single laps from them
+    with HTTP range requests against the byte offsets in their lap index.
+    """
+    name = file_path.name.lower()
+    return name.endswith('.csv') and 'telemetry' not in name
+
+
+def upload_directory_to_s3(local_directory, bucket_name, s3_prefix='', workers=DEFAULT_WORKERS,
+                           manifest_path=DEFAULT_MANIFEST, compress=False, force=False, s3_client=None):
+    """Upload a directory to S3 with a pool of workers, skipping unchanged files.
 
-def upload_directory_to_s3(local_directory, bucket_name, s3_prefix=''):
-    """Upload a directory to S3.
-    
     Args:
         local_directory: Path to local directory to upload
         bucket_name: Name of S3 bucket
         s3_prefix: Prefix for S3 keys (e.g., 'data')
-        
+        workers: Files uploaded concurrently
+        manifest_path: Local upload manifest used to skip unchanged files
+        compress: Store CSVs (except telemetry) with Content-Encoding: gzip
+        force: Upload every file, even if the manifest says it is unchanged
+        s3_client: boto3 S3 client to use (one is created if None)
+
     Returns:
-        Tuple of (success_count, error_count)
+        Tuple of (success_count, error_count, errors, stats)
     """
-    s3_client = boto3.client('s3')
-    
+    if s3_client is None:
+        s3_client = boto3.client(
+            's3',
+            endpoint_url=os.getenv('S3_ENDPOINT_URL') or None,
+            config=Config(max_pool_connections=workers * MULTIPART_CONCURRENCY)
+        )
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        max_concurrency=MULTIPART_CONCURRENCY
+    )
+    manifest = UploadManifest(manifest_path, bucket_name)
+
     local_path = Path(local_directory)
+    stats = {"uploaded_bytes": 0, "sent_bytes": 0, "skipped_files": 0, "skipped_bytes": 0}
+    stats_lock = threading.Lock()
+
+    def upload_one(file_path):
+        # Calculate S3 key preserving directory structure
+        relative_path = file_path.relative_to(local_path)
+        s3_key = f"{s3_prefix}/{relative_path}".replace('\\', '/')
+        stat = file_path.stat()
+        encoding = 'gzip' if compress and should_gzip(file_path) else None
+        sha256 = manifest.file_hash(s3_key, file_path, stat)
+
+        if not force and manifest.is_uploaded(s3_key, sha256, encoding):
+            with stats_lock:
+                stats["skipped_files"] += 1
+                stats["skipped_bytes"] += stat.st_size
+            return False
+
+        extra_args = {'ContentType': 'text/csv'} if file_path.suffix.lower() == '.csv' else {}
+        source = str(file_path)
+        compressed = None
+        if encoding:
+            extra_args['ContentEncoding'] = encoding
+            compressed = tempfile.NamedTemporaryFile(suffix='.gz', delete=False)
+            with open(file_path, 'rb') as f, gzip.GzipFile(fileobj=compressed, mode='wb', mtime=0) as gz:
+                shutil.copyfileobj(f, gz, HASH_BLOCK_SIZE)
+            compressed.close()
+            source = compressed.name
+
+        try:
+            # Upload without ACL (bucket policy handles public access)
+            s3_client.upload_file(source, bucket_name, s3_key, ExtraArgs=extra_args, Config=transfer_config)
+            sent = os.path.getsize(source)
+        finally:
+            if compressed is not None:
+                os.unlink(compressed.name)
+
+        manifest.record(s3_key, stat, sha256, encoding)
+        with stats_lock:
+            stats["uploaded_bytes"] += stat.st_size
+            stats["sent_bytes"] += sent
+        print(f"✅ Uploaded {s3_key} ({stat.st_size / 1e6:.1f} MB)")
+        return True
+
     success_count = 0
     error_count = 0
     errors = []
-    
-    for file_path in local_path.rglob('*'):
-        if file_path.is_file():
-            # Calculate S3 key preserving directory structure
-            relative_path = file_path.relative_to(local_path)
-            s3_key = f"{s3_prefix}/{relative_path}".replace('\\', '/')
-            
-            print(f"📤 Uploading {relative_path}...")
-            
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(upload_one, file_path): file_path for file_path in iter_upload_files(local_path)}
+        for future in as_completed(futures):
+            relative_path = futures[future].relative_to(local_path)
             try:
-                # Upload without ACL (bucket policy handles public access)
-                s3_client.upload_file(
-                    str(file_path),
-                    bucket_name,
-                    s3_key
-                )
-                print(f"✅ Uploaded {s3_key}")
-                success_count += 1
+                if future.result():
+                    success_count += 1
             except Exception as e:
                 print(f"❌ Failed to upload {relative_path}: {e}")
                 errors.append((str(relative_path), str(e)))
                 error_count += 1
-    
-    return success_count, error_count, errors
+
+    stats["seconds"] = time.perf_counter() - start
+    return success_count, error_count, errors, stats
 
 def main():
     """Main upload function with error handling."""
-    
+    parser = argparse.ArgumentParser(description="Upload the data/ directory to S3")
+    parser.add_argument("--data-dir", default="data", help="Local directory to upload")
+    parser.add_argument("--bucket", default=os.getenv('S3_BUCKET_NAME'), help="Target bucket (default: $S3_BUCKET_NAME)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Files uploaded concurrently")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="Local manifest of uploaded files")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Store lap/section CSVs gzip-encoded (telemetry stays raw for range reads)")
+    parser.add_argument("--force", action="store_true", help="Re-upload files the manifest lists as unchanged")
+    args = parser.parse_args()
+
     # Get configuration from environment or prompt
-    bucket_name = os.getenv('S3_BUCKET_NAME')
-    
+    bucket_name = args.bucket
+
     if not bucket_name:
         print("⚠️  AWS S3 Configuration Required")
         print("\nYou need to:")
@@ -67,48 +227,56 @@ def main():
         print("   - AWS_SECRET_ACCESS_KEY")
         print("   - AWS_REGION")
         print("   - S3_BUCKET_NAME")
-        print("\nOr run with: python upload_to_s3.py")
-        
+        print("\nOr run with: python upload_to_s3.py --bucket <name>")
+
         bucket_name = input("\nEnter S3 bucket name: ")
-    
+
     # Verify AWS credentials are available
     if not os.getenv('AWS_ACCESS_KEY_ID') or not os.getenv('AWS_SECRET_ACCESS_KEY'):
         print("\n❌ Error: AWS credentials not found!")
         print("Please set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY environment variables.")
         return
-    
+
     # Check if data directory exists
-    if not Path("data").exists():
-        print("\n❌ Error: 'data' directory not found!")
+    if not Path(args.data_dir).exists():
+        print(f"\n❌ Error: '{args.data_dir}' directory not found!")
         print("Please ensure race data is extracted to the 'data' directory.")
         return
-    
+
     print(f"\n📦 Uploading data to S3 bucket: {bucket_name}")
-    print("This may take 10-15 minutes for all data...\n")
-    
+    print(f"Using {args.workers} workers; unchanged files listed in {args.manifest} are skipped.\n")
+
     try:
         # Upload data directory
-        success_count, error_count, errors = upload_directory_to_s3("data", bucket_name, "data")
-        
+        success_count, error_count, errors, stats = upload_directory_to_s3(
+            args.data_dir, bucket_name, "data",
+            workers=args.workers, manifest_path=args.manifest,
+            compress=args.gzip, force=args.force
+        )
+
+        seconds = max(stats["seconds"], 1e-9)
         print("\n" + "="*60)
         print("📊 Upload Summary")
         print("="*60)
-        print(f"✅ Successfully uploaded: {success_count} files")
+        print(f"✅ Successfully uploaded: {success_count} files ({stats['uploaded_bytes'] / 1e6:.1f} MB, "
+              f"{stats['sent_bytes'] / 1e6:.1f} MB sent)")
+        print(f"⏭️  Skipped unchanged: {stats['skipped_files']} files ({stats['skipped_bytes'] / 1e6:.1f} MB)")
         print(f"❌ Failed uploads: {error_count} files")
-        
+        print(f"⏱️  {seconds:.1f}s, {stats['sent_bytes'] / 1e6 / seconds:.1f} MB/s")
+
         if errors:
             print("\n⚠️  Errors encountered:")
             for file_path, error in errors[:10]:  # Show first 10 errors
                 print(f"  - {file_path}: {error}")
             if len(errors) > 10:
                 print(f"  ... and {len(errors) - 10} more errors")
-        
+
         if error_count == 0:
             print("\n✅ Upload complete!")
             print(f"\n📝 Your data is now at: https://{bucket_name}.s3.amazonaws.com/data/")
         else:
-            print("\n⚠️  Upload completed with errors. Please review and retry failed files.")
-            
+            print("\n⚠️  Upload completed with errors. Run the script again to retry only the failed files.")
+
     except Exception as e:
         print(f"\n❌ Upload failed: {e}")
         print("\nPlease check:")